@@ -3,10 +3,21 @@
 # Cloud-ready with Render deployment
 # ==========================================================
 
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, jsonify, render_template_string, request, Response
 from datetime import datetime
 import os
 import json
+import sqlite3
+import urllib.error
+import urllib.request
+
+from utils.job_runner import JobRunner
+from utils.scan_daemon import daemon_url
+from utils.search_index import TenderSearchIndex
+from utils.similarity_index import TenderSimilarity
+from utils.snapshot_cache import SnapshotCache
+from utils.source_health import HEALTH_FILENAME, SourceHealth
+from utils.tender_index import QueryError
 
 app = Flask(__name__)
 
@@ -19,6 +30,28 @@ OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "./output")
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Query parameters that switch /api/tenders into paginated query mode
+TENDER_QUERY_PARAMS = (
+    "priority", "category", "source", "closing_before", "closing_after",
+    "min_score", "q", "sort", "limit", "cursor"
+)
+
+# In-memory snapshot cache (re-read only when new_tenders.json changes)
+SNAPSHOT_CACHE = SnapshotCache(os.path.join(OUTPUT_DIR, "new_tenders.json"))
+
+# Background runner for scans/reports (history persisted to output/jobs/)
+JOB_RUNNER = JobRunner(os.path.join(OUTPUT_DIR, "jobs"))
+
+# Resident scanner (python tenderscan.py daemon); scans go there when it is running
+DAEMON_URL = daemon_url()
+DAEMON_TIMEOUT = 2
+
+# Full-text index over tender history (kept up to date by tenderscan.py)
+SEARCH_INDEX = TenderSearchIndex(os.path.join(OUTPUT_DIR, "tender_search.db"))
+
+# TF-IDF "similar past tenders" over the same history (loaded on first lookup)
+SIMILARITY = TenderSimilarity(SEARCH_INDEX)
+
 # ----------------------------------------------------------
 # HTML TEMPLATES
 # ----------------------------------------------------------
@@ -186,6 +219,7 @@ DASHBOARD_HTML = """
                 const data = await res.json();
                 if (res.ok) {
                     showToast(data.message || 'Action completed');
+                    if (data.status_url) pollJob(data.status_url);
                 } else {
                     showToast(`Error: ${data.message || res.statusText}`);
                 }
@@ -193,6 +227,19 @@ DASHBOARD_HTML = """
                 showToast(`Request failed: ${err.message}`);
             }
         }
+        async function pollJob(url) {
+            try {
+                const res = await fetch(url);
+                const job = await res.json();
+                if (job.status === 'queued' || job.status === 'running') {
+                    setTimeout(() => pollJob(url), 5000);
+                } else {
+                    showToast(`${job.kind} ${job.status}${job.error ? ': ' + job.error : ''}`);
+                }
+            } catch (err) {
+                showToast(`Status check failed: ${err.message}`);
+            }
+        }
         document.querySelectorAll('[data-action]').forEach(btn => {
             btn.addEventListener('click', () => triggerAction(btn.dataset.action));
         });
@@ -215,99 +262,96 @@ def health():
         "service": "tender-intelligence",
         "version": "2.0",
         "timestamp": datetime.now().isoformat(),
-        "selenium_enabled": ENABLE_SELENIUM
+        "selenium_enabled": ENABLE_SELENIUM,
+        # Scraper sources currently skipped by the circuit breaker (see /api/sources)
+        "open_sources": SourceHealth(os.path.join(OUTPUT_DIR, HEALTH_FILENAME)).open_sources()
     })
 
+@app.route("/api/sources")
+def api_sources():
+    """Per-source latency (p50/p95), failures, skips and circuit state from the last scan"""
+    sources = SourceHealth(os.path.join(OUTPUT_DIR, HEALTH_FILENAME)).summary()
+    return jsonify({"count": len(sources), "sources": sources})
+
 @app.route("/dashboard")
 def dashboard():
-    # Load recent tenders from output
-    tenders = []
-    total = high = medium = low = 0
-    tes = pakati = 0
-    last_run = "No runs yet"
-    
+    view = SNAPSHOT_CACHE.get()
+
+    # Rendered page only changes when the snapshot does
+    html = view.memo.get("dashboard_html")
+    if html is None:
+        counts = view.counts
+        html = render_template_string(
+            DASHBOARD_HTML,
+            total_tenders=counts["total"],
+            high_priority=counts["HIGH"],
+            medium_priority=counts["MEDIUM"],
+            low_priority=counts["LOW"],
+            tes_count=counts["tes"],
+            phakathi_count=counts["phakathi"],
+            tenders=view.rows[:10],  # Show top 10
+            last_run=view.last_run
+        )
+        view.memo["dashboard_html"] = html
+
+    return html
+
+def _daily_job(progress):
+    from daily_runner import run_daily as daily_workflow
+    return daily_workflow(progress=progress)
+
+def _weekly_job(progress):
+    from weekly_report import run_weekly as weekly_workflow
+    return weekly_workflow(progress=progress)
+
+def _job_response(job, created, label):
+    """202 response pointing the caller at the job status endpoint"""
+    return jsonify({
+        "status": "queued" if created else "already_running",
+        "message": f"{label} started" if created else f"{label} already running - joined existing job",
+        "job_id": job["id"],
+        "status_url": f"/api/jobs/{job['id']}",
+        "job": job,
+        "timestamp": datetime.now().isoformat()
+    }), 202
+
+def _daemon_call(method, path):
+    """(HTTP status, JSON) from the scan daemon; (None, None) if it isn't running"""
+    req = urllib.request.Request(DAEMON_URL + path, method=method)
     try:
-        json_path = os.path.join(OUTPUT_DIR, "new_tenders.json")
-        if os.path.exists(json_path):
-            mtime = datetime.fromtimestamp(os.path.getmtime(json_path))
-            last_run = mtime.strftime("%Y-%m-%d %H:%M:%S")
-            with open(json_path, "r") as f:
-                raw_tenders = json.load(f)
-                for t in raw_tenders:
-                    scores = t.get("scores", {})
-                    source = t.get("source") or t.get("client") or ""
-                    source_lower = source.lower()
-                    if "tes" in source_lower:
-                        tes += 1
-                    if "phakathi" in source_lower:
-                        pakati += 1
-                    tenders.append({
-                        "ref": t.get("ref", "N/A"),
-                        "title": t.get("title", "Unknown"),
-                        "client": t.get("client", ""),
-                        "category": t.get("category", ""),
-                        "closing": t.get("closing_date", ""),
-                        "source": t.get("source", ""),
-                        "priority": scores.get("priority", "LOW"),
-                        "score": scores.get("composite", 0)
-                    })
-                
-                total = len(tenders)
-                high = sum(1 for t in tenders if t["priority"] == "HIGH")
-                medium = sum(1 for t in tenders if t["priority"] == "MEDIUM")
-                low = sum(1 for t in tenders if t["priority"] == "LOW")
-    except Exception as e:
-        print(f"Error loading tenders: {e}")
-    
-    return render_template_string(
-        DASHBOARD_HTML,
-        total_tenders=total,
-        high_priority=high,
-        medium_priority=medium,
-        low_priority=low,
-        tes_count=tes,
-        phakathi_count=pakati,
-        tenders=tenders[:10],  # Show top 10
-        last_run=last_run
-    )
+        with urllib.request.urlopen(req, timeout=DAEMON_TIMEOUT) as resp:
+            return resp.status, json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read().decode("utf-8"))
+        except ValueError:
+            return e.code, None
+    except (urllib.error.URLError, OSError, ValueError):
+        return None, None
 
 @app.route("/api/run/daily")
 def run_daily():
-    """Trigger daily scan via API"""
-    try:
-        from daily_runner import run_daily
-        result = run_daily()
-        return jsonify({
-            "status": "success",
-            "message": "Daily scan completed",
-            "timestamp": datetime.now().isoformat(),
-            "result": result
-        })
-    except Exception as e:
+    """Queue the daily scan (on the warm daemon if it is up) and return its job id"""
+    status, delegated = _daemon_call("POST", "/run/daily")
+    if status == 409 and delegated:
         return jsonify({
-            "status": "error",
-            "message": str(e),
+            "status": "conflict",
+            "message": delegated.get("error", "Another scan is running"),
+            "job_id": delegated["job"]["id"],
+            "status_url": f"/api/jobs/{delegated['job']['id']}",
+            "job": delegated["job"],
             "timestamp": datetime.now().isoformat()
-        }), 500
+        }), 409
+    if status == 202 and delegated and delegated.get("job"):
+        return _job_response(delegated["job"], delegated.get("created", True), "Daily scan")
+    job, created = JOB_RUNNER.submit("daily", _daily_job)
+    return _job_response(job, created, "Daily scan")
 
 @app.route("/api/run/weekly")
 def run_weekly():
-    """Trigger weekly report via API"""
-    try:
-        from weekly_report import run_weekly
-        result = run_weekly()
-        return jsonify({
-            "status": "success",
-            "message": "Weekly report generated",
-            "timestamp": datetime.now().isoformat(),
-            "result": result
-        })
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e),
-            "timestamp": datetime.now().isoformat()
-        }), 500
+    """Queue the weekly report in the background and return its job id"""
+    job, created = JOB_RUNNER.submit("weekly", _weekly_job)
+    return _job_response(job, created, "Weekly report")
 
 @app.route("/cron/daily")
 def cron_daily():
@@ -319,18 +363,122 @@ def cron_weekly():
     """Endpoint for cron job to hit"""
     return run_weekly()
 
+@app.route("/api/jobs")
+def api_jobs():
+    """Recent job history (newest first)"""
+    limit = request.args.get("limit", 20, type=int)
+    return jsonify(JOB_RUNNER.history(limit=max(1, min(limit, 100))))
+
+@app.route("/api/jobs/<job_id>")
+def api_job(job_id):
+    """Status, stage progress and per-stage timings for one job"""
+    job = JOB_RUNNER.get(job_id)
+    if job is None:
+        status, delegated = _daemon_call("GET", f"/jobs/{job_id}")
+        job = delegated if status == 200 else None
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job)
+
 @app.route("/api/tenders")
 def api_tenders():
-    """JSON API for tenders"""
+    """
+    JSON API for tenders (served from memory, supports ETag + gzip).
+    Without query parameters the full snapshot is returned; with any of
+    TENDER_QUERY_PARAMS a filtered, sorted page is returned instead:
+      ?priority=HIGH,MEDIUM&category=TES&source=Eskom
+      &closing_after=2025-12-01&closing_before=2025-12-31
+      &min_score=6&q=pump&sort=score|-score|closing|-closing
+      &limit=50&cursor=<next_cursor>
+    """
     try:
-        json_path = os.path.join(OUTPUT_DIR, "new_tenders.json")
-        if os.path.exists(json_path):
-            with open(json_path, "r") as f:
-                return jsonify(json.load(f))
-        return jsonify([])
+        view = SNAPSHOT_CACHE.get()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    if any(name in request.args for name in TENDER_QUERY_PARAMS):
+        try:
+            page = view.index.query(request.args)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
+        page["last_sync"] = view.last_run
+        return jsonify(page)
+
+    use_gzip = "gzip" in (request.headers.get("Accept-Encoding") or "").lower()
+    etag = f"{view.etag}-gz" if use_gzip else view.etag
+
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(view.body_gzip, mimetype="application/json", headers=headers)
+    return Response(view.body, mimetype="application/json", headers=headers)
+
+@app.route("/api/search")
+def api_search():
+    """
+    Ranked full-text search over tender history:
+      ?q=pump&client=rand water&since=6m&priority=HIGH&limit=20
+    since/until accept YYYY-MM-DD or 30d / 6m / 1y.
+    """
+    try:
+        limit = max(1, min(int(request.args.get("limit") or 20), 200))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    try:
+        results = SEARCH_INDEX.search(
+            request.args.get("q", ""),
+            client=request.args.get("client"),
+            source=request.args.get("source"),
+            category=request.args.get("category"),
+            priority=request.args.get("priority"),
+            since=request.args.get("since"),
+            until=request.args.get("until"),
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date: {e}"}), 400
+    except sqlite3.OperationalError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"count": len(results), "results": results})
+
+@app.route("/api/tenders/<path:ref>/similar")
+def api_similar(ref):
+    """
+    Most similar past tenders (TF-IDF cosine over title, description
+    and client) with their category, priority and bid status:
+      /api/tenders/RW-123/similar?k=5
+    """
+    try:
+        k = max(1, min(int(request.args.get("k") or 5), 50))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+
+    try:
+        tender, results = SIMILARITY.similar_to_ref(ref, k=k)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    except sqlite3.OperationalError as e:
+        return jsonify({"error": str(e)}), 500
+    if tender is None:
+        return jsonify({"error": f"Unknown tender: {ref}"}), 404
+
+    return jsonify({
+        "ref": tender["ref"],
+        "title": tender["title"],
+        "count": len(results),
+        "results": results,
+    })
+
 # ----------------------------------------------------------
 # MAIN
 # ----------------------------------------------------------
@@ -9,6 +9,12 @@ from keyword_rules import EXCLUDE_KEYWORDS
 
 import re
 
+from utils.text_classifier import REASON_PREFIX, UNKNOWN, classifier_config, default_classifier
+
+# Rule results the statistical classifier may refine (config.yaml classifier.refine_categories);
+# Both from an explicit trigger phrase is a deliberate rule and is never second-guessed
+REFINE_CATEGORIES = tuple(classifier_config().get("refine_categories") or ("Unknown", "Both"))
+
 # ----------------------------------------------------------
 # CLEAN TEXT FOR MATCHING
 # ----------------------------------------------------------
@@ -62,9 +68,9 @@ def make_short_title(original_title: str) -> str:
     return "_".join(parts[:4]) if parts else "General_Scope"
 
 # ----------------------------------------------------------
-# MAIN CLASSIFICATION FUNCTION
+# KEYWORD RULES
 # ----------------------------------------------------------
-def classify_tender(title: str, description: str) -> dict:
+def classify_by_rules(title: str, description: str) -> dict:
     text = clean(f"{title} {description}")
 
     # ------------------------------------------------------
@@ -155,11 +161,66 @@ def classify_tender(title: str, description: str) -> dict:
     }
 
 # ----------------------------------------------------------
-# PLACEHOLDER FOR FUTURE LLM UNDERSTANDING (GPT)
+# MAIN CLASSIFICATION FUNCTIONS
+# ----------------------------------------------------------
+def _needs_refinement(result: dict) -> bool:
+    return (result["category"] in REFINE_CATEGORIES
+            and not result.get("reason", "").startswith("BOTH trigger"))
+
+
+def _refined(result: dict, prediction) -> dict:
+    if not prediction:
+        return result
+    return {**result, **prediction}
+
+
+def classify_tender(title: str, description: str) -> dict:
+    result = classify_by_rules(title, description)
+    if _needs_refinement(result):
+        result = _refined(result, llm_enhancement(f"{title} {description}"))
+    return result
+
+
+def classify_tenders(pairs) -> list:
+    """
+    classify_tender over (title, description) pairs, with one batched
+    statistical pass for the rule results that need refining
+    """
+    pairs = list(pairs)
+    results = [classify_by_rules(title, description) for title, description in pairs]
+    pending = [i for i, result in enumerate(results) if _needs_refinement(result)]
+    if pending:
+        predictions = llm_enhancement_batch([f"{pairs[i][0]} {pairs[i][1]}" for i in pending])
+        for i, prediction in zip(pending, predictions):
+            results[i] = _refined(results[i], prediction)
+    return results
+
+
+# ----------------------------------------------------------
+# STATISTICAL REFINEMENT (utils/text_classifier.py)
+# Naive Bayes trained on the labelled history by
+# tools/train_classifier.py; no model -> rules only
 # ----------------------------------------------------------
+def llm_enhancement_batch(descriptions: list) -> list:
+    """
+    {category, reason} per text where the model is confident, else None
+    (also None when its best class is Unknown - nothing to promote)
+    """
+    model, threshold = default_classifier()
+    if model is None:
+        return [None] * len(descriptions)
+    refined = []
+    for label, confidence in model.predict(descriptions, threshold):
+        if label is None or label == UNKNOWN:
+            refined.append(None)
+        else:
+            refined.append({"category": label, "reason": f"{REASON_PREFIX}: {label} ({confidence:.0%})"})
+    return refined
+
+
 def llm_enhancement(description: str):
     """
-    This function will later connect to GPT to refine classification.
-    For now, it's a placeholder for Phase 3A.
+    Refine a rule result the keywords could not settle. Returns
+    {category, reason} or None when untrained / not confident.
     """
-    return None
+    return llm_enhancement_batch([description])[0]
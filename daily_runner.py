@@ -12,8 +12,13 @@ from datetime import datetime
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def run_daily():
-    """Run complete daily tender workflow"""
+def run_daily(progress=None, sources=None):
+    """
+    Run complete daily tender workflow.
+    progress(stage_name) is called as each step starts (used by the web job runner).
+    sources limits the scan to those source names (the poll scheduler's due list).
+    """
+    progress = progress or (lambda stage: None)
     results = {
         "timestamp": datetime.now().isoformat(),
         "scan": None,
@@ -27,6 +32,7 @@ def run_daily():
     print("=" * 60)
     
     # Step 1: Run tender scan
+    progress("scan")
     print("\n📡 Step 1: Running tender scan...")
     try:
         from tenderscan import run_all_scrapers, process_tenders, save_outputs
@@ -36,7 +42,7 @@ def run_daily():
         rotate_log_if_needed(LOG_FILE)
         
         # Scrape all sources
-        all_tenders = run_all_scrapers()
+        all_tenders = run_all_scrapers(only=sources)
         print(f"   Scraped: {len(all_tenders)} tenders")
         
         # Process and score
@@ -61,6 +67,7 @@ def run_daily():
         print(f"   ❌ Scan failed: {e}")
     
     # Step 2: Sync to Vercel
+    progress("sync")
     print("\n🔄 Step 2: Syncing to Vercel...")
     try:
         from sync_to_vercel import sync
@@ -75,6 +82,7 @@ def run_daily():
         print(f"   ⚠️ Vercel sync skipped: {e}")
     
     # Step 3: Send email alerts for HIGH priority tenders
+    progress("email")
     print("\n📧 Step 3: Sending email alerts...")
     try:
         from email_alerts import send_daily_digest, EMAIL_CONFIG
@@ -97,6 +105,7 @@ def run_daily():
         print(f"   ⚠️ Email alerts skipped: {e}")
     
     # Step 4: Generate email summary (HTML backup)
+    progress("summary")
     print("\n📄 Step 4: Generating HTML summary...")
     try:
         summary = generate_email_summary(results)
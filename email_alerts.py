@@ -7,6 +7,7 @@
 import json
 import os
 import smtplib
+import sys
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
@@ -29,6 +30,16 @@ DASHBOARD_TENDERS_JSON = os.path.join(AUTOMATION_DIR, "vercel-dashboard", "tende
 # Legacy fallback (local pipeline output)
 LEGACY_TENDERS_JSON = os.path.join(AUTOMATION_DIR, "output", "new_tenders.json")
 
+# Change journal written by tenderscan: when present it narrows the snapshot
+# to tenders not yet emailed (the tender data itself always comes from the snapshot)
+sys.path.insert(0, AUTOMATION_DIR)
+from utils.change_journal import ADDED, RESCORED, ChangeJournal, journal_path
+from utils.deadline_timeline import days_until
+from utils.tender_collector import dedupe_key
+
+JOURNAL_DB = journal_path(os.path.join(AUTOMATION_DIR, "output"))
+DIGEST_CONSUMER = "email_digest"
+
 def load_tender_payload():
     """Load the canonical tenders payload used by the deployed dashboard."""
     for path in (DASHBOARD_TENDERS_JSON, LEGACY_TENDERS_JSON):
@@ -50,16 +61,25 @@ def load_tender_payload():
 
     return {"tenders": [], "meta": {}, "source_path": None}
 
-def get_days_until_closing(closing_date):
-    """Calculate days until closing"""
-    if not closing_date:
-        return None
-    try:
-        close = datetime.strptime(closing_date, "%Y-%m-%d")
-        delta = (close - datetime.now()).days
-        return delta
-    except:
+def load_digest_filter():
+    """
+    (journal, keys, last_seq): tender keys added or moved to a new priority
+    since the last sent digest. None if there is no journal.
+    """
+    if not os.path.exists(JOURNAL_DB):
         return None
+    journal = ChangeJournal(JOURNAL_DB)
+    events = journal.pending(DIGEST_CONSUMER)
+    last_seq = events[-1]["seq"] if events else journal.cursor(DIGEST_CONSUMER)
+    keys = {
+        e["tender_key"] for e in events
+        if e["kind"] == ADDED or (e["kind"] == RESCORED and "priority" in (e["changes"] or {}))
+    }
+    return journal, keys, last_seq
+
+def get_days_until_closing(closing_date):
+    """Calendar days until closing (0 = closes today), same count the deadline timeline uses"""
+    return days_until(closing_date)
 
 def get_urgency_text(days):
     """Get urgency label"""
@@ -210,17 +230,29 @@ def send_daily_digest():
     payload = load_tender_payload()
     tenders = payload.get("tenders") or []
     meta = payload.get("meta") or {}
+    
+    # No journal (e.g. CI snapshot builds): the whole snapshot goes out
+    digest = load_digest_filter()
+    if digest is not None:
+        journal, keys, last_seq = digest
+        tenders = [t for t in tenders if dedupe_key(t) in keys]
+        print(f"   {len(tenders)} new or re-prioritised tender(s) since the last digest")
     high_count = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "HIGH")
     
     if high_count == 0:
         print("   No high priority tenders - skipping email")
-        return
+        if digest is not None:
+            journal.ack(DIGEST_CONSUMER, last_seq)
+        return False
     
     stamp = meta.get("build_id") or meta.get("last_sync") or datetime.now().strftime("%Y-%m-%d")
     subject = f"🎯 {high_count} High Priority Tender{'s' if high_count != 1 else ''} - {stamp}"
     html = generate_email_html(tenders, meta=meta)
     
-    send_email(subject, html)
+    sent = send_email(subject, html)
+    if sent and digest is not None:
+        journal.ack(DIGEST_CONSUMER, last_seq)
+    return sent
 
 if __name__ == "__main__":
     send_daily_digest()
@@ -1,19 +1,20 @@
 # ==========================================================
 # CSV TENDER IMPORTER WITH AI SCORING
-# Import tenders from CSV file with automatic scoring
+# Import tenders from CSV / JSONL / XLSX with automatic scoring
 # ==========================================================
 
-import csv
+import argparse
 import os
 import sys
 import yaml
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from utils.backfill import DEFAULT_CHUNK_SIZE, chunked, run_backfill, score_record
+from utils.importers import ImportStats, iter_tenders
 from utils.excel_writer import ExcelWriter
 from utils.folder_tools import create_tender_folder
-from classify_engine import classify_tender
-from scoring_engine import score_tender
+from utils.search_index import TenderSearchIndex
 
 # Load config
 config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
@@ -23,12 +24,19 @@ with open(config_path, "r") as f:
 EXCEL_PATH = CONFIG["paths"]["tender_log_excel"]
 ACTIVE_TENDERS_DIR = CONFIG["paths"]["active_tenders"]
 SHEET_NAME = CONFIG["excel"]["tender_log_sheet"]
+SEARCH_DB_PATH = os.path.join(CONFIG["paths"]["output_dir"], "tender_search.db")
+IMPORT_CONFIG = CONFIG.get("importers") or {}
+BATCH_SIZE = IMPORT_CONFIG.get("batch_size", 5000)
 
 
-def import_from_csv(csv_file: str) -> tuple:
+def import_from_csv(csv_file: str, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    batch_size: int = BATCH_SIZE, sheet: str = None, column_map: dict = None) -> tuple:
     """
-    Import tenders from CSV file
-    Expected columns: ref, title, description, client, closing_date, source
+    Import tenders from a CSV, JSONL, XLSX or tender .json file
+    Headers are mapped to ref, title, description, client, closing_date,
+    source via importers.column_map in config.yaml
+    Rows are streamed, scored on `workers` processes and written in
+    batches of `batch_size`; the Excel log is saved once at the end.
     Returns (added_count, skipped_count, results_list)
     """
     
@@ -36,46 +44,42 @@ def import_from_csv(csv_file: str) -> tuple:
         print(f"❌ File not found: {csv_file}")
         return 0, 0, []
     
-    excel_writer = ExcelWriter(EXCEL_PATH, SHEET_NAME)
+    search_index = TenderSearchIndex(SEARCH_DB_PATH)
+    excel_writer = ExcelWriter(EXCEL_PATH, SHEET_NAME, search_index=search_index)
+    
+    stats = ImportStats()
+    tenders = iter_tenders(
+        csv_file,
+        column_map=column_map or IMPORT_CONFIG.get("column_map"),
+        stats=stats,
+        sheet=sheet
+    )
+    scored = run_backfill(tenders, score_record, workers=workers, chunk_size=chunk_size, label="IMPORT")
     
     added = 0
     skipped = 0
     results = []
     
-    with open(csv_file, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    for batch in chunked(scored, batch_size):
+        flags = excel_writer.write_scored_tenders(batch, save=False)
+        indexed = []
         
-        for row in reader:
-            ref = row.get("ref", "NA").strip()
-            title = row.get("title", "").strip()
-            description = row.get("description", title).strip()
-            client = row.get("client", "").strip()
-            closing_date = row.get("closing_date", "").strip()
-            source = row.get("source", "CSV Import").strip()
-            
-            if not title:
-                skipped += 1
-                continue
-            
-            tender_data = {
-                "ref": ref,
-                "title": title,
-                "description": description,
-                "client": client,
-                "closing_date": closing_date,
-                "source": source
-            }
-            
-            was_added, scores, classification = excel_writer.add_tender_with_scoring(tender_data)
+        for (tender_data, classification, scores), was_added in zip(batch, flags):
+            ref = tender_data["ref"]
+            title = tender_data["title"]
             
             if was_added:
                 added += 1
+                tender_data["category"] = classification["category"]
+                tender_data["reason"] = classification.get("reason", "")
+                tender_data["scores"] = scores
+                indexed.append(tender_data)
                 
                 # Create folder
-                folder_path = create_tender_folder(
+                create_tender_folder(
                     base_dir=ACTIVE_TENDERS_DIR,
                     ref=ref,
-                    client=client,
+                    client=tender_data["client"],
                     short_title=classification["short_title"]
                 )
                 
@@ -97,6 +101,26 @@ def import_from_csv(csv_file: str) -> tuple:
                     "status": "Skipped (duplicate)"
                 })
                 print(f"  ⏭️ Skipped (duplicate): {ref}")
+        
+        if indexed:
+            try:
+                search_index.upsert_many(indexed)
+            except Exception as e:
+                print(f"  ⚠️ Search index update failed: {e}")
+    
+    if added:
+        excel_writer.save()
+        try:
+            search_index.sync_status(excel_writer.log_statuses())
+        except Exception as e:
+            print(f"  ⚠️ Search index status sync failed: {e}")
+    
+    skipped += stats.rejected_total
+    if stats.rejected:
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in stats.rejected.most_common())
+        print(f"  ⚠️ Rejected {stats.rejected_total} of {stats.read} rows ({reasons})")
+        for row_number, reason in stats.examples:
+            print(f"     line {row_number}: {reason}")
     
     return added, skipped, results
 
@@ -105,20 +129,38 @@ def import_from_csv(csv_file: str) -> tuple:
 # MAIN
 # ==========================================================
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python import_csv.py <csv_file>")
-        print("\nExpected CSV columns:")
-        print("  ref, title, description, client, closing_date, source")
-        print("\nExample CSV:")
-        print('  ref,title,description,client,closing_date,source')
-        print('  T001,"Cooling tower chemicals","Supply of chemicals for cooling systems",Eskom,2025-12-15,Manual')
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Import tenders from CSV, JSONL, XLSX or a tender .json snapshot with automatic scoring",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Expected columns (other header names via importers.column_map in config.yaml):\n"
+            "  ref, title, description, client, closing_date, source\n\n"
+            "Example CSV:\n"
+            "  ref,title,description,client,closing_date,source\n"
+            '  T001,"Cooling tower chemicals","Supply of chemicals for cooling systems",Eskom,2025-12-15,Manual'
+        )
+    )
+    parser.add_argument("csv_file", help="File to import (.csv, .jsonl, .xlsx or .json)")
+    parser.add_argument("--sheet", default=None, help="Worksheet to read from an .xlsx (default: active sheet)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Rows written to the Excel log per batch (default: {BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Classification/scoring processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per worker task (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
     
-    csv_file = sys.argv[1]
-    print(f"\n�� Importing tenders from: {csv_file}")
+    csv_file = args.csv_file
+    print(f"\n📥 Importing tenders from: {csv_file}")
     print("=" * 50)
     
-    added, skipped, results = import_from_csv(csv_file)
+    added, skipped, results = import_from_csv(
+        csv_file,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        sheet=args.sheet
+    )
     
     print("=" * 50)
     print(f"\n📊 IMPORT SUMMARY:")
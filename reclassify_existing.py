@@ -2,66 +2,98 @@
 """
 Re-classify existing tenders with updated keyword rules
 """
+import argparse
 import json
-from classify_engine import classify_tender
-
-INPUT_PATH = "/Users/lazolasonqishe/Documents/MASTER/TENDERS/00_System/04_Automation/output/new_tenders.json"
-OUTPUT_PATH = INPUT_PATH  # Overwrite in place
-
-print("Loading existing tenders...")
-with open(INPUT_PATH) as f:
-    tenders = json.load(f)
-
-print(f"Found {len(tenders)} tenders\n")
-
-excluded_count = 0
-reclassified_count = 0
-kept_tenders = []
-
-for tender in tenders:
-    title = tender.get("title", "")
-    description = tender.get("description", "")
-    old_category = tender.get("category", "Unknown")
-    
-    # Re-classify
-    classification = classify_tender(title, description)
-    new_category = classification["category"]
-    
-    # Skip excluded tenders
-    if new_category == "EXCLUDED":
-        excluded_count += 1
-        reason = classification.get("reason", "")
-        print(f"[EXCLUDE] {tender.get('ref', 'N/A')}: {reason}")
-        continue
-    
-    # Update tender with new classification
-    if new_category != old_category:
-        reclassified_count += 1
-        print(f"[RECLASSIFY] {tender.get('ref', 'N/A')}: {old_category} → {new_category}")
-    
-    tender["category"] = new_category
-    tender["reason"] = classification.get("reason", "")
-    tender["short_title"] = classification.get("short_title", tender.get("short_title", ""))
-    
-    kept_tenders.append(tender)
-
-print(f"\n{'='*60}")
-print(f"Results:")
-print(f"  Total processed: {len(tenders)}")
-print(f"  Excluded: {excluded_count}")
-print(f"  Reclassified: {reclassified_count}")
-print(f"  Kept: {len(kept_tenders)}")
-print(f"{'='*60}\n")
-
-# Save updated tenders
-with open(OUTPUT_PATH, "w") as f:
-    json.dump(kept_tenders, f, indent=2)
-
-print(f"✅ Updated file saved to: {OUTPUT_PATH}")
-
-# Show new category breakdown
+import os
+import yaml
 from collections import Counter
-categories = Counter(t["category"] for t in kept_tenders)
-print(f"\nNew category breakdown:")
-for cat, count in categories.most_common():
-    print(f"  {cat}: {count}")
+
+from utils.backfill import DEFAULT_CHUNK_SIZE, reclassify_chunk, run_backfill
+from utils.importers import iter_raw_records
+
+config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+with open(config_path, "r") as f:
+    CONFIG = yaml.safe_load(f)
+
+INPUT_PATH = os.path.join(CONFIG["paths"]["output_dir"], "new_tenders.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-classify existing tenders with updated keyword rules")
+    parser.add_argument("--input", default=INPUT_PATH, help="Tender file (.json snapshot, .jsonl or .csv)")
+    parser.add_argument("--output", default=None, help="Where to write the result (default: overwrite a .json input)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Classification processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    output_path = args.output or args.input
+    if not output_path.lower().endswith(".json"):
+        parser.error("--output must be a .json file when the input is not a JSON snapshot")
+
+    # Keep the snapshot's {"meta", "tenders"} shape if it has one
+    meta = None
+    if args.input.lower().endswith(".json"):
+        with open(args.input) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            meta = data.get("meta")
+
+    print(f"Re-classifying tenders from {args.input}...\n")
+
+    total = 0
+    excluded_count = 0
+    reclassified_count = 0
+    kept_tenders = []
+
+    for tender, classification in run_backfill(iter_raw_records(args.input), reclassify_chunk,
+                                               workers=args.workers, chunk_size=args.chunk_size,
+                                               label="RECLASSIFY", batched=True):
+        total += 1
+        old_category = tender.get("category", "Unknown")
+        new_category = classification["category"]
+
+        # Skip excluded tenders
+        if new_category == "EXCLUDED":
+            excluded_count += 1
+            reason = classification.get("reason", "")
+            print(f"[EXCLUDE] {tender.get('ref', 'N/A')}: {reason}")
+            continue
+
+        # Update tender with new classification
+        if new_category != old_category:
+            reclassified_count += 1
+            print(f"[RECLASSIFY] {tender.get('ref', 'N/A')}: {old_category} → {new_category}")
+
+        tender["category"] = new_category
+        tender["reason"] = classification.get("reason", "")
+        tender["short_title"] = classification.get("short_title", tender.get("short_title", ""))
+
+        kept_tenders.append(tender)
+
+    print(f"\n{'='*60}")
+    print(f"Results:")
+    print(f"  Total processed: {total}")
+    print(f"  Excluded: {excluded_count}")
+    print(f"  Reclassified: {reclassified_count}")
+    print(f"  Kept: {len(kept_tenders)}")
+    print(f"{'='*60}\n")
+
+    # Save updated tenders
+    payload = {"meta": meta, "tenders": kept_tenders} if meta is not None else kept_tenders
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ Updated file saved to: {output_path}")
+
+    # Show new category breakdown
+    categories = Counter(t["category"] for t in kept_tenders)
+    print(f"\nNew category breakdown:")
+    for cat, count in categories.most_common():
+        print(f"  {cat}: {count}")
+
+
+if __name__ == "__main__":
+    main()
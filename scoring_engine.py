@@ -4,9 +4,67 @@
 # Fit, Industry, Risk, Revenue, TES/Phakathi Suitability
 # ==========================================================
 
+import os
 import re
 from datetime import datetime, timedelta
 
+import yaml
+
+# ----------------------------------------------------------
+# COMPOSITE WEIGHTS + PRIORITY THRESHOLDS
+# Read from config.yaml `scoring:`; these defaults apply to any
+# key the config leaves out
+# ----------------------------------------------------------
+DEFAULT_SCORING = {
+    "fit_weight": 0.30,
+    "industry_weight": 0.20,
+    "risk_weight": 0.15,
+    "revenue_weight": 0.20,
+    "suitability_weight": 0.15,
+    "high_threshold": 7.0,
+    "medium_threshold": 5.0,
+}
+
+# Weight key per composite dimension, in the order the what-if tool stacks them
+WEIGHT_KEYS = ("fit_weight", "industry_weight", "risk_weight", "revenue_weight", "suitability_weight")
+
+
+def load_scoring_config(config_path: str = None) -> dict:
+    """DEFAULT_SCORING overlaid with config.yaml's scoring section"""
+    config_path = config_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+    scoring = dict(DEFAULT_SCORING)
+    try:
+        with open(config_path, "r") as f:
+            section = (yaml.safe_load(f) or {}).get("scoring") or {}
+    except (OSError, yaml.YAMLError):
+        section = {}
+    for key in DEFAULT_SCORING:
+        if section.get(key) is not None:
+            scoring[key] = float(section[key])
+    return scoring
+
+
+SCORING = load_scoring_config()
+
+
+def dimension_scores(scores: dict) -> tuple:
+    """The five composite inputs of a score_tender() result, in WEIGHT_KEYS order"""
+    return (
+        scores["fit_score"],
+        scores["industry_score"],
+        scores["risk_score"],
+        scores["revenue_score"],
+        max(scores[f"{name}_suitability"] for name in COMPANY_PROFILES),
+    )
+
+
+def priority_for(composite: float, scoring: dict = None) -> str:
+    scoring = scoring or SCORING
+    if composite >= scoring["high_threshold"]:
+        return "HIGH"
+    return "MEDIUM" if composite >= scoring["medium_threshold"] else "LOW"
+
+
 # ----------------------------------------------------------
 # INDUSTRY SCORING WEIGHTS
 # Higher = more valuable for TES/Phakathi
@@ -137,16 +195,74 @@ PHAKATHI_MODERATE_FIT = [
     "valve", "pipe", "flange",
 ]
 
+# ----------------------------------------------------------
+# COMPANY PROFILES
+# One entry per business unit; adding a unit is adding an entry.
+#   keywords / weights : tiers summed into a 0..max_score suitability
+#   fit_labels         : suitability -> Strong / Moderate (else Weak)
+#   high/medium_threshold (optional): the unit's own priority cut-offs
+# Scores keep the flat <name>_suitability / <name>_fit keys.
+# ----------------------------------------------------------
+COMPANY_PROFILES = {
+    "tes": {
+        "label": "TES",
+        "keywords": {"strong": TES_STRONG_FIT, "moderate": TES_MODERATE_FIT},
+        "weights": {"strong": 2, "moderate": 1},
+        "max_score": 10,
+        "fit_labels": {"Strong": 6, "Moderate": 3},
+    },
+    "phakathi": {
+        "label": "Phakathi",
+        "keywords": {"strong": PHAKATHI_STRONG_FIT, "moderate": PHAKATHI_MODERATE_FIT},
+        "weights": {"strong": 2, "moderate": 1},
+        "max_score": 10,
+        "fit_labels": {"Strong": 6, "Moderate": 3},
+    },
+}
+
+
+class ProfileMatcher:
+    """
+    Every distinct profile keyword is tested against the text once; each
+    hit is credited to the (profile, tier) pairs that list it. Cost grows
+    with the number of distinct keywords, not profiles x keywords.
+    """
+
+    def __init__(self, profiles: dict):
+        self.profiles = profiles
+        self._targets = {}
+        for name, profile in profiles.items():
+            for tier, keywords in profile["keywords"].items():
+                for kw in keywords:
+                    self._targets.setdefault(kw, []).append((name, tier))
+        self._items = list(self._targets.items())
+
+    def hits(self, text: str) -> dict:
+        """{profile: {tier: keyword hits}} for lower-cased text"""
+        counts = {name: dict.fromkeys(p["keywords"], 0) for name, p in self.profiles.items()}
+        for targets in [t for kw, t in self._items if kw in text]:
+            for name, tier in targets:
+                counts[name][tier] += 1
+        return counts
+
+
+PROFILE_MATCHER = ProfileMatcher(COMPANY_PROFILES)
+
+
+def _profile_text(title: str, description: str) -> str:
+    return f"{title} {description}".lower()
+
 
 # ==========================================================
 # SCORING FUNCTIONS
 # ==========================================================
 
-def calculate_fit_score(title: str, description: str, category: str) -> dict:
+def calculate_fit_score(title: str, description: str, category: str, hits: dict = None) -> dict:
     """
-    Calculate overall fit score (1-10) based on TES/Phakathi alignment
+    Calculate overall fit score (1-10) based on company profile alignment
+    (hits: PROFILE_MATCHER.hits() for the same text, to skip re-matching)
     """
-    text = f"{title} {description}".lower()
+    hits = hits or PROFILE_MATCHER.hits(_profile_text(title, description))
     
     score = 5  # Base score
     reasons = []
@@ -162,23 +278,15 @@ def calculate_fit_score(title: str, description: str, category: str) -> dict:
         score += 3
         reasons.append("Dual TES+Phakathi opportunity")
     
-    # Strong fit keywords
-    tes_strong = sum(1 for kw in TES_STRONG_FIT if kw in text)
-    phakathi_strong = sum(1 for kw in PHAKATHI_STRONG_FIT if kw in text)
-    
-    if tes_strong >= 3:
-        score += 2
-        reasons.append(f"Strong TES alignment ({tes_strong} keywords)")
-    elif tes_strong >= 1:
-        score += 1
-        reasons.append(f"TES alignment ({tes_strong} keywords)")
-    
-    if phakathi_strong >= 3:
-        score += 2
-        reasons.append(f"Strong Phakathi alignment ({phakathi_strong} keywords)")
-    elif phakathi_strong >= 1:
-        score += 1
-        reasons.append(f"Phakathi alignment ({phakathi_strong} keywords)")
+    # Strong fit keywords, per company profile
+    for name, profile in COMPANY_PROFILES.items():
+        strong = hits[name].get("strong", 0)
+        if strong >= 3:
+            score += 2
+            reasons.append(f"Strong {profile['label']} alignment ({strong} keywords)")
+        elif strong >= 1:
+            score += 1
+            reasons.append(f"{profile['label']} alignment ({strong} keywords)")
     
     # Cap at 10
     score = min(10, max(1, score))
@@ -212,6 +320,12 @@ def calculate_industry_score(title: str, description: str, client: str) -> dict:
     }
 
 
+# Days-left thresholds for the deadline risk penalty (-2 / -1). Scores
+# depend on today's date through these; utils/deadline_timeline.py
+# re-scores tenders as they cross them.
+DEADLINE_RISK_DAYS = (7, 14)
+
+
 def calculate_risk_score(title: str, description: str, closing_date: str = "") -> dict:
     """
     Risk assessment (1-10, lower = higher risk)
@@ -251,10 +365,10 @@ def calculate_risk_score(title: str, description: str, closing_date: str = "") -
         try:
             close = datetime.strptime(closing_date, "%Y-%m-%d")
             days_left = (close - datetime.now()).days
-            if days_left < 7:
+            if days_left < DEADLINE_RISK_DAYS[0]:
                 score -= 2
                 risks.append(f"Tight deadline ({days_left} days)")
-            elif days_left < 14:
+            elif days_left < DEADLINE_RISK_DAYS[1]:
                 score -= 1
                 risks.append(f"Short timeline ({days_left} days)")
         except:
@@ -313,30 +427,45 @@ def calculate_revenue_score(title: str, description: str) -> dict:
     }
 
 
-def calculate_suitability_scores(title: str, description: str) -> dict:
+def calculate_suitability_scores(title: str, description: str, hits: dict = None) -> dict:
     """
-    Calculate TES and Phakathi suitability scores separately
+    Suitability (0-10) and fit label for every company profile
+    ({name}_suitability / {name}_fit keys)
     """
-    text = f"{title} {description}".lower()
-    
-    # TES Score
-    tes_score = 0
-    tes_strong = sum(1 for kw in TES_STRONG_FIT if kw in text)
-    tes_moderate = sum(1 for kw in TES_MODERATE_FIT if kw in text)
-    tes_score = min(10, tes_strong * 2 + tes_moderate)
-    
-    # Phakathi Score
-    phakathi_score = 0
-    phakathi_strong = sum(1 for kw in PHAKATHI_STRONG_FIT if kw in text)
-    phakathi_moderate = sum(1 for kw in PHAKATHI_MODERATE_FIT if kw in text)
-    phakathi_score = min(10, phakathi_strong * 2 + phakathi_moderate)
-    
-    return {
-        "tes_suitability": tes_score,
-        "tes_fit": "Strong" if tes_score >= 6 else "Moderate" if tes_score >= 3 else "Weak",
-        "phakathi_suitability": phakathi_score,
-        "phakathi_fit": "Strong" if phakathi_score >= 6 else "Moderate" if phakathi_score >= 3 else "Weak",
-    }
+    hits = hits or PROFILE_MATCHER.hits(_profile_text(title, description))
+    
+    result = {}
+    for name, profile in COMPANY_PROFILES.items():
+        raw = sum(hits[name][tier] * weight for tier, weight in profile["weights"].items())
+        score = min(profile["max_score"], raw)
+        fit = next((label for label, cutoff in profile["fit_labels"].items() if score >= cutoff), "Weak")
+        result[f"{name}_suitability"] = score
+        result[f"{name}_fit"] = fit
+    return result
+
+
+def profile_priorities(scores: dict, scoring: dict = None) -> dict:
+    """
+    Per-profile composite and priority: the shared dimensions plus that
+    unit's own suitability, against its own thresholds when it sets them
+    """
+    scoring = scoring or SCORING
+    base = sum(value * scoring[key] for value, key in zip(dimension_scores(scores)[:4], WEIGHT_KEYS))
+    result = {}
+    for name, profile in COMPANY_PROFILES.items():
+        suitability = scores[f"{name}_suitability"]
+        composite = base + suitability * scoring["suitability_weight"]
+        thresholds = {
+            "high_threshold": profile.get("high_threshold", scoring["high_threshold"]),
+            "medium_threshold": profile.get("medium_threshold", scoring["medium_threshold"]),
+        }
+        result[name] = {
+            "suitability": suitability,
+            "fit": scores[f"{name}_fit"],
+            "composite": round(composite, 1),
+            "priority": priority_for(composite, thresholds),
+        }
+    return result
 
 
 # ==========================================================
@@ -344,28 +473,29 @@ def calculate_suitability_scores(title: str, description: str) -> dict:
 # ==========================================================
 
 def score_tender(title: str, description: str, client: str = "", 
-                 closing_date: str = "", category: str = "Unknown") -> dict:
+                 closing_date: str = "", category: str = "Unknown", scoring: dict = None) -> dict:
     """
     Generate complete tender score report
     Returns all scores and a composite priority score
+    (weights and thresholds from `scoring`, default the config's)
     """
+    scoring = scoring or SCORING
+    
+    # One keyword pass shared by fit and every company profile
+    hits = PROFILE_MATCHER.hits(_profile_text(title, description))
     
-    fit = calculate_fit_score(title, description, category)
+    fit = calculate_fit_score(title, description, category, hits)
     industry = calculate_industry_score(title, description, client)
     risk = calculate_risk_score(title, description, closing_date)
     revenue = calculate_revenue_score(title, description)
-    suitability = calculate_suitability_scores(title, description)
+    suitability = calculate_suitability_scores(title, description, hits)
     
     # Composite priority score (weighted average)
-    composite = (
-        fit["fit_score"] * 0.30 +          # 30% weight
-        industry["industry_score"] * 0.20 + # 20% weight
-        risk["risk_score"] * 0.15 +         # 15% weight
-        revenue["revenue_score"] * 0.20 +   # 20% weight
-        max(suitability["tes_suitability"], suitability["phakathi_suitability"]) * 0.15  # 15% weight
-    )
+    subscores = {**fit, **industry, **risk, **revenue, **suitability}
+    dimensions = dimension_scores(subscores)
+    composite = sum(value * scoring[key] for value, key in zip(dimensions, WEIGHT_KEYS))
     
-    priority = "HIGH" if composite >= 7 else "MEDIUM" if composite >= 5 else "LOW"
+    priority = priority_for(composite, scoring)
     
     return {
         # Individual scores
@@ -379,23 +509,31 @@ def score_tender(title: str, description: str, client: str = "",
         "composite": round(composite, 1),
         "composite_score": round(composite, 1),
         "priority": priority,
+        "profiles": profile_priorities(subscores, scoring),
         
         # Recommendation
-        "recommendation": generate_recommendation(fit, industry, risk, revenue, suitability, composite)
+        "recommendation": generate_recommendation(fit, industry, risk, revenue, suitability, composite, scoring)
     }
 
 
-def generate_recommendation(fit, industry, risk, revenue, suitability, composite):
-    """Generate actionable recommendation"""
+def generate_recommendation(fit, industry, risk, revenue, suitability, composite, scoring: dict = None):
+    """
+    Generate actionable recommendation, tiered on the priority thresholds
+    (HIGH -> bid, MEDIUM -> recommended; LOW tenders within half the
+    MEDIUM band of medium_threshold are still worth a look)
+    """
+    scoring = scoring or SCORING
+    priority = priority_for(composite, scoring)
+    consider_from = scoring["medium_threshold"] - (scoring["high_threshold"] - scoring["medium_threshold"]) / 2
     
-    if composite >= 8:
+    if priority == "HIGH":
         return "🔥 PRIORITY BID - Strong fit, pursue immediately"
-    elif composite >= 6:
+    elif priority == "MEDIUM":
         if risk["risk_level"] == "High":
             return "⚠️ REVIEW CAREFULLY - Good opportunity but high risk factors"
         return "✅ RECOMMENDED - Good opportunity, prepare bid"
-    elif composite >= 4:
-        if suitability["tes_suitability"] >= 6 or suitability["phakathi_suitability"] >= 6:
+    elif composite >= consider_from:
+        if any(suitability[f"{name}_suitability"] >= 6 for name in COMPANY_PROFILES):
             return "📋 CONSIDER - Core capability match despite moderate overall score"
         return "📝 EVALUATE - May be worth pursuing if capacity allows"
     else:
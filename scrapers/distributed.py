@@ -0,0 +1,265 @@
+# ==========================================================
+# DISTRIBUTED SCRAPING
+# A coordinator splits a scan into units (one per source, or
+# per page range for paged sources), enqueues them on the work
+# queue (utils/work_queue.py) and merges what the workers send
+# back. Workers - on this host or others pointed at the same
+# queue - lease one unit at a time and heartbeat while it runs.
+#
+#   python tools/scrape_workers.py work --processes 2
+#   scrape_distributed(only)  ->  (tenders, report)
+# ==========================================================
+
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.municipalities import MUNICIPALITY_SCRAPERS, municipality_names
+from scrapers.soes import SOE_SCRAPERS
+from utils.poll_scheduler import poll_scheduler
+from utils.source_health import source_health
+from utils.tender_collector import TenderCollector
+from utils.work_queue import DONE, FAILED, queue_config, work_queue
+
+
+# Selenium sources: name -> (module, function), imported only on the worker that runs them
+SELENIUM_SCRAPERS = {
+    "National Treasury": ("scrapers.national_treasury_selenium", "scrape_national_treasury"),
+    "Johannesburg Water": ("scrapers.joburg_water_selenium", "scrape_joburg_water_selenium"),
+    "Eskom Tender Bulletin": ("scrapers.eskom_direct", "scrape_eskom_tenders"),
+}
+
+# Sources whose listing is paged: name -> pages scanned per run
+PAGED_SOURCES = {
+    "Eskom Tender Bulletin": 5,
+}
+
+RUN_DEFAULTS = {
+    "local_workers": 1,           # worker threads the coordinator runs itself (0 = remote workers only)
+    "pages_per_job": 2,
+    "run_timeout_minutes": 45,    # give up on units still unfinished after this
+    "poll_seconds": 2,            # idle workers / the coordinator re-check the queue this often
+    "municipality_timeout": 15,
+}
+
+
+def run_settings() -> dict:
+    return {**RUN_DEFAULTS, **queue_config()}
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ----------------------------------------------------------
+# UNITS
+# ----------------------------------------------------------
+def plan_units(only=None, selenium: bool = True, pages_per_job: int = None) -> list:
+    """Work units for a scan: {"source": name} or {"source": name, "pages": [first, last]}"""
+    pages_per_job = pages_per_job or RUN_DEFAULTS["pages_per_job"]
+    names = municipality_names() + [name for name, _ in SOE_SCRAPERS]
+    if selenium:
+        names.extend(SELENIUM_SCRAPERS)
+    else:   # SOE_SCRAPERS also routes Johannesburg Water through Chrome
+        names = [name for name in names if name not in SELENIUM_SCRAPERS]
+    units = []
+    for name in dict.fromkeys(names):
+        if only is not None and name not in only:
+            continue
+        total = PAGED_SOURCES.get(name)
+        if not total:
+            units.append({"source": name})
+            continue
+        for first in range(1, total + 1, pages_per_job):
+            units.append({"source": name, "pages": [first, min(first + pages_per_job - 1, total)]})
+    return units
+
+
+def _scraper_for(name: str, timeout: int):
+    for cls in MUNICIPALITY_SCRAPERS:
+        scraper = cls(timeout)
+        if scraper.name == name:
+            return lambda unit: scraper.run()
+    soes = dict(SOE_SCRAPERS)
+    if name in soes:
+        return lambda unit: soes[name]()
+    if name in SELENIUM_SCRAPERS:
+        module_name, func_name = SELENIUM_SCRAPERS[name]
+        module = __import__(module_name, fromlist=[func_name])
+        func = getattr(module, func_name)
+        if name not in PAGED_SOURCES:
+            return lambda unit: func()
+
+        def paged(unit):
+            if not unit.get("pages"):
+                return func()
+            first, last = unit["pages"]
+            return func(max_tenders=module.PAGE_SIZE * (last - first + 1), pages=(first, last))
+        return paged
+    raise ValueError(f"Unknown source: {name}")
+
+
+def run_unit(unit: dict, timeout: int = None) -> dict:
+    """
+    Scrape one unit on this host. Health is tracked against this host's
+    state file; change-rate observations are left to the coordinator,
+    which sees every page of a source.
+    """
+    name = unit["source"]
+    health = source_health()
+    if not health.allow(name):
+        return {"tenders": [], "skipped": True, "seconds": 0.0}
+    start = time.monotonic()
+    try:
+        tenders = _scraper_for(name, timeout or RUN_DEFAULTS["municipality_timeout"])(unit)
+    finally:
+        health.save()
+    return {"tenders": tenders or [], "skipped": False, "seconds": round(time.monotonic() - start, 2)}
+
+
+# ----------------------------------------------------------
+# WORKER
+# ----------------------------------------------------------
+def _heartbeat(queue, job_id, worker, every, stop):
+    while not stop.wait(every):
+        if not queue.heartbeat(job_id, worker):
+            print(f"[WORKER {worker}] Lost lease on job {job_id}")
+            return
+
+
+def run_worker(queue=None, worker: str = None, stop=None, idle_exit: float = None, settings: dict = None) -> int:
+    """
+    Lease and run units until `stop` is set (or, with idle_exit, once the
+    queue has been empty that many seconds). Returns units completed.
+    """
+    queue = queue or work_queue()
+    settings = {**run_settings(), **(settings or {})}
+    worker = worker or worker_name()
+    stop = stop or threading.Event()
+    completed = 0
+    idle_since = time.monotonic()
+
+    while not stop.is_set():
+        job = queue.lease(worker)
+        if job is None:
+            if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                break
+            stop.wait(settings["poll_seconds"])
+            continue
+
+        unit = job["payload"]
+        label = unit["source"] + (" pages {}-{}".format(*unit["pages"]) if unit.get("pages") else "")
+        print(f"[WORKER {worker}] {label} (attempt {job['attempts']})")
+        beating = threading.Event()
+        beat = threading.Thread(
+            target=_heartbeat,
+            args=(queue, job["id"], worker, settings["heartbeat_seconds"], beating),
+            daemon=True,
+        )
+        beat.start()
+        try:
+            result = run_unit(unit, settings["municipality_timeout"])
+        except Exception as e:
+            beating.set()
+            queue.fail(job["id"], worker, f"{type(e).__name__}: {e}")
+            print(f"[WORKER {worker}] {label} failed: {e}")
+        else:
+            beating.set()
+            if queue.complete(job["id"], worker, result):
+                completed += 1
+                print(f"[WORKER {worker}] {label}: {len(result['tenders'])} tenders")
+            else:
+                print(f"[WORKER {worker}] {label}: result dropped (lease lost to another worker)")
+        beat.join()
+        idle_since = time.monotonic()
+
+    return completed
+
+
+# ----------------------------------------------------------
+# COORDINATOR
+# ----------------------------------------------------------
+def scrape_distributed(only=None, selenium: bool = True, queue=None, settings: dict = None) -> tuple:
+    """
+    Enqueue a scan, wait for the workers and merge their results.
+    Returns (tenders, report); units unfinished at run_timeout_minutes
+    are dropped from the queue and listed in the report.
+    """
+    queue = queue or work_queue()
+    settings = {**run_settings(), **(settings or {})}
+    run_id = f"scrape-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    units = plan_units(only, selenium, settings["pages_per_job"])
+    queue.enqueue(run_id, units)
+    print(f"[COORDINATOR] {run_id}: {len(units)} units queued")
+
+    stop = threading.Event()
+    local = [
+        threading.Thread(
+            target=run_worker,
+            kwargs={"queue": queue, "worker": f"{worker_name()}:local{i}", "stop": stop, "settings": settings},
+            daemon=True,
+        )
+        for i in range(int(settings["local_workers"]))
+    ]
+    for thread in local:
+        thread.start()
+
+    deadline = time.monotonic() + settings["run_timeout_minutes"] * 60
+    try:
+        while True:
+            status = queue.run_status(run_id)
+            if status[DONE] + status[FAILED] >= status["total"] or time.monotonic() >= deadline:
+                break
+            time.sleep(settings["poll_seconds"])
+    finally:
+        stop.set()
+        for thread in local:
+            thread.join()
+
+    tenders, report = merge_results(run_id, queue.results(run_id))
+    queue.purge(run_id)
+    return tenders, report
+
+
+def merge_results(run_id: str, jobs: list) -> tuple:
+    """Dedupe unit results in plan order and record one poll observation per fully scraped source"""
+    merged = TenderCollector()
+    by_source = {}
+    report = {"run_id": run_id, "units": len(jobs), "done": 0, "failed": [], "unfinished": [],
+              "skipped": [], "workers": set()}
+
+    for job in jobs:
+        name = job["payload"]["source"]
+        source = by_source.setdefault(name, {"tenders": [], "complete": True})
+        if job["worker"]:
+            report["workers"].add(job["worker"].rsplit(":local", 1)[0])
+        if job["status"] != DONE:
+            source["complete"] = False
+            bucket = report["failed"] if job["status"] == FAILED else report["unfinished"]
+            bucket.append({"source": name, "pages": job["payload"].get("pages"), "error": job["error"]})
+            continue
+        report["done"] += 1
+        result = job["result"] or {}
+        if result.get("skipped"):
+            source["complete"] = False
+            report["skipped"].append(name)
+            continue
+        source["tenders"].extend(result.get("tenders") or [])
+
+    # Every source in the run counts as polled; only complete listings feed its change rate
+    scheduler = poll_scheduler()
+    for name, source in by_source.items():
+        merged.extend(source["tenders"])
+        scheduler.observe(name, source["tenders"] if source["complete"] else [])
+    scheduler.save()
+
+    report["workers"] = sorted(report["workers"])
+    report["skipped"] = sorted(set(report["skipped"]))
+    report["duplicates"] = merged.duplicates
+    return merged.to_list(), report
@@ -0,0 +1,184 @@
+# ==========================================================
+# DETAIL-PAGE ENRICHMENT (phase 2 of a scrape)
+# Listing scrapers stay cheap: they emit what the listing
+# shows plus an optional "detail_url". This stage fetches
+# detail pages only for tenders that survive exclusion and
+# are not already in the tender log - concurrently, with a
+# per-host cap so no portal gets hammered.
+# ==========================================================
+
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import requests
+import urllib3
+from bs4 import BeautifulSoup
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from classify_engine import classify_tender, clean, should_exclude
+from utils.pdf_tools import is_pdf_url
+from utils.tender_collector import title_client_key
+
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+MAX_WORKERS = 8
+PER_HOST = 2
+TIMEOUT = 15
+MAX_DETAIL_CHARS = 3000
+
+DOCUMENT_EXTENSIONS = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".zip")
+CLOSING_PATTERN = re.compile(
+    r"closing\s*(?:date)?\s*[:\-]?\s*(\d{1,2}[-/ ]\w{2,9}[-/ ]\d{2,4}|\d{4}-\d{2}-\d{2})",
+    re.IGNORECASE,
+)
+
+
+# ----------------------------------------------------------
+# SELECTION
+# ----------------------------------------------------------
+def needs_enrichment(tender: dict, known_refs: set, known_titles: set = frozenset()) -> bool:
+    """
+    Only tenders with a detail page, that the listing text does not
+    already exclude, and that are not already in the tender log - by
+    reference, or by title + client for rows whose ref the scraper
+    generated (those change every run).
+    """
+    detail_url = tender.get("detail_url")
+    if not detail_url:
+        return False
+    if tender.get("category") == "EXCLUDED":
+        return False
+    excluded, _ = should_exclude(clean(f"{tender.get('title', '')} {tender.get('description', '')}"))
+    if excluded:
+        return False
+    if title_client_key(tender.get("title"), tender.get("client")) in known_titles:
+        return False
+    ref = str(tender.get("ref") or "").strip().upper()
+    return not (ref and ref in known_refs)
+
+
+# ----------------------------------------------------------
+# DETAIL PAGE PARSING
+# ----------------------------------------------------------
+def parse_detail_page(html: str, base_url: str) -> dict:
+    """Generic detail parser: main text, closing date and document links"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "form"]):
+        tag.decompose()
+
+    main = soup.find("main") or soup.find("article") or soup.body or soup
+    text = re.sub(r"\s+", " ", main.get_text(" ", strip=True))[:MAX_DETAIL_CHARS]
+
+    documents = []
+    for link in main.find_all("a", href=True):
+        href = urljoin(base_url, link["href"])
+        if urlsplit(href).path.lower().endswith(DOCUMENT_EXTENSIONS):
+            documents.append(href)
+
+    closing = CLOSING_PATTERN.search(text)
+    return {
+        "text": text,
+        "documents": list(dict.fromkeys(documents)),
+        "closing_date": closing.group(1) if closing else "",
+    }
+
+
+# ----------------------------------------------------------
+# ENRICHMENT STAGE
+# ----------------------------------------------------------
+class DetailEnricher:
+    """Fetches detail pages with a global worker cap and a per-host semaphore"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, per_host: int = PER_HOST, timeout: int = TIMEOUT):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._local = threading.local()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            self._local.session = session
+        return session
+
+    def _enrich_one(self, tender: dict) -> bool:
+        url = tender["detail_url"]
+
+        # A PDF "detail page" is a tender document - leave it for the document stage
+        if is_pdf_url(url):
+            tender.setdefault("documents", [])
+            if url not in tender["documents"]:
+                tender["documents"].append(url)
+            return False
+
+        try:
+            with self._host_slot(url):
+                resp = self._session().get(url, timeout=self.timeout, verify=False)
+            if resp.status_code != 200:
+                return False
+            detail = parse_detail_page(resp.text, url)
+        except Exception as e:
+            print(f"    Detail page failed for {tender.get('ref')}: {e}")
+            return False
+
+        if detail["text"]:
+            listing = tender.get("description", "")
+            if detail["text"] not in listing:
+                tender["description"] = f"{listing} {detail['text']}".strip()
+        if detail["documents"]:
+            existing = tender.get("documents") or []
+            tender["documents"] = list(dict.fromkeys(existing + detail["documents"]))
+        if detail["closing_date"] and not tender.get("closing_date"):
+            tender["closing_date"] = detail["closing_date"]
+
+        # Re-classify with the richer text (listing-based exclusion already passed)
+        classification = classify_tender(tender.get("title", ""), tender["description"])
+        if classification["category"] != "EXCLUDED":
+            tender["category"] = classification["category"]
+            tender["reason"] = classification.get("reason", "")
+            tender["short_title"] = classification.get("short_title", tender.get("short_title", "Tender"))
+        tender["enriched"] = True
+        return True
+
+    def enrich(self, tenders: list, known_refs: set = None, known_titles: set = None) -> dict:
+        """Enrich tenders in place; returns counters for logging"""
+        known_refs = known_refs or set()
+        known_titles = known_titles or set()
+        selected = [t for t in tenders if needs_enrichment(t, known_refs, known_titles)]
+        stats = {
+            "with_detail": sum(1 for t in tenders if t.get("detail_url")),
+            "selected": len(selected),
+            "enriched": 0,
+        }
+        if selected:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(selected)),
+                                    thread_name_prefix="detail") as pool:
+                stats["enriched"] = sum(pool.map(self._enrich_one, selected))
+        stats["skipped"] = stats["with_detail"] - stats["selected"]
+        return stats
+
+
+def enrich_tenders(tenders: list, known_refs: set = None, known_titles: set = None) -> dict:
+    """Phase 2 entry point used by tenderscan.run_all_scrapers()"""
+    return DetailEnricher().enrich(tenders, known_refs, known_titles)
@@ -20,13 +20,22 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from classify_engine import classify_tender
+from utils.browser_pool import browser_pool
+from utils.source_health import source_health
+from utils.tender_collector import TenderCollector
 
 
-def scrape_eskom_tenders(max_tenders=50):
+PAGE_SIZE = 20      # results per page when paging through the bulletin
+MAX_PAGES = 5       # Limit to prevent infinite loops
+
+
+def scrape_eskom_tenders(max_tenders=50, pages=None):
     """
-    Scrape tenders directly from Eskom's tender bulletin portal
+    Scrape tenders directly from Eskom's tender bulletin portal.
+    pages=(first, last) scrapes just that page range (PAGE_SIZE per page),
+    so distributed workers can split the bulletin between them.
     """
-    tenders = []
+    tenders = TenderCollector(limit=max_tenders)
     driver = None
     
     try:
@@ -44,16 +53,19 @@ def scrape_eskom_tenders(max_tenders=50):
         if not os.path.exists(chromedriver_path):
             chromedriver_path = None
         
-        if chromedriver_path:
-            service = Service(chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        else:
-            driver = webdriver.Chrome(options=chrome_options)
+        def new_driver():
+            if chromedriver_path:
+                return webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
+            return webdriver.Chrome(options=chrome_options)
+        
+        driver = browser_pool().acquire("eskom_bulletin", new_driver)
         
         # Navigate to Eskom tender bulletin - use search page which has all opportunities
         # Use large page size to get all tenders at once (they have ~60-80 active tenders)
         url = "https://tenderbulletin.eskom.co.za/search?pageSize=100&page=1"
-        driver.get(url)
+        if pages:
+            url = f"https://tenderbulletin.eskom.co.za/search?pageSize={PAGE_SIZE}&page={pages[0]}"
+        source_health().load_page("Eskom Tender Bulletin", driver, url, default_timeout=60)
         
         # Wait for page to load
         wait = WebDriverWait(driver, 20)
@@ -69,8 +81,7 @@ def scrape_eskom_tenders(max_tenders=50):
             print(f"   ⚠️ Content did not load as expected")
         
         # Scrape multiple pages
-        page_num = 1
-        max_pages = 5  # Limit to prevent infinite loops
+        page_num, max_pages = pages or (1, MAX_PAGES)
         
         while page_num <= max_pages and len(tenders) < max_tenders:
             print(f"   📄 Scraping page {page_num}...")
@@ -118,12 +129,6 @@ def scrape_eskom_tenders(max_tenders=50):
                     
                     ref = ref_match.group(0).strip()
                     
-                    # Skip if already have this tender
-                    if any(t["ref"] == ref for t in tenders):
-                        continue
-                    
-                    print(f"   Found ref: {ref}")
-                    
                     # Get title - usually first substantial text line
                     lines = element_text.split('\n')
                     title = ""
@@ -136,6 +141,12 @@ def scrape_eskom_tenders(max_tenders=50):
                     if not title or len(title) < 15:
                         title = element_text[:100]
                     
+                    # Skip if already have this tender (same ref + title the tender is added with)
+                    if tenders.seen(ref, title[:100]):
+                        continue
+                    
+                    print(f"   Found ref: {ref}")
+                    
                     # Try to find link
                     try:
                         link_elem = element.find_element(By.TAG_NAME, "a")
@@ -169,7 +180,7 @@ def scrape_eskom_tenders(max_tenders=50):
                     tender["category"] = classification["category"]
                     tender["reason"] = classification.get("reason", "")
                     
-                    tenders.append(tender)
+                    tenders.add(tender)
                     count_this_page += 1
                     print(f"   ✓ Tender {len(tenders)}: {ref} - {title[:50]}")
                     
@@ -184,10 +195,10 @@ def scrape_eskom_tenders(max_tenders=50):
             print(f"   Found {count_this_page} tenders on page {page_num}")
             
             # Navigate to next page by URL
-            if len(tenders) < max_tenders:
+            if len(tenders) < max_tenders and page_num < max_pages:
                 try:
                     page_num += 1
-                    next_url = f"https://tenderbulletin.eskom.co.za/search?pageSize=20&page={page_num}"
+                    next_url = f"https://tenderbulletin.eskom.co.za/search?pageSize={PAGE_SIZE}&page={page_num}"
                     print(f"   Loading page {page_num}...")
                     driver.get(next_url)
                     time.sleep(5)  # Wait for page to load
@@ -203,16 +214,15 @@ def scrape_eskom_tenders(max_tenders=50):
             else:
                 break
         
-        driver.quit()
+        browser_pool().release("eskom_bulletin", driver)
         
     except Exception as e:
         print(f"   ⚠️ Error scraping Eskom: {e}")
         traceback.print_exc()
-        if driver:
-            driver.quit()
+        browser_pool().release("eskom_bulletin", driver, broken=True)
     
     print(f"✅ Eskom: {len(tenders)} tenders found\n")
-    return tenders
+    return tenders.to_list()
 
 
 if __name__ == "__main__":
@@ -12,10 +12,14 @@ from bs4 import BeautifulSoup
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from classify_engine import classify_tender
+from utils.browser_pool import browser_pool
+from utils.source_health import source_health
+from utils.tender_collector import TenderCollector
 
 def scrape_joburg_water_selenium():
     """Scrape Johannesburg Water using Selenium for JS-rendered content"""
-    tenders = []
+    tenders = TenderCollector()
+    driver = None
     
     try:
         from selenium import webdriver
@@ -28,11 +32,10 @@ def scrape_joburg_water_selenium():
         options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--disable-gpu')
         
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(30)
+        driver = browser_pool().acquire("joburg_water", lambda: webdriver.Chrome(options=options))
         
         url = "https://www.johannesburgwater.co.za/tenders/"
-        driver.get(url)
+        source_health().load_page("Johannesburg Water", driver, url, default_timeout=30)
         time.sleep(6)  # Wait for DataTable to load
         
         html = driver.page_source
@@ -124,11 +127,11 @@ def scrape_joburg_water_selenium():
                                     tender_url = pdf_url
                                     break
                         
-                        if desc:  # Only add if we have a description
+                        if desc and not tenders.seen(ref, desc[:150]):  # Only add new tenders with a description
                             classification = classify_tender(desc, f"{cat} {desc}")
                             
                             if classification["category"] != "Exclude":
-                                tenders.append({
+                                tenders.add({
                                     "ref": ref,
                                     "title": desc[:150],
                                     "description": f"Category: {cat}. {desc}",
@@ -151,20 +154,13 @@ def scrape_joburg_water_selenium():
                         if date_match:
                             current_tender["closing_date"] = date_match.group(1)
         
-        driver.quit()
+        browser_pool().release("joburg_water", driver)
         
     except Exception as e:
+        browser_pool().release("joburg_water", driver, broken=True)
         print(f"    Johannesburg Water Selenium error: {e}")
     
-    # Deduplicate by reference
-    seen = set()
-    unique = []
-    for t in tenders:
-        if t["ref"] not in seen:
-            seen.add(t["ref"])
-            unique.append(t)
-    
-    return unique
+    return tenders.to_list()
 
 
 if __name__ == "__main__":
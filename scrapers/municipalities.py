@@ -3,7 +3,6 @@
 # Static HTML scrapers for SA municipalities
 # ==========================================================
 
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import traceback
@@ -14,6 +13,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.text_cleaner import clean_text
 from classify_engine import classify_tender
+from utils.poll_scheduler import poll_scheduler
+from utils.source_health import source_health
+from utils.tender_collector import TenderCollector
 
 
 class BaseMunicipalityScraper:
@@ -29,7 +31,8 @@ class BaseMunicipalityScraper:
     
     def fetch_page(self):
         try:
-            response = requests.get(self.url, headers=self.headers, timeout=self.timeout, verify=False)
+            response = source_health().get(self.name, self.url, default_timeout=self.timeout,
+                                           headers=self.headers, verify=False)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -63,7 +66,7 @@ class EkurhuleniScraper(BaseMunicipalityScraper):
     
     def parse_tenders(self, html: str):
         soup = BeautifulSoup(html, "html.parser")
-        tenders = []
+        tenders = TenderCollector()
         
         # Look for tender tables or lists
         for selector in ["table tbody tr", ".tender-item", "article", ".post"]:
@@ -90,7 +93,7 @@ class EkurhuleniScraper(BaseMunicipalityScraper):
                 
                 classification = classify_tender(title, title)
                 
-                tenders.append({
+                tenders.add({
                     "ref": ref,
                     "title": title,
                     "short_title": classification["short_title"],
@@ -105,7 +108,7 @@ class EkurhuleniScraper(BaseMunicipalityScraper):
             except Exception:
                 continue
         
-        return tenders
+        return tenders.to_list()
 
 
 # ===========================================================
@@ -122,7 +125,7 @@ class TshwaneScraper(BaseMunicipalityScraper):
     
     def parse_tenders(self, html: str):
         soup = BeautifulSoup(html, "html.parser")
-        tenders = []
+        tenders = TenderCollector()
         
         # Tshwane uses SharePoint-style lists
         for selector in ["table tbody tr", ".ms-listviewtable tr", ".tender", "li"]:
@@ -148,7 +151,7 @@ class TshwaneScraper(BaseMunicipalityScraper):
                 
                 classification = classify_tender(title, title)
                 
-                tenders.append({
+                tenders.add({
                     "ref": ref if 'ref' in locals() else "TSH",
                     "title": title,
                     "short_title": classification["short_title"],
@@ -163,7 +166,7 @@ class TshwaneScraper(BaseMunicipalityScraper):
             except Exception:
                 continue
         
-        return tenders
+        return tenders.to_list()
 
 
 # ===========================================================
@@ -180,7 +183,7 @@ class CapeTownScraper(BaseMunicipalityScraper):
     
     def parse_tenders(self, html: str):
         soup = BeautifulSoup(html, "html.parser")
-        tenders = []
+        tenders = TenderCollector()
         
         # Cape Town uses accordion/list style
         for selector in [".accordion-item", ".tender-item", "table tbody tr", ".list-item", "article"]:
@@ -203,7 +206,7 @@ class CapeTownScraper(BaseMunicipalityScraper):
                 
                 classification = classify_tender(title, title)
                 
-                tenders.append({
+                tenders.add({
                     "ref": ref,
                     "title": title,
                     "short_title": classification["short_title"],
@@ -218,7 +221,7 @@ class CapeTownScraper(BaseMunicipalityScraper):
             except Exception:
                 continue
         
-        return tenders
+        return tenders.to_list()
 
 
 # ===========================================================
@@ -235,7 +238,7 @@ class EthekwiniScraper(BaseMunicipalityScraper):
     
     def parse_tenders(self, html: str):
         soup = BeautifulSoup(html, "html.parser")
-        tenders = []
+        tenders = TenderCollector()
         
         for selector in ["table tbody tr", ".tender", "article", ".content-item"]:
             rows = soup.select(selector)
@@ -252,7 +255,7 @@ class EthekwiniScraper(BaseMunicipalityScraper):
                 
                 classification = classify_tender(title, title)
                 
-                tenders.append({
+                tenders.add({
                     "ref": "ETH",
                     "title": title,
                     "short_title": classification["short_title"],
@@ -267,35 +270,47 @@ class EthekwiniScraper(BaseMunicipalityScraper):
             except Exception:
                 continue
         
-        return tenders
+        return tenders.to_list()
 
 
 # ===========================================================
 # AGGREGATOR - RUN ALL MUNICIPALITIES
 # ===========================================================
-def scrape_all_municipalities(timeout: int = 15):
-    """Run all municipality scrapers and aggregate results"""
+MUNICIPALITY_SCRAPERS = (EkurhuleniScraper, TshwaneScraper, CapeTownScraper, EthekwiniScraper)
+
+
+def municipality_names() -> list:
+    return [cls().name for cls in MUNICIPALITY_SCRAPERS]
+
+
+def scrape_all_municipalities(timeout: int = 15, only=None):
+    """Run all municipality scrapers (or just the names in `only`) and aggregate results"""
     
-    scrapers = [
-        EkurhuleniScraper(timeout),
-        TshwaneScraper(timeout),
-        CapeTownScraper(timeout),
-        EthekwiniScraper(timeout),
-    ]
+    scrapers = [cls(timeout) for cls in MUNICIPALITY_SCRAPERS]
+    scrapers = [scraper for scraper in scrapers if only is None or scraper.name in only]
     
-    all_tenders = []
+    all_tenders = TenderCollector()
+    health = source_health()
     
     for scraper in scrapers:
+        if not health.allow(scraper.name):
+            print(f"Skipping {scraper.name} (circuit open after repeated failures)")
+            poll_scheduler().defer(scraper.name, health.retry_at(scraper.name))
+            continue
         try:
             print(f"Scraping {scraper.name}...")
             tenders = scraper.run()
             all_tenders.extend(tenders)
+            poll_scheduler().observe(scraper.name, tenders)
             print(f"  Found {len(tenders)} tenders")
         except Exception as e:
             print(f"  Error: {e}")
+            poll_scheduler().observe(scraper.name, [])
             continue
     
-    return all_tenders
+    health.save()
+    poll_scheduler().save()
+    return all_tenders.to_list()
 
 
 # ===========================================================
@@ -23,6 +23,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from classify_engine import classify_tender
+from utils.browser_pool import browser_pool
+from utils.source_health import source_health
+from utils.tender_collector import TenderCollector
 from tools.chromedriver_manager import (
     get_driver_path, verify_driver_alignment, setup_environment, print_driver_info
 )
@@ -47,9 +50,13 @@ class NationalTreasuryScraper:
     def __init__(self, headless: bool = True):
         self.headless = headless
         self.driver = None
-        self.tenders = []
+        self.tenders = TenderCollector()
     
     def _setup_driver(self):
+        """Chrome WebDriver from the browser pool (warm in daemon mode)"""
+        self.driver = browser_pool().acquire("national_treasury", self._new_driver)
+    
+    def _new_driver(self):
         """Initialize Chrome WebDriver with version verification"""
         # Verify versions before starting
         aligned, chrome_major, driver_major, msg = verify_driver_alignment()
@@ -83,13 +90,14 @@ class NationalTreasuryScraper:
         
         # Use isolated driver with Service
         service = Service(driver_path)
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.driver.set_page_load_timeout(30)
+        driver = webdriver.Chrome(service=service, options=options)
+        driver.set_page_load_timeout(30)
+        return driver
     
     def _close_driver(self):
-        """Close browser"""
+        """Close browser (or hand it back to the pool)"""
         if self.driver:
-            self.driver.quit()
+            browser_pool().release("national_treasury", self.driver)
             self.driver = None
     
     def _parse_closing_date(self, date_str: str) -> str:
@@ -117,9 +125,10 @@ class NationalTreasuryScraper:
         except:
             return ""
     
-    def _scrape_opportunities_page(self) -> list:
-        """Scrape the opportunities listing page"""
-        tenders = []
+    def _scrape_opportunities_page(self) -> int:
+        """Scrape the opportunities listing page; returns how many new tenders were collected"""
+        tenders = self.tenders
+        before = len(tenders)
         
         try:
             # Wait for content to load
@@ -153,6 +162,10 @@ class NationalTreasuryScraper:
                                     ref = t
                                     break
                             
+                            ref = ref or tenders.placeholder_ref("NT")
+                            if tenders.seen(ref, title[:200]):
+                                continue
+                            
                             # Look for client/department
                             client = ""
                             for t in texts:
@@ -170,8 +183,8 @@ class NationalTreasuryScraper:
                             
                             classification = classify_tender(title, title)
                             
-                            tenders.append({
-                                "ref": ref or f"NT-{datetime.now().strftime('%H%M%S')}",
+                            tenders.add({
+                                "ref": ref,
                                 "title": title[:200],
                                 "description": title,
                                 "client": client or "National Treasury",
@@ -194,10 +207,12 @@ class NationalTreasuryScraper:
                     
                     # Look for tender-related links
                     if len(text) > 30 and ("tender" in href.lower() or "bid" in href.lower() or "rfq" in href.lower()):
+                        if tenders.seen("", text[:200]):
+                            continue
                         classification = classify_tender(text, text)
                         
-                        tenders.append({
-                            "ref": f"NT-{datetime.now().strftime('%H%M%S')}",
+                        tenders.add({
+                            "ref": tenders.placeholder_ref("NT"),
                             "title": text[:200],
                             "description": text,
                             "client": "National Treasury",
@@ -214,7 +229,7 @@ class NationalTreasuryScraper:
         except Exception as e:
             print(f"   ⚠️ Error: {e}")
         
-        return tenders
+        return len(tenders) - before
     
     def scrape(self) -> list:
         """Main scraping function"""
@@ -228,13 +243,12 @@ class NationalTreasuryScraper:
                 print(f"\n🌐 Loading: {url}")
                 
                 try:
-                    self.driver.get(url)
+                    source_health().load_page("National Treasury", self.driver, url, default_timeout=30)
                     time.sleep(3)
                     
-                    page_tenders = self._scrape_opportunities_page()
-                    self.tenders.extend(page_tenders)
+                    added = self._scrape_opportunities_page()
                     
-                    print(f"   Found {len(page_tenders)} tenders")
+                    print(f"   Found {added} new tenders")
                     
                 except Exception as e:
                     print(f"   ⚠️ Failed to load: {e}")
@@ -246,25 +260,16 @@ class NationalTreasuryScraper:
         finally:
             self._close_driver()
         
-        # Remove duplicates
-        seen = set()
-        unique = []
-        for t in self.tenders:
-            key = t["title"][:50]
-            if key not in seen:
-                seen.add(key)
-                unique.append(t)
-        
-        self.tenders = unique
+        tenders = self.tenders.to_list()
         
         # Count relevant
-        relevant = [t for t in self.tenders if t["category"] in ["TES", "Phakathi", "Both"]]
+        relevant = [t for t in tenders if t["category"] in ["TES", "Phakathi", "Both"]]
         
         print(f"\n📊 Results:")
-        print(f"   Total scraped: {len(self.tenders)}")
+        print(f"   Total scraped: {len(tenders)} ({self.tenders.duplicates} duplicates dropped)")
         print(f"   TES/Phakathi:  {len(relevant)}")
         
-        return self.tenders
+        return tenders
 
 
 def scrape_national_treasury() -> list:
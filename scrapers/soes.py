@@ -3,7 +3,6 @@
 # Updated 27 November 2025 - FIXED URLs from screenshots
 # ==========================================================
 
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
@@ -16,6 +15,9 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from classify_engine import classify_tender
+from utils.poll_scheduler import poll_scheduler
+from utils.source_health import source_health
+from utils.tender_collector import TenderCollector
 
 # Import Selenium version for Johannesburg Water
 try:
@@ -35,11 +37,12 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
-def _scrape_soe_generic(client_name, urls, row_selector, ref_pattern, ref_prefix):
-    tenders = []
+def _scrape_soe_generic(client_name, urls, row_selector, ref_pattern, source=None):
+    """source: the SOE_SCRAPERS name health is tracked under (defaults to client_name)"""
+    tenders = TenderCollector()
     for url in urls:
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+            resp = source_health().get(source or client_name, url, default_timeout=20, headers=HEADERS, verify=False)
             if resp.status_code == 200:
                 soup = BeautifulSoup(resp.text, "html.parser")
                 rows = soup.select(row_selector)
@@ -49,12 +52,16 @@ def _scrape_soe_generic(client_name, urls, row_selector, ref_pattern, ref_prefix
                         continue
                     ref_match = re.search(ref_pattern, text)
                     if ref_match:
+                        ref = ref_match.group(1)
+                        title = text[:150]
+                        if tenders.seen(ref, title):
+                            continue
                         date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
-                        classification = classify_tender(text[:150], text)
+                        classification = classify_tender(title, text)
                         if classification["category"] != "Exclude":
-                            tenders.append({
-                                "ref": ref_match.group(1) if ref_match else f"{ref_prefix}-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}",
-                                "title": text[:150],
+                            tenders.add({
+                                "ref": ref,
+                                "title": title,
                                 "description": text[:500],
                                 "client": client_name,
                                 "closing_date": date_match.group(1) if date_match else "",
@@ -68,20 +75,20 @@ def _scrape_soe_generic(client_name, urls, row_selector, ref_pattern, ref_prefix
                     break
         except:
             continue
-    return tenders
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # RAND WATER - CORRECT URL: randwater.co.za/availabletenders.php
 # ----------------------------------------------------------
 def scrape_rand_water():
     """Scrape Rand Water tenders from the CORRECT URL"""
-    tenders = []
+    tenders = TenderCollector()
     
     # THE ACTUAL URL from screenshot
     url = "https://www.randwater.co.za/availabletenders.php"
     
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+        resp = source_health().get("Rand Water", url, default_timeout=20, headers=HEADERS, verify=False)
         
         if resp.status_code == 200:
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -107,7 +114,7 @@ def scrape_rand_water():
                         
                         # Extract reference from title (e.g., RW10397693/25RR)
                         ref_match = re.search(r'(RW\d+[-/]?\d*\w*)', title)
-                        ref = ref_match.group(1) if ref_match else f"RW-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}"
+                        ref = ref_match.group(1) if ref_match else tenders.placeholder_ref("RW")
                         
                         # Get description
                         description = desc_cell.get_text(strip=True) if desc_cell else ""
@@ -122,14 +129,17 @@ def scrape_rand_water():
                         if tender_url and not tender_url.startswith("http"):
                             tender_url = f"https://www.randwater.co.za/{tender_url}"
                         
+                        display_title = f"{title} - {description[:100]}"
+                        if tenders.seen(ref, display_title):
+                            continue
+                        
                         # Classify
-                        full_text = f"{title} {description}"
                         classification = classify_tender(title, description)
                         
                         if classification["category"] != "Exclude":
-                            tenders.append({
+                            tenders.add({
                                 "ref": ref,
-                                "title": f"{title} - {description[:100]}",
+                                "title": display_title,
                                 "description": description,
                                 "client": "Rand Water",
                                 "closing_date": closing,
@@ -138,7 +148,8 @@ def scrape_rand_water():
                                 "short_title": classification.get("short_title", "Tender"),
                                 "reason": classification.get("reason", ""),
                                 "source": "Rand Water",
-                                "url": tender_url or url
+                                "url": tender_url or url,
+                                "detail_url": tender_url
                             })
             
             # Also check for pagination (Page: 1 Page: 2 Page: 3)
@@ -149,7 +160,7 @@ def scrape_rand_water():
                     if not page_url.startswith("http"):
                         page_url = f"https://www.randwater.co.za/{page_url}"
                     try:
-                        page_resp = requests.get(page_url, headers=HEADERS, timeout=15, verify=False)
+                        page_resp = source_health().get("Rand Water", page_url, default_timeout=15, headers=HEADERS, verify=False)
                         if page_resp.status_code == 200:
                             page_soup = BeautifulSoup(page_resp.text, "html.parser")
                             page_table = page_soup.find("table")
@@ -164,18 +175,25 @@ def scrape_rand_water():
                                         
                                         title_link = title_cell.find("a")
                                         title = title_link.get_text(strip=True) if title_link else title_cell.get_text(strip=True)
+                                        detail_url = title_link.get("href") if title_link else ""
+                                        if detail_url and not detail_url.startswith("http"):
+                                            detail_url = f"https://www.randwater.co.za/{detail_url}"
                                         
                                         ref_match = re.search(r'(RW\d+[-/]?\d*\w*)', title)
-                                        ref = ref_match.group(1) if ref_match else f"RW-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}"
+                                        ref = ref_match.group(1) if ref_match else tenders.placeholder_ref("RW")
                                         
                                         description = desc_cell.get_text(strip=True) if desc_cell else ""
                                         closing = date_cell.get_text(strip=True) if date_cell else ""
                                         
+                                        display_title = f"{title} - {description[:100]}"
+                                        if tenders.seen(ref, display_title):
+                                            continue
+                                        
                                         classification = classify_tender(title, description)
-                                        if classification["category"] != "Exclude" and ref not in [t["ref"] for t in tenders]:
-                                            tenders.append({
+                                        if classification["category"] != "Exclude":
+                                            tenders.add({
                                                 "ref": ref,
-                                                "title": f"{title} - {description[:100]}",
+                                                "title": display_title,
                                                 "description": description,
                                                 "client": "Rand Water",
                                                 "closing_date": closing,
@@ -183,7 +201,8 @@ def scrape_rand_water():
                                                 "short_title": classification.get("short_title", "Tender"),
                                                 "reason": classification.get("reason", ""),
                                                 "source": "Rand Water",
-                                                "url": page_url
+                                                "url": detail_url or page_url,
+                                                "detail_url": detail_url
                                             })
                     except:
                         pass
@@ -191,7 +210,7 @@ def scrape_rand_water():
     except Exception as e:
         print(f"    Rand Water error: {e}")
     
-    return tenders
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # JOHANNESBURG WATER - CORRECT URL: johannesburgwater.co.za/tenders/
@@ -199,13 +218,13 @@ def scrape_rand_water():
 # ----------------------------------------------------------
 def scrape_joburg_water():
     """Scrape Johannesburg Water tenders"""
-    tenders = []
+    tenders = TenderCollector()
     
     # THE ACTUAL URL from screenshot
     url = "https://www.johannesburgwater.co.za/tenders/"
     
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+        resp = source_health().get("Johannesburg Water", url, default_timeout=20, headers=HEADERS, verify=False)
         
         if resp.status_code == 200:
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -227,7 +246,9 @@ def scrape_joburg_water():
                         
                         # Generate reference
                         ref_match = re.search(r'(JW[-/]?\d{4,}|COJ[-/]?\d+)', description)
-                        ref = ref_match.group(1) if ref_match else f"JW-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}"
+                        ref = ref_match.group(1) if ref_match else tenders.placeholder_ref("JW")
+                        if tenders.seen(ref, description[:150]):
+                            continue
                         
                         # Parse closing date (format: "in X days")
                         days_match = re.search(r'in (\d+) days?', closing)
@@ -241,7 +262,7 @@ def scrape_joburg_water():
                         classification = classify_tender(description, f"{category} {description}")
                         
                         if classification["category"] != "Exclude":
-                            tenders.append({
+                            tenders.add({
                                 "ref": ref,
                                 "title": description[:150],
                                 "description": f"Category: {category}. {description}",
@@ -258,20 +279,20 @@ def scrape_joburg_water():
     except Exception as e:
         print(f"    Johannesburg Water error: {e}")
     
-    return tenders
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # TRANSNET - Uses eTenders (etenders.gov.za)
 # ----------------------------------------------------------
 def scrape_transnet():
     """Scrape Transnet tenders from eTenders portal"""
-    tenders = []
+    tenders = TenderCollector()
     
     # Transnet uses the National Treasury eTenders portal
     url = "https://www.etenders.gov.za/Home/opportunities?TextSearch=transnet"
     
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+        resp = source_health().get("Transnet", url, default_timeout=20, headers=HEADERS, verify=False)
         
         if resp.status_code == 200:
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -286,17 +307,18 @@ def scrape_transnet():
                 
                 # Extract reference
                 ref_match = re.search(r'(TNT[-/]?\d{4,}|TRN[-/]?\d{4,}|HOAC[-/]?\d+|[A-Z]{2,5}[-/]\d{4,})', text)
-                ref = ref_match.group(1) if ref_match else f"TNT-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}"
+                ref = ref_match.group(1) if ref_match else tenders.placeholder_ref("TNT")
+                title = text[:200]
+                if tenders.seen(ref, title):
+                    continue
                 
                 # Extract date
                 date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{1,2}\s+\w+\s+\d{4})', text)
                 closing = date_match.group(1) if date_match else ""
                 
-                title = text[:200]
-                
                 classification = classify_tender(title, text)
                 if classification["category"] != "Exclude":
-                    tenders.append({
+                    tenders.add({
                         "ref": ref,
                         "title": title,
                         "description": text[:500],
@@ -312,22 +334,14 @@ def scrape_transnet():
     except Exception as e:
         print(f"    Transnet error: {e}")
     
-    # Deduplicate
-    seen = set()
-    unique = []
-    for t in tenders:
-        if t["ref"] not in seen:
-            seen.add(t["ref"])
-            unique.append(t)
-    
-    return unique
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # ESKOM - Multiple URL strategies
 # ----------------------------------------------------------
 def scrape_eskom():
     """Scrape Eskom tenders"""
-    tenders = []
+    tenders = TenderCollector()
     
     urls = [
         "https://www.eskom.co.za/eskom-tenders/",
@@ -336,7 +350,7 @@ def scrape_eskom():
     
     for url in urls:
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+            resp = source_health().get("Eskom", url, default_timeout=20, headers=HEADERS, verify=False)
             
             if resp.status_code == 200:
                 soup = BeautifulSoup(resp.text, "html.parser")
@@ -349,17 +363,19 @@ def scrape_eskom():
                     
                     if any(kw in text.lower() or kw in href.lower() for kw in ["tender", "rfq", "rfp", "bid"]):
                         ref_match = re.search(r'(ESK[-/]?\d{4,}|MWP[-/]?\d{4,}|RFQ[-/]?\d+)', text + href)
-                        ref = ref_match.group(1) if ref_match else f"ESK-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}"
+                        ref = ref_match.group(1) if ref_match else tenders.placeholder_ref("ESK")
+                        title = text if text else href.split("/")[-1].replace(".pdf", "")
+                        if tenders.seen(ref, title[:150]):
+                            continue
                         
                         date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
                         closing = date_match.group(1) if date_match else ""
                         
-                        title = text if text else href.split("/")[-1].replace(".pdf", "")
                         full_url = href if href.startswith("http") else f"https://www.eskom.co.za{href}"
                         
                         classification = classify_tender(title, title)
                         if classification["category"] != "Exclude":
-                            tenders.append({
+                            tenders.add({
                                 "ref": ref,
                                 "title": title[:150],
                                 "description": f"Eskom tender: {title}",
@@ -382,14 +398,17 @@ def scrape_eskom():
                     ref_match = re.search(r'(ESK[-/]?\d{4,}|MWP[-/]?\d{4,}|RFQ[-/]?\d+)', text)
                     if ref_match:
                         ref = ref_match.group(1)
+                        title = text[:150]
+                        if tenders.seen(ref, title):
+                            continue
                         date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
                         closing = date_match.group(1) if date_match else ""
                         
-                        classification = classify_tender(text[:150], text)
+                        classification = classify_tender(title, text)
                         if classification["category"] != "Exclude":
-                            tenders.append({
+                            tenders.add({
                                 "ref": ref,
-                                "title": text[:150],
+                                "title": title,
                                 "description": text[:500],
                                 "client": "Eskom",
                                 "closing_date": closing,
@@ -406,22 +425,14 @@ def scrape_eskom():
         except Exception as e:
             print(f"    Eskom error: {e}")
     
-    # Deduplicate
-    seen = set()
-    unique = []
-    for t in tenders:
-        if t["ref"] not in seen:
-            seen.add(t["ref"])
-            unique.append(t)
-    
-    return unique
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # SANRAL
 # ----------------------------------------------------------
 def scrape_sanral():
     """Scrape SANRAL tenders"""
-    tenders = []
+    tenders = TenderCollector()
     
     urls = [
         "https://www.nra.co.za/live/tenders.php",
@@ -430,7 +441,7 @@ def scrape_sanral():
     
     for url in urls:
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+            resp = source_health().get("SANRAL", url, default_timeout=20, headers=HEADERS, verify=False)
             
             if resp.status_code == 200:
                 soup = BeautifulSoup(resp.text, "html.parser")
@@ -443,7 +454,9 @@ def scrape_sanral():
                     
                     if len(text) > 10:
                         ref_match = re.search(r'(SANRAL[-/]?\d+|NRA[-/]?\d+|[A-Z]{1,3}[-/]?\d{3,})', text + href)
-                        ref = ref_match.group(1) if ref_match else f"SANRAL-{datetime.now().strftime('%Y%m%d')}-{len(tenders)+1}"
+                        ref = ref_match.group(1) if ref_match else tenders.placeholder_ref("SANRAL")
+                        if tenders.seen(ref, text[:150]):
+                            continue
                         
                         date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
                         closing = date_match.group(1) if date_match else ""
@@ -452,7 +465,7 @@ def scrape_sanral():
                         
                         classification = classify_tender(text, text)
                         if classification["category"] != "Exclude":
-                            tenders.append({
+                            tenders.add({
                                 "ref": ref,
                                 "title": text[:150],
                                 "description": f"SANRAL tender: {text}",
@@ -471,18 +484,18 @@ def scrape_sanral():
         except Exception as e:
             print(f"    SANRAL error: {e}")
     
-    return tenders
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # UMGENI WATER
 # ----------------------------------------------------------
 def scrape_umgeni_water():
-    tenders = []
+    tenders = TenderCollector()
     urls = ["https://www.umgeni.co.za/tenders/", "https://www.umgeni.co.za/procurement/"]
     
     for url in urls:
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=20, verify=False)
+            resp = source_health().get("Umgeni Water", url, default_timeout=20, headers=HEADERS, verify=False)
             if resp.status_code == 200:
                 soup = BeautifulSoup(resp.text, "html.parser")
                 rows = soup.select("table tr, .tender-item, article, a[href$='.pdf']")
@@ -492,12 +505,16 @@ def scrape_umgeni_water():
                         continue
                     ref_match = re.search(r'(UW[-/]?\d{4,}|UMGENI[-/]?\d+)', text)
                     if ref_match:
+                        ref = ref_match.group(1)
+                        title = text[:150]
+                        if tenders.seen(ref, title):
+                            continue
                         date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
-                        classification = classify_tender(text[:150], text)
+                        classification = classify_tender(title, text)
                         if classification["category"] != "Exclude":
-                            tenders.append({
-                                "ref": ref_match.group(1),
-                                "title": text[:150],
+                            tenders.add({
+                                "ref": ref,
+                                "title": title,
                                 "description": text[:500],
                                 "client": "Umgeni Water",
                                 "closing_date": date_match.group(1) if date_match else "",
@@ -511,7 +528,7 @@ def scrape_umgeni_water():
                     break
         except:
             continue
-    return tenders
+    return tenders.to_list()
 
 # ----------------------------------------------------------
 # SASOL
@@ -521,8 +538,7 @@ def scrape_sasol():
         client_name="Sasol",
         urls=["https://www.sasol.com/procurement", "https://www.sasol.com/suppliers"],
         row_selector="table tr, .tender-item, article, .card",
-        ref_pattern=r'(SAS[-/]?\d{4,}|SASOL[-/]?\d+)',
-        ref_prefix="SAS"
+        ref_pattern=r'(SAS[-/]?\d{4,}|SASOL[-/]?\d+)'
     )
 
 # ----------------------------------------------------------
@@ -533,8 +549,7 @@ def scrape_sanedi():
         client_name="SANEDI",
         urls=["https://www.sanedi.org.za/tenders/", "https://www.sanedi.org.za/procurement/"],
         row_selector="table tr, .tender-item, article, .post",
-        ref_pattern=r'(SANEDI[-/]?\d{4,}|SAN[-/]?\d{4,})',
-        ref_prefix="SANEDI"
+        ref_pattern=r'(SANEDI[-/]?\d{4,}|SAN[-/]?\d{4,})'
     )
 
 # ----------------------------------------------------------
@@ -545,8 +560,7 @@ def scrape_anglo_american():
         client_name="Anglo American",
         urls=["https://www.angloamerican.com/suppliers"],
         row_selector="table tr, .tender-item, article",
-        ref_pattern=r'(AAP[-/]?\d{4,}|ANGLO[-/]?\d{4,})',
-        ref_prefix="AAP"
+        ref_pattern=r'(AAP[-/]?\d{4,}|ANGLO[-/]?\d{4,})'
     )
 
 # ----------------------------------------------------------
@@ -557,8 +571,7 @@ def scrape_harmony_gold():
         client_name="Harmony Gold",
         urls=["https://www.harmony.co.za/business/procurement"],
         row_selector="table tr, .tender-item, article",
-        ref_pattern=r'(HAR[-/]?\d{4,}|HMY[-/]?\d{4,})',
-        ref_prefix="HAR"
+        ref_pattern=r'(HAR[-/]?\d{4,}|HMY[-/]?\d{4,})'
     )
 
 # ----------------------------------------------------------
@@ -570,7 +583,7 @@ def scrape_seriti():
         urls=["https://www.seritiza.com/procurement/"],
         row_selector="table tr, .tender-item, article",
         ref_pattern=r'(SER[-/]?\d{4,}|SERITI[-/]?\d{4,})',
-        ref_prefix="SER"
+        source="Seriti",
     )
 
 # ----------------------------------------------------------
@@ -581,45 +594,56 @@ def scrape_exxaro():
         client_name="Exxaro",
         urls=["https://www.exxaro.com/suppliers/"],
         row_selector="table tr, .tender-item, article",
-        ref_pattern=r'(EXX[-/]?\d{4,}|EXXARO[-/]?\d{4,})',
-        ref_prefix="EXX"
+        ref_pattern=r'(EXX[-/]?\d{4,}|EXXARO[-/]?\d{4,})'
     )
 
 # ----------------------------------------------------------
 # MASTER FUNCTION
 # ----------------------------------------------------------
-def scrape_all_soes():
-    """Scrape all SOE and corporate sources"""
-    all_tenders = []
-    
-    scrapers = [
-        ("Rand Water", scrape_rand_water),
-        ("Johannesburg Water", scrape_joburg_water_selenium),
-        ("Transnet", scrape_transnet),
-        ("Eskom", scrape_eskom),
-        ("SANRAL", scrape_sanral),
-        ("Umgeni Water", scrape_umgeni_water),
-        ("Sasol", scrape_sasol),
-        ("SANEDI", scrape_sanedi),
-        ("Anglo American", scrape_anglo_american),
-        ("Harmony Gold", scrape_harmony_gold),
-        ("Seriti", scrape_seriti),
-        ("Exxaro", scrape_exxaro),
-    ]
+SOE_SCRAPERS = [
+    ("Rand Water", scrape_rand_water),
+    ("Johannesburg Water", scrape_joburg_water_selenium),
+    ("Transnet", scrape_transnet),
+    ("Eskom", scrape_eskom),
+    ("SANRAL", scrape_sanral),
+    ("Umgeni Water", scrape_umgeni_water),
+    ("Sasol", scrape_sasol),
+    ("SANEDI", scrape_sanedi),
+    ("Anglo American", scrape_anglo_american),
+    ("Harmony Gold", scrape_harmony_gold),
+    ("Seriti", scrape_seriti),
+    ("Exxaro", scrape_exxaro),
+]
+
+
+def scrape_all_soes(only=None):
+    """Scrape all SOE and corporate sources (or just the names in `only`)"""
+    all_tenders = TenderCollector()
+    scrapers = [(name, scraper) for name, scraper in SOE_SCRAPERS if only is None or name in only]
     
+    health = source_health()
     for name, scraper in scrapers:
+        if not health.allow(name):
+            print(f"  ⏭️ Skipping {name} (circuit open after repeated failures)")
+            poll_scheduler().defer(name, health.retry_at(name))
+            continue
         print(f"  📡 Scraping {name}...")
         try:
             results = scraper()
-            all_tenders.extend(results)
+            added = all_tenders.extend(results)
+            poll_scheduler().observe(name, results)
             if results:
-                print(f"    ✅ Found {len(results)} tenders")
+                duplicates = f" ({len(results) - added} already seen)" if added < len(results) else ""
+                print(f"    ✅ Found {len(results)} tenders{duplicates}")
             else:
                 print(f"    ⚠️ No tenders found")
         except Exception as e:
             print(f"    ❌ Error: {e}")
+            poll_scheduler().observe(name, [])
     
-    return all_tenders
+    health.save()
+    poll_scheduler().save()
+    return all_tenders.to_list()
 
 
 if __name__ == "__main__":
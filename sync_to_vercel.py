@@ -4,12 +4,24 @@
 # Updates HTML and pushes to GitHub (triggers Vercel auto-deploy)
 # ==========================================================
 
+import gzip
+import hashlib
 import json
 import os
 import subprocess
+import sys
 from datetime import datetime, timedelta
 from urllib.parse import quote
 
+from utils.change_journal import ChangeJournal, journal_path
+from utils.pdf_tools import add_pdf_metadata, fetch_pdf_metadata
+from utils.rollups import snapshot_rollups
+
+try:
+    import brotli  # optional: precompressed .br shards
+except ImportError:
+    brotli = None
+
 # Paths
 AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
 # Tenders are written to MASTER folder by tenderscan.py (see config.yaml)
@@ -19,6 +31,12 @@ VERCEL_DIR = "/Users/lazolasonqishe/Documents/MASTER/TENDERS/00_System/04_Automa
 TENDERS_JSON = os.path.join(OUTPUT_DIR, "new_tenders.json")
 DASHBOARD_HTML = os.path.join(VERCEL_DIR, "index.html")
 TENDERS_DATA_JSON = os.path.join(VERCEL_DIR, "tenders.json")  # Full dataset for client-side
+DATA_DIR = os.path.join(VERCEL_DIR, "data")  # Content-hashed shards + index.json manifest
+DATA_MANIFEST = os.path.join(DATA_DIR, "index.json")
+PDF_METADATA_CACHE = os.path.join(OUTPUT_DIR, "pdf_metadata_cache.json")
+SHARD_PRIORITIES = ("HIGH", "MEDIUM", "LOW")
+JOURNAL_DB = journal_path(OUTPUT_DIR)
+SYNC_CONSUMER = "vercel_sync"
 
 # Source URLs for tender portals
 SOURCE_URLS = {
@@ -42,11 +60,27 @@ SOURCE_URLS = {
 }
 
 def load_tenders():
-    """Load tenders from JSON output"""
-    if os.path.exists(TENDERS_JSON):
-        with open(TENDERS_JSON, "r") as f:
-            return json.load(f)
-    return []
+    """Load tenders and the data timestamp from the tenderscan snapshot"""
+    if not os.path.exists(TENDERS_JSON):
+        return [], None
+    with open(TENDERS_JSON, "r") as f:
+        payload = json.load(f)
+    
+    # Use the snapshot's own sync time (not "now") so an unchanged
+    # snapshot produces byte-identical output
+    mtime = datetime.fromtimestamp(os.path.getmtime(TENDERS_JSON))
+    last_updated = mtime.strftime("%d %b %Y, %H:%M")
+    if isinstance(payload, dict):
+        last_sync = (payload.get("meta") or {}).get("last_sync")
+        if last_sync:
+            try:
+                last_updated = datetime.strptime(last_sync, "%Y-%m-%d %H:%M").strftime("%d %b %Y, %H:%M")
+            except ValueError:
+                last_updated = last_sync
+        tenders = payload.get("tenders") or []
+    else:
+        tenders = payload if isinstance(payload, list) else []
+    return tenders, last_updated
 
 def get_search_url(tender):
     """Generate a search URL for the tender"""
@@ -64,32 +98,20 @@ def get_search_url(tender):
     search_query = f"{ref} {title[:40]} tender site:gov.za"
     return f"https://www.google.com/search?q={quote(search_query)}"
 
-def generate_dashboard_html(tenders):
-    """Generate updated dashboard HTML with real tender data"""
-    
-    total = len(tenders)
-    high = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "HIGH")
-    medium = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "MEDIUM")
-    low = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "LOW")
-    
-    tes_count = sum(1 for t in tenders if t.get("scores", {}).get("tes_suitability", 0) > t.get("scores", {}).get("phakathi_suitability", 0))
-    phakathi_count = sum(1 for t in tenders if t.get("scores", {}).get("phakathi_suitability", 0) > t.get("scores", {}).get("tes_suitability", 0))
-    both_count = total - tes_count - phakathi_count
-    
-    # Priority counts
-    high_count = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "HIGH")
-    medium_count = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "MEDIUM")
-    low_count = sum(1 for t in tenders if t.get("scores", {}).get("priority") == "LOW")
-    
-    # Source breakdown for freshness stats
-    from collections import Counter
-    source_counts = Counter(t.get("source", "Unknown") for t in tenders)
-    source_breakdown = " | ".join([f"{src}: {count}" for src, count in sorted(source_counts.items(), key=lambda x: -x[1])[:5]])
-    
-    # QA Check: Log scrape vs display discrepancy
-    if total != len(tenders):
-        print(f"⚠️ WARNING: Tender count mismatch - scraped {total} but processing {len(tenders)}")
-    
+def annotate_pdf_sizes(tenders):
+    """Probe every PDF link once, concurrently and cached, and set pdf_size"""
+    urls = [t.get("url", "") for t in tenders if not t.get("pdf_size")]
+    started = datetime.now()
+    metadata = fetch_pdf_metadata(urls, cache_path=PDF_METADATA_CACHE)
+    for t in tenders:
+        if not t.get("pdf_size"):
+            add_pdf_metadata(t, metadata)
+    if metadata:
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"   📎 PDF metadata for {len(metadata)} link(s) in {elapsed:.1f}s")
+
+def build_dashboard_rows(tenders):
+    """Flatten stored tenders into the compact rows the dashboard renders"""
     js_tenders = []
     for t in tenders:  # Process ALL tenders, not just first 20
         scores = t.get("scores", {})
@@ -105,23 +127,8 @@ def generate_dashboard_html(tenders):
         
         url = t.get("url", "") or get_search_url(t)
         
-        # Get PDF file size if available
+        # PDF size comes from annotate_pdf_sizes() (run once per sync)
         pdf_size = t.get("pdf_size", "")
-        if not pdf_size and url.endswith('.pdf'):
-            # Quick attempt to get size from headers
-            try:
-                import urllib.request
-                req = urllib.request.Request(url, method='HEAD')
-                response = urllib.request.urlopen(req, timeout=3)
-                size_bytes = int(response.headers.get('content-length', 0))
-                if size_bytes > 0:
-                    for unit in ['B', 'KB', 'MB']:
-                        if size_bytes < 1024:
-                            pdf_size = f"{size_bytes} {unit}" if unit == 'B' else f"{size_bytes:.1f} {unit}"
-                            break
-                        size_bytes /= 1024.0
-            except:
-                pass
         
         js_tenders.append({
             "ref": t.get("ref", "N/A"),
@@ -140,14 +147,103 @@ def generate_dashboard_html(tenders):
             "closing_date": t.get("closing_date", ""),
             "contact": t.get("contact", "")
         })
+    return js_tenders
+
+def dashboard_summary(rollups):
+    """Stat-card counts and source breakdown (shipped in the data manifest), from the snapshot rollups"""
+    counts = {"total": rollups.total, "HIGH": 0, "MEDIUM": 0, "LOW": 0, "TES": 0, "Phakathi": 0, "Both": 0}
+    for priority, count in rollups.counts("priority", default="LOW").items():
+        if priority in counts:
+            counts[priority] += count
+    for company, count in rollups.counts("company").items():
+        counts[company] += count
+    
+    # Source breakdown for freshness stats
+    source_counts = rollups.counts("source", default="Unknown")
+    source_breakdown = " | ".join([f"{src}: {count}" for src, count in sorted(source_counts.items(), key=lambda x: -x[1])[:5]])
+    return counts, source_breakdown
+
+# ----------------------------------------------------------
+# CONTENT-ADDRESSED DATA FILES
+# ----------------------------------------------------------
+def _compact_json(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _write_if_changed(path, data: bytes) -> bool:
+    """Write bytes only if the file content differs; True if written"""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def _write_asset(path, data: bytes) -> bool:
+    """Write a data file plus precompressed .gz/.br siblings; True if anything changed"""
+    changed = _write_if_changed(path, data)
+    if changed or not os.path.exists(path + ".gz"):
+        # mtime=0 keeps the gzip bytes stable for identical input
+        changed |= _write_if_changed(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None and (changed or not os.path.exists(path + ".br")):
+        changed |= _write_if_changed(path + ".br", brotli.compress(data, quality=11))
+    return changed
+
+def write_data_files(js_tenders, last_updated, rollups):
+    """
+    Write per-priority data shards named by content hash, the legacy
+    tenders.json and a small data/index.json manifest.
+    Unchanged files are left untouched; returns the number of files written.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    written = 0
+    
+    shards = []
+    keep = set()
+    groups = {}
+    for t in js_tenders:
+        key = t["priority"] if t["priority"] in SHARD_PRIORITIES else "OTHER"
+        groups.setdefault(key, []).append(t)
+    for priority in SHARD_PRIORITIES + ("OTHER",):
+        rows = groups.get(priority)
+        if not rows:
+            continue
+        data = _compact_json(rows)
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        name = f"tenders-{priority.lower()}.{digest}.json"
+        keep.update({name, name + ".gz", name + ".br"})
+        written += _write_asset(os.path.join(DATA_DIR, name), data)
+        shards.append({"priority": priority, "file": name, "count": len(rows), "bytes": len(data)})
     
-    # Save full dataset as separate JSON for client-side loading
-    with open(TENDERS_DATA_JSON, 'w') as f:
-        json.dump(js_tenders, f, indent=2)
-    print(f"   💾 Saved {len(js_tenders)} tenders to tenders.json for client-side access")
+    # Remove shards from previous versions
+    for name in os.listdir(DATA_DIR):
+        if name.startswith("tenders-") and name not in keep:
+            os.remove(os.path.join(DATA_DIR, name))
+            written += 1
     
-    tenders_json = json.dumps(js_tenders, indent=8)
-    last_updated = datetime.now().strftime("%d %b %Y, %H:%M")
+    # Full dataset (still read by email_alerts.py and older clients)
+    written += _write_if_changed(TENDERS_DATA_JSON, _compact_json(js_tenders))
+    
+    counts, source_breakdown = dashboard_summary(rollups)
+    manifest = {
+        "last_updated": last_updated,
+        "counts": counts,
+        "source_breakdown": source_breakdown,
+        "shards": shards,
+    }
+    written += _write_if_changed(DATA_MANIFEST, _compact_json(manifest))
+    return written
+
+def generate_dashboard_html():
+    """
+    Static dashboard shell. Contains no tender data or timestamps so it
+    only changes when the template itself changes; data, counts and the
+    last-sync time are loaded from data/index.json at runtime.
+    """
     
     html = f'''<!DOCTYPE html>
 <html lang="en">
@@ -284,8 +380,8 @@ def generate_dashboard_html(tenders):
         <header>
             <h1>🎯 Tender Intelligence</h1>
             <p class="subtitle"><span class="status"></span>TES & Phakathi Automation Engine</p>
-            <div class="last-sync">🔄 Last synced: {last_updated}</div>
-            <div class="last-sync" style="margin-top: 10px; background: rgba(72,219,251,0.2); border-color: rgba(72,219,251,0.3);">📊 {source_breakdown}</div>
+            <div class="last-sync">🔄 Last synced: <span id="lastSync">…</span></div>
+            <div class="last-sync" style="margin-top: 10px; background: rgba(72,219,251,0.2); border-color: rgba(72,219,251,0.3);">📊 <span id="sourceBreakdown">…</span></div>
         </header>
         
         <nav class="tab-nav">
@@ -297,16 +393,16 @@ def generate_dashboard_html(tenders):
         <!-- DASHBOARD TAB -->
         <div id="dashboard" class="tab-content active">
             <div class="stats">
-                <div class="stat-card"><div class="stat-value total">{total}</div><div class="stat-label">Total</div></div>
-                <div class="stat-card"><div class="stat-value high">{high}</div><div class="stat-label">🔥 High</div></div>
-                <div class="stat-card"><div class="stat-value medium">{medium}</div><div class="stat-label">✅ Medium</div></div>
-                <div class="stat-card"><div class="stat-value low">{low}</div><div class="stat-label">📝 Low</div></div>
-                <div class="stat-card"><div class="stat-value tes-color">{tes_count}</div><div class="stat-label">💧 TES</div></div>
-                <div class="stat-card"><div class="stat-value phakathi-color">{phakathi_count}</div><div class="stat-label">⚙️ Phakathi</div></div>
+                <div class="stat-card"><div class="stat-value total" id="statTotal">–</div><div class="stat-label">Total</div></div>
+                <div class="stat-card"><div class="stat-value high" id="statHIGH">–</div><div class="stat-label">🔥 High</div></div>
+                <div class="stat-card"><div class="stat-value medium" id="statMEDIUM">–</div><div class="stat-label">✅ Medium</div></div>
+                <div class="stat-card"><div class="stat-value low" id="statLOW">–</div><div class="stat-label">📝 Low</div></div>
+                <div class="stat-card"><div class="stat-value tes-color" id="statTES">–</div><div class="stat-label">💧 TES</div></div>
+                <div class="stat-card"><div class="stat-value phakathi-color" id="statPhakathi">–</div><div class="stat-label">⚙️ Phakathi</div></div>
             </div>
             
             <div class="section">
-                <h2>📋 Active Tenders (<span id="displayedCount">{total}</span> of <span id="totalCount">{total}</span>)</h2>
+                <h2>📋 Active Tenders (<span id="displayedCount">0</span> of <span id="totalCount">0</span>)</h2>
                 
                 <!-- Search Box -->
                 <div style="margin-bottom: 20px;">
@@ -317,12 +413,12 @@ def generate_dashboard_html(tenders):
                 </div>
                 
                 <div class="filter-tabs">
-                    <button class="filter-tab active" onclick="filterTenders('all')">All (<span id="countAll">{total}</span>)</button>
-                    <button class="filter-tab" onclick="filterTenders('TES')">💧 TES (<span id="countTES">{tes_count}</span>)</button>
-                    <button class="filter-tab" onclick="filterTenders('Phakathi')">⚙️ Phakathi (<span id="countPhakathi">{phakathi_count}</span>)</button>
-                    <button class="filter-tab high" onclick="filterTenders('HIGH')">🔥 HIGH (<span id="countHIGH">{high_count}</span>)</button>
-                    <button class="filter-tab medium" onclick="filterTenders('MEDIUM')">⚡ MEDIUM (<span id="countMEDIUM">{medium_count}</span>)</button>
-                    <button class="filter-tab low" onclick="filterTenders('LOW')">📝 LOW (<span id="countLOW">{low_count}</span>)</button>
+                    <button class="filter-tab active" onclick="filterTenders('all')">All (<span id="countAll">0</span>)</button>
+                    <button class="filter-tab" onclick="filterTenders('TES')">💧 TES (<span id="countTES">0</span>)</button>
+                    <button class="filter-tab" onclick="filterTenders('Phakathi')">⚙️ Phakathi (<span id="countPhakathi">0</span>)</button>
+                    <button class="filter-tab high" onclick="filterTenders('HIGH')">🔥 HIGH (<span id="countHIGH">0</span>)</button>
+                    <button class="filter-tab medium" onclick="filterTenders('MEDIUM')">⚡ MEDIUM (<span id="countMEDIUM">0</span>)</button>
+                    <button class="filter-tab low" onclick="filterTenders('LOW')">📝 LOW (<span id="countLOW">0</span>)</button>
                 </div>
                 <ul class="tender-list" id="tenderList"></ul>
                 <div id="loadMoreContainer" style="text-align: center; margin-top: 20px; display: none;">
@@ -445,22 +541,41 @@ def generate_dashboard_html(tenders):
         let displayedCount = 0;
         const itemsPerPage = 20;
         
-        // Load tenders from external JSON
-        fetch('tenders.json')
+        function applySummary(manifest) {{
+            const counts = manifest.counts || {{}};
+            document.getElementById('lastSync').textContent = manifest.last_updated || '';
+            document.getElementById('sourceBreakdown').textContent = manifest.source_breakdown || '';
+            ['Total', 'HIGH', 'MEDIUM', 'LOW', 'TES', 'Phakathi'].forEach(key => {{
+                const value = counts[key === 'Total' ? 'total' : key];
+                document.getElementById('stat' + key).textContent = value ?? 0;
+            }});
+        }}
+        
+        function showTenders(data) {{
+            allTenders = data;
+            console.log(`✅ Loaded ${{allTenders.length}} tenders`);
+            document.getElementById('totalCount').textContent = allTenders.length;
+            renderTenders('all');
+            renderCalendar();
+        }}
+        
+        // Load the manifest (always revalidated), then the content-hashed
+        // per-priority shards it points to (safe to cache forever)
+        fetch('data/index.json', {{ cache: 'no-cache' }})
             .then(response => response.json())
-            .then(data => {{
-                allTenders = data;
-                console.log(`✅ Loaded ${{allTenders.length}} tenders from tenders.json`);
-                document.getElementById('totalCount').textContent = allTenders.length;
-                renderTenders('all');
-                renderCalendar();
+            .then(manifest => {{
+                applySummary(manifest);
+                return Promise.all(manifest.shards.map(shard =>
+                    fetch('data/' + shard.file).then(response => response.json())
+                ));
             }})
+            .then(parts => showTenders([].concat(...parts)))
             .catch(err => {{
-                console.error('❌ Error loading tenders:', err);
-                // Fallback to embedded data
-                allTenders = {tenders_json};
-                renderTenders('all');
-                renderCalendar();
+                console.error('❌ Error loading data shards, falling back to tenders.json:', err);
+                fetch('tenders.json', {{ cache: 'no-cache' }})
+                    .then(response => response.json())
+                    .then(showTenders)
+                    .catch(err => console.error('❌ Error loading tenders:', err));
             }});
         
         // Calculate days until closing
@@ -715,21 +830,38 @@ def generate_dashboard_html(tenders):
     return html
 
 def push_to_github():
-    """Push to GitHub (triggers Vercel auto-deploy)"""
+    """
+    Commit and push only if the dashboard files actually changed
+    (every push triggers a Vercel deploy). Returns (success, pushed, output).
+    """
     try:
         os.chdir(VERCEL_DIR)
         subprocess.run(["git", "add", "-A"], capture_output=True)
+        staged = subprocess.run(["git", "diff", "--cached", "--quiet"], capture_output=True)
+        if staged.returncode == 0:
+            return True, False, "No changes to deploy"
         subprocess.run(["git", "commit", "-m", f"Sync: {datetime.now().strftime('%Y-%m-%d %H:%M')}"], capture_output=True)
         result = subprocess.run(["git", "push"], capture_output=True, text=True, timeout=60)
-        return result.returncode == 0, result.stdout + result.stderr
+        return result.returncode == 0, True, result.stdout + result.stderr
     except Exception as e:
-        return False, str(e)
+        return False, False, str(e)
 
-def sync():
-    """Main sync function"""
+def sync(force=False):
+    """Main sync function (skipped when the change journal has nothing new, unless force)"""
     print("🔄 Syncing tender data to Vercel...")
     
-    tenders = load_tenders()
+    journal, last_seq = None, 0
+    if os.path.exists(JOURNAL_DB):
+        journal = ChangeJournal(JOURNAL_DB)
+        pending, last_seq = journal.pending_counts(SYNC_CONSUMER)
+        deployed = os.path.exists(DATA_MANIFEST) and os.path.exists(DASHBOARD_HTML)
+        if not pending and deployed and not force:
+            print("   ✅ No tender changes since the last sync - nothing to deploy")
+            return True
+        if pending:
+            print("   📒 Changes since last sync: " + ", ".join(f"{n} {k}" for k, n in sorted(pending.items())))
+    
+    tenders, last_updated = load_tenders()
     scraped_count = len(tenders)
     print(f"   Found {scraped_count} tenders")
     
@@ -738,33 +870,44 @@ def sync():
         file_size = os.path.getsize(TENDERS_JSON)
         print(f"   📁 Source file: {file_size:,} bytes")
     
-    html = generate_dashboard_html(tenders)
-    
     os.makedirs(VERCEL_DIR, exist_ok=True)
-    with open(DASHBOARD_HTML, "w") as f:
-        f.write(html)
-    print(f"   ✅ Dashboard HTML updated")
     
-    # QA Check: Verify tenders.json was created
-    if os.path.exists(TENDERS_DATA_JSON):
-        with open(TENDERS_DATA_JSON, 'r') as f:
-            displayed_tenders = json.load(f)
-            displayed_count = len(displayed_tenders)
-            if displayed_count != scraped_count:
-                print(f"   ⚠️ WARNING: Count mismatch - scraped {scraped_count} but displaying {displayed_count}")
-            else:
-                print(f"   ✅ QA Pass: {scraped_count} tenders scraped = {displayed_count} displayed")
+    annotate_pdf_sizes(tenders)
+    js_tenders = build_dashboard_rows(tenders)
+    rollups = snapshot_rollups(TENDERS_JSON, tenders)
+    written = write_data_files(js_tenders, last_updated or "No runs yet", rollups)
+    written += _write_if_changed(DASHBOARD_HTML, generate_dashboard_html().encode("utf-8"))
+    
+    # QA Check: every scraped tender made it into the dashboard data
+    displayed_count = len(js_tenders)
+    if displayed_count != scraped_count:
+        print(f"   ⚠️ WARNING: Count mismatch - scraped {scraped_count} but displaying {displayed_count}")
+    else:
+        print(f"   ✅ QA Pass: {scraped_count} tenders scraped = {displayed_count} displayed")
+    
+    if not written:
+        print("   ✅ Dashboard files unchanged - nothing to deploy")
+        if journal:
+            journal.ack(SYNC_CONSUMER, last_seq)
+        return True
+    print(f"   💾 {written} dashboard file(s) updated")
     
     print("   🚀 Pushing to GitHub (triggers Vercel auto-deploy)...")
-    success, output = push_to_github()
+    success, pushed, output = push_to_github()
     
-    if success:
+    if success and journal:
+        journal.ack(SYNC_CONSUMER, last_seq)
+    
+    if success and pushed:
         print(f"   ✅ Pushed! Vercel will auto-deploy in ~30 seconds")
         print(f"   🌐 https://vercel-dashboard-roan.vercel.app")
         return True
+    elif success:
+        print(f"   ✅ {output}")
+        return True
     else:
         print(f"   ⚠️ Git push issue: {output[:100]}")
         return False
 
 if __name__ == "__main__":
-    sync()
+    sync(force="--force" in sys.argv[1:])
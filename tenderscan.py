@@ -13,8 +13,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import scrapers
-from scrapers.municipalities import scrape_all_municipalities
-from scrapers.soes import scrape_all_soes
+from scrapers.distributed import SELENIUM_SCRAPERS, scrape_distributed
+from scrapers.municipalities import municipality_names, scrape_all_municipalities
+from scrapers.soes import SOE_SCRAPERS, scrape_all_soes
+from scrapers.enrichment import enrich_tenders
 # NOTE: Umgeni, Eskom, SANRAL, Transnet scrapers disabled - etenders.gov.za API returns 405
 # from scrapers.umgeni_water import scrape_umgeni_water
 # from scrapers.eskom import scrape_eskom
@@ -22,12 +24,22 @@ from scrapers.soes import scrape_all_soes
 # from scrapers.transnet import scrape_transnet
 
 # Import utils
-from utils.excel_writer import ExcelWriter
+from utils.excel_writer import ExcelWriter, classify_and_score
 from utils.folder_tools import create_tender_folder, folder_creation_log
 from utils.logging_tools import write_log, log_start, log_end, log_error, rotate_log_if_needed
+from utils.search_index import TenderSearchIndex
+from utils.poll_scheduler import poll_scheduler
+from utils.source_health import source_health
+from utils.change_journal import ChangeJournal, journal_path
+from utils.deadline_timeline import rescore_crossed
+from utils.document_fetcher import fetch_tender_documents
+from utils.pdf_text import document_text_for_tenders
+from utils.rollups import RollupStore, apply_snapshot_delta, snapshot_rollups
+from utils.tender_collector import TenderCollector, dedupe_key
 
 # Import scoring engine
 from scoring_engine import score_tender
+from classify_engine import classify_tender
 
 # ----------------------------------------------------------
 # LOAD CONFIG
@@ -46,6 +58,9 @@ SHEET_NAME = CONFIG["excel"]["tender_log_sheet"]
 # Selenium scraper toggle (set to True to enable)
 ENABLE_SELENIUM = CONFIG.get("scrapers", {}).get("enable_selenium", True)
 
+# Hand sources to queue workers (tools/scrape_workers.py) instead of scraping in-process
+DISTRIBUTED = CONFIG.get("scrapers", {}).get("distributed", False)
+
 # Dashboard retains the last N tenders to avoid an empty UI when no new items are added
 MAX_DASHBOARD_TENDERS = 200
 
@@ -57,18 +72,78 @@ os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 # ----------------------------------------------------------
 # INITIALISE EXCEL WRITER
 # ----------------------------------------------------------
-excel_writer = ExcelWriter(EXCEL_PATH, SHEET_NAME)
+# Full-text search index (tools/search_tenders.py, /api/search)
+search_index = TenderSearchIndex(os.path.join(OUTPUT_DIR, "tender_search.db"))
+excel_writer = ExcelWriter(EXCEL_PATH, SHEET_NAME, search_index=search_index)
+journal = ChangeJournal(journal_path(OUTPUT_DIR))
 
 # ----------------------------------------------------------
 # RUN ALL SCRAPERS
 # ----------------------------------------------------------
-def run_all_scrapers():
-    all_tenders = []
-    
+SELENIUM_SOURCES = tuple(SELENIUM_SCRAPERS)
+
+
+def source_names() -> list:
+    """Every source run_all_scrapers can poll, by the names used for health and scheduling"""
+    names = municipality_names() + [name for name, _ in SOE_SCRAPERS]
+    if ENABLE_SELENIUM:
+        names.extend(SELENIUM_SOURCES)
+    return list(dict.fromkeys(names))
+
+
+def _source_allowed(name, only=None):
+    """
+    Selenium sources: selected for this run and not skipped by the
+    circuit breaker (saves launching Chrome for a dead portal)
+    """
+    if only is not None and name not in only:
+        return False
+    health = source_health()
+    if health.allow(name):
+        return True
+    write_log(LOG_FILE, f"Skipping {name}: circuit open after repeated failures")
+    poll_scheduler().defer(name, health.retry_at(name))
+    return False
+
+
+def _log_source_health():
+    health = source_health()
+    health.save()
+    for row in health.summary():
+        if row["state"] != "closed" or row["skipped"]:
+            write_log(
+                LOG_FILE,
+                f"Source health: {row['source']} {row['state']} "
+                f"({row['consecutive_failures']} consecutive failures, {row['skipped']} skipped runs, "
+                f"retry after {row['retry_at'] or 'next run'}): {row['last_error']}"
+            )
+
+
+def _scrape_distributed(all_tenders, only=None):
+    """Sources go through the work queue; workers on any host pick them up (scrapers/distributed.py)"""
+    write_log(LOG_FILE, "=== Scraping via distributed workers ===")
+    try:
+        tenders, report = scrape_distributed(only=only, selenium=ENABLE_SELENIUM)
+    except Exception as e:
+        log_error(LOG_FILE, f"Distributed scrape failed: {e}")
+        return
+    all_tenders.extend(tenders)
+    write_log(
+        LOG_FILE,
+        f"Distributed run {report['run_id']}: {report['done']}/{report['units']} units, "
+        f"{len(tenders)} tenders from {len(report['workers'])} worker host(s)"
+    )
+    for unit in report["failed"] + report["unfinished"]:
+        pages = " pages {}-{}".format(*unit["pages"]) if unit.get("pages") else ""
+        log_error(LOG_FILE, f"{unit['source']}{pages} not scraped: {unit['error'] or 'no worker finished it in time'}")
+
+
+def _scrape_local(all_tenders, only=None):
+    """Every selected source, one after another in this process"""
     # Municipalities
     write_log(LOG_FILE, "=== Scraping Municipalities ===")
     try:
-        muni_tenders = scrape_all_municipalities()
+        muni_tenders = scrape_all_municipalities(only=only)
         all_tenders.extend(muni_tenders)
         write_log(LOG_FILE, f"Municipalities: {len(muni_tenders)} tenders found")
     except Exception as e:
@@ -77,35 +152,39 @@ def run_all_scrapers():
     # SOEs
     write_log(LOG_FILE, "=== Scraping SOEs ===")
     try:
-        soe_tenders = scrape_all_soes()
+        soe_tenders = scrape_all_soes(only=only)
         all_tenders.extend(soe_tenders)
         write_log(LOG_FILE, f"SOEs: {len(soe_tenders)} tenders found")
     except Exception as e:
         log_error(LOG_FILE, f"SOE scraper failed: {e}")
     
     # National Treasury (Selenium) - Optional
-    if ENABLE_SELENIUM:
+    if ENABLE_SELENIUM and _source_allowed("National Treasury", only):
         write_log(LOG_FILE, "=== Scraping National Treasury (Selenium) ===")
         try:
             from scrapers.national_treasury_selenium import scrape_national_treasury
             nt_tenders = scrape_national_treasury()
             all_tenders.extend(nt_tenders)
+            poll_scheduler().observe("National Treasury", nt_tenders)
             write_log(LOG_FILE, f"National Treasury: {len(nt_tenders)} tenders found")
         except ImportError:
             log_error(LOG_FILE, "Selenium not available - skipping National Treasury")
         except Exception as e:
             log_error(LOG_FILE, f"National Treasury scraper failed: {e}")
+            poll_scheduler().observe("National Treasury", [])
     
     # Johannesburg Water (Selenium) - Optional
-    if ENABLE_SELENIUM:
+    if ENABLE_SELENIUM and _source_allowed("Johannesburg Water", only):
         write_log(LOG_FILE, "=== Scraping Johannesburg Water (Selenium) ===")
         try:
             from scrapers.joburg_water_selenium import scrape_joburg_water_selenium
             jw_tenders = scrape_joburg_water_selenium()
             all_tenders.extend(jw_tenders)
+            poll_scheduler().observe("Johannesburg Water", jw_tenders)
             write_log(LOG_FILE, f"Johannesburg Water: {len(jw_tenders)} tenders found")
         except Exception as e:
             log_error(LOG_FILE, f"Johannesburg Water scraper failed: {e}")
+            poll_scheduler().observe("Johannesburg Water", [])
     
     # NOTE: Disabled non-functional scrapers (405 errors on etenders.gov.za API)
     # TODO: Research correct etenders.gov.za API endpoints for:
@@ -115,17 +194,49 @@ def run_all_scrapers():
     # - Transnet
     
     # Eskom (Direct Tender Bulletin)
-    if ENABLE_SELENIUM:
+    if ENABLE_SELENIUM and _source_allowed("Eskom Tender Bulletin", only):
         write_log(LOG_FILE, "=== Scraping Eskom Tender Bulletin ===")
         try:
             from scrapers.eskom_direct import scrape_eskom_tenders
             eskom_tenders = scrape_eskom_tenders()
             all_tenders.extend(eskom_tenders)
+            poll_scheduler().observe("Eskom Tender Bulletin", eskom_tenders)
             write_log(LOG_FILE, f"Eskom: {len(eskom_tenders)} tenders found")
         except Exception as e:
             log_error(LOG_FILE, f"Eskom tender bulletin scraper failed: {e}")
+            poll_scheduler().observe("Eskom Tender Bulletin", [])
+
+
+def run_all_scrapers(only=None):
+    """Scrape every source, or just the names in `only` (see source_names / tools/poll_sources.py)"""
+    all_tenders = TenderCollector()
+    if DISTRIBUTED:
+        _scrape_distributed(all_tenders, only)
+    else:
+        _scrape_local(all_tenders, only)
+    
+    _log_source_health()
+    poll_scheduler().save()
     
-    return all_tenders
+    if all_tenders.duplicates:
+        write_log(LOG_FILE, f"Dropped {all_tenders.duplicates} duplicate tenders across sources")
+    
+    # Phase 2: detail pages, only for tenders that survive exclusion and are new
+    try:
+        stats = enrich_tenders(
+            all_tenders,
+            known_refs=excel_writer.existing_references(),
+            known_titles=excel_writer.existing_titles(),
+        )
+        write_log(
+            LOG_FILE,
+            f"Detail pages: {stats['enriched']}/{stats['selected']} enriched, "
+            f"{stats['skipped']} skipped (excluded or already logged)"
+        )
+    except Exception as e:
+        log_error(LOG_FILE, f"Detail enrichment failed: {e}")
+    
+    return all_tenders.to_list()
 
 # ----------------------------------------------------------
 # PROCESS TENDERS WITH AI SCORING
@@ -133,103 +244,146 @@ def run_all_scrapers():
 def process_tenders(tenders):
     total_added = 0
     new_items = []
+    document_jobs = []
     excluded_count = 0
 
+    scored = []
     for t in tenders:
         try:
-            ref = t.get("ref", "NA")
-            title = t.get("title", "")
-            description = t.get("description", title)
-            client = t.get("client", "")
-            category = t.get("category", "Unknown")
-            closing_date = t.get("closing_date", "")
-            short_title = t.get("short_title", "Tender")
-            reason = t.get("reason", "")
-            source = t.get("source", "")
-            
             # SKIP EXCLUDED TENDERS (construction, security, etc.)
-            if category == "EXCLUDED":
-                write_log(LOG_FILE, f"[SKIP] {ref}: {reason}")
+            if t.get("category", "Unknown") == "EXCLUDED":
+                write_log(LOG_FILE, f"[SKIP] {t.get('ref', 'NA')}: {t.get('reason', '')}")
                 excluded_count += 1
                 continue
             
-            tender_name = f"{ref} - {title}" if ref and ref != "NA" else title
-            
-            was_added, scores, classification = excel_writer.add_tender_with_scoring(t)
+            classification, scores = classify_and_score(t)
+            scored.append((t, classification, scores))
+        except Exception as e:
+            log_error(LOG_FILE, f"Error processing tender: {e}")
+            continue
+
+    # Write the whole run in one batch: one save (and one column-cache /
+    # rollup refresh) instead of one per new tender
+    try:
+        flags = excel_writer.write_scored_tenders(scored, save=False)
+        if any(flags):
+            excel_writer.save()
+    except Exception as e:
+        log_error(LOG_FILE, f"Tender_Log write failed: {e}")
+        flags = []
+
+    for (t, classification, scores), was_added in zip(scored, flags):
+        if not was_added:
+            continue
+        try:
+            total_added += 1
+            t["scores"] = scores
+            t["category"] = classification["category"]
+            new_items.append(t)
+
+            # Create tender folder
+            folder_path = create_tender_folder(
+                base_dir=ACTIVE_TENDERS_DIR,
+                ref=t.get("ref", "NA"),
+                client=t.get("client", ""),
+                short_title=classification["short_title"]
+            )
+            document_jobs.append((t, folder_path))
+
+            write_log(LOG_FILE, f"[{scores['priority']}] Added: {t.get('title')} → {classification['category']} (Score: {scores['composite_score']})")
 
-            if was_added:
-                total_added += 1
-                t["scores"] = scores
-                new_items.append(t)
-    
-                # Create tender folder
-                folder_path = create_tender_folder(
-                    base_dir=ACTIVE_TENDERS_DIR,
-                    ref=ref,
-                    client=client,
-                    short_title=classification["short_title"]
-                )
-
-                write_log(LOG_FILE, f"[{scores['priority']}] Added: {t.get('title')} → {classification['category']} (Score: {scores['composite_score']})")
-    
         except Exception as e:
             log_error(LOG_FILE, f"Error processing tender: {e}")
             continue
 
     if excluded_count > 0:
         write_log(LOG_FILE, f"Excluded {excluded_count} out-of-scope tenders (construction, security, etc.)")
+
+    # Download linked documents (high-priority and Unknown tenders) into 02_Documents
+    try:
+        fetched = fetch_tender_documents(document_jobs, CONFIG)
+        if fetched:
+            ok = sum(1 for d in fetched if d["status"] == "ok")
+            write_log(LOG_FILE, f"Documents: {ok}/{len(fetched)} downloaded")
+            for d in fetched:
+                if d["status"] != "ok":
+                    log_error(LOG_FILE, f"Document download failed: {d['url']} ({d['error']})")
+    except Exception as e:
+        log_error(LOG_FILE, f"Document fetch stage failed: {e}")
+
+    # Re-check "Unknown" tenders against the text of their documents
+    try:
+        _enrich_from_documents(document_jobs)
+    except Exception as e:
+        log_error(LOG_FILE, f"Document text stage failed: {e}")
+
+    # Index everything added this run in a single transaction, then bring
+    # bid status over from the log (new rows plus hand edits since the last run)
+    try:
+        search_index.upsert_many(new_items)
+        search_index.sync_status(excel_writer.log_statuses())
+    except Exception as e:
+        log_error(LOG_FILE, f"Search index update failed: {e}")
     
     return total_added, new_items
 
+
+def _enrich_from_documents(document_jobs):
+    """
+    Classify with listing text + extracted document text. Only upgrades
+    tenders the listing text left as Unknown; exclusion is still decided
+    by the listing alone (spec boilerplate mentions construction, security...).
+    """
+    text_cache_dir = os.path.join(OUTPUT_DIR, "document_text")
+    enriched = []
+    for t, doc_text in document_text_for_tenders(document_jobs, text_cache_dir):
+        if t.get("category", "Unknown") != "Unknown":
+            continue
+        description = f"{t.get('description', '')} {doc_text}"
+        classification = classify_tender(t.get("title", ""), description)
+        if classification["category"] in ("Unknown", "EXCLUDED"):
+            continue
+
+        t["category"] = classification["category"]
+        t["reason"] = f"From tender documents: {classification.get('reason', '')}"
+        t["scores"] = score_tender(
+            title=t.get("title", ""),
+            description=description,
+            client=t.get("client", ""),
+            closing_date=t.get("closing_date", ""),
+            category=t["category"],
+        )
+        enriched.append(t)
+        write_log(LOG_FILE, f"[DOCS] {t.get('ref')}: Unknown → {t['category']} (Score: {t['scores']['composite_score']})")
+
+    if enriched:
+        # The rows were logged as Unknown during process_tenders - bring Type and scores up to date
+        excel_writer.update_scores(enriched, with_type=True)
+        write_log(LOG_FILE, f"Document text reclassified {len(enriched)} tender(s)")
+
 # ----------------------------------------------------------
 # DASHBOARD SNAPSHOT HELPERS
 # ----------------------------------------------------------
 def _load_existing_tenders(json_path):
-    """Load previously saved tenders so the dashboard keeps historical data."""
+    """Load previously saved tenders (and the snapshot meta) so the dashboard keeps historical data."""
     if os.path.exists(json_path):
         try:
             with open(json_path, "r") as jf:
                 data = json.load(jf)
                 if isinstance(data, dict) and "tenders" in data:
-                    return data["tenders"]
-                return data if isinstance(data, list) else []
+                    return data["tenders"], data.get("meta") or {}
+                return (data if isinstance(data, list) else []), {}
         except Exception as exc:
             log_error(LOG_FILE, f"Failed to read existing tenders snapshot: {exc}")
-    return []
-
-
-def _tender_identity(tender):
-    """Return a stable identifier for merging tender lists."""
-    ref = (tender.get("ref") or "").strip().lower()
-    if ref:
-        return f"ref::{ref}"
-    title = (tender.get("title") or "").strip().lower()
-    if title:
-        return f"title::{title}"
-    source = (tender.get("source") or "unknown").lower()
-    closing = (tender.get("closing_date") or "").lower()
-    try:
-        serialized = json.dumps(tender, sort_keys=True, default=str)
-    except Exception:
-        serialized = f"{source}-{closing}-{tender.get('scores', {}).get('composite', 'na')}"
-    return f"fallback::{serialized}"
+    return [], {}
 
 
 def _merge_tenders(new_items, existing_items, limit=MAX_DASHBOARD_TENDERS):
     """Merge tenders while keeping ordering (newest first) and removing duplicates."""
-    merged = []
-    seen = set()
-
-    for tender in new_items + existing_items:
-        identity = _tender_identity(tender)
-        if identity in seen:
-            continue
-        merged.append(tender)
-        seen.add(identity)
-        if len(merged) >= limit:
-            break
-
-    return merged
+    merged = TenderCollector(limit=limit)
+    merged.extend(new_items)
+    merged.extend(existing_items)
+    return merged.to_list()
 
 # ----------------------------------------------------------
 # SAVE OUTPUT REPORTS
@@ -237,14 +391,27 @@ def _merge_tenders(new_items, existing_items, limit=MAX_DASHBOARD_TENDERS):
 def save_outputs(new_items):
     # Save JSON
     json_path = os.path.join(OUTPUT_DIR, "new_tenders.json")
-    existing_items = _load_existing_tenders(json_path)
+    existing_items, existing_meta = _load_existing_tenders(json_path)
+    
+    # Risk (and so priority) depends on days left: re-score only the
+    # tenders that crossed a deadline threshold since the last check
+    today = datetime.now().strftime("%Y-%m-%d")
+    current_items, rescored = rescore_crossed(existing_items, existing_meta.get("deadlines_checked"), today)
+    if rescored:
+        search_index.upsert_many(rescored)
+        excel_writer.update_scores(rescored)
+        write_log(LOG_FILE, f"Deadline re-scoring: {len(rescored)} tender(s) crossed a risk threshold")
 
-    if new_items:
-        merged_items = _merge_tenders(new_items, existing_items)
+    if new_items or rescored:
+        # Dashboard counters follow the snapshot by delta, not by recount
+        rollups = snapshot_rollups(json_path, existing_items)
+        merged_items = _merge_tenders(new_items, current_items)
+        apply_snapshot_delta(rollups, existing_items, merged_items, dedupe_key)
         
         meta = {
             "last_sync": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "next_run": "Daily 08:00"
+            "next_run": "Daily 08:00",
+            "deadlines_checked": today
         }
 
         output_payload = {
@@ -254,14 +421,20 @@ def save_outputs(new_items):
 
         with open(json_path, "w") as jf:
             json.dump(output_payload, jf, indent=4)
+        RollupStore(json_path).save(rollups)
+        
+        # Downstream steps (email, sync, reports) read these events instead of diffing snapshots
+        event_count = journal.record_snapshot(existing_items, merged_items)
+        journal.prune()
             
         write_log(
             LOG_FILE,
-            f"Dashboard snapshot updated: {len(new_items)} new / {len(merged_items)} retained"
+            f"Dashboard snapshot updated: {len(new_items)} new / {len(merged_items)} retained "
+            f"({event_count} journal events)"
         )
     else:
         if existing_items:
-            write_log(LOG_FILE, "No new tenders - keeping previous dashboard snapshot")
+            write_log(LOG_FILE, "No new tenders or re-scores - keeping previous dashboard snapshot")
         else:
             with open(json_path, "w") as jf:
                 json.dump([], jf, indent=4)
@@ -321,6 +494,13 @@ def save_outputs(new_items):
 # MAIN ENTRY POINT
 # ----------------------------------------------------------
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        # Resident mode: warm state + local control endpoint (utils/scan_daemon.py)
+        from utils.scan_daemon import run_daemon
+        sys.modules["tenderscan"] = sys.modules[__name__]   # scans reuse this module's warm state
+        run_daemon(OUTPUT_DIR)
+        sys.exit(0)
+
     rotate_log_if_needed(LOG_FILE)
     
     write_log(LOG_FILE, "=" * 50)
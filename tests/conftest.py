@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import each other from the repo root (python tenderscan.py, app.py ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
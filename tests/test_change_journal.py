@@ -0,0 +1,85 @@
+import pytest
+
+from utils.change_journal import (
+    ADDED, AMENDED, CLOSED, REMOVED, RESCORED, STATUS_CHANGED,
+    ChangeJournal, diff_tenders, latest_per_tender,
+)
+
+
+def _tender(ref, **fields):
+    return {"ref": ref, "title": f"Tender {ref}", "closing_date": "2026-11-30",
+            "scores": {"priority": "LOW", "composite_score": 4.0}, **fields}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return ChangeJournal(str(tmp_path / "tender_journal.db"))
+
+
+def test_diff_kinds():
+    old = [_tender("A1"), _tender("B2"), _tender("C3", closing_date="2026-10-01"), _tender("D4"), _tender("E5")]
+    new = [
+        _tender("A1"),                                                     # unchanged copy
+        _tender("B2", title="Tender B2 (amended)",
+                scores={"priority": "HIGH", "composite_score": 7.5}),     # amended + re-scored
+        _tender("E5", status="Bid Submitted"),
+        _tender("F6"),
+    ]
+    events = diff_tenders(old, new, today="2026-10-19")
+    kinds = sorted((kind, t["ref"]) for kind, t, _ in events)
+    assert kinds == sorted([
+        (AMENDED, "B2"), (RESCORED, "B2"), (STATUS_CHANGED, "E5"), (ADDED, "F6"),
+        (CLOSED, "C3"), (REMOVED, "D4"),
+    ])
+    changes = {(kind, t["ref"]): c for kind, t, c in events}
+    assert changes[(RESCORED, "B2")] == {"priority": ["LOW", "HIGH"], "composite_score": [4.0, 7.5]}
+    assert changes[(AMENDED, "B2")] == {"title": ["Tender B2", "Tender B2 (amended)"]}
+
+
+def test_identical_objects_produce_no_events():
+    items = [_tender("A1")]
+    assert diff_tenders(items, list(items)) == []
+
+
+def test_consumers_read_past_their_own_cursor(journal):
+    assert journal.record_snapshot([], [_tender("A1"), _tender("B2")]) == 2
+
+    pending = journal.pending("email_digest")
+    assert [e["tender"]["ref"] for e in pending] == ["A1", "B2"]
+    journal.ack("email_digest", pending[-1]["seq"])
+    assert journal.pending("email_digest") == []
+    assert len(journal.pending("search_index")) == 2     # other consumers are independent
+
+    journal.record_snapshot([_tender("A1")], [_tender("A1", status="Won")])
+    assert [e["kind"] for e in journal.pending("email_digest")] == [STATUS_CHANGED]
+    counts, last = journal.pending_counts("search_index")
+    assert counts == {ADDED: 2, STATUS_CHANGED: 1} and last == journal.last_seq()
+
+
+def test_ack_never_moves_backwards(journal):
+    journal.record_snapshot([], [_tender("A1"), _tender("B2")])
+    journal.ack("digest", 2)
+    journal.ack("digest", 1)
+    assert journal.cursor("digest") == 2
+
+
+def test_kind_filter_and_limit(journal):
+    journal.record_snapshot([], [_tender("A1"), _tender("B2")])
+    journal.append(RESCORED, _tender("A1"), {"priority": ["LOW", "HIGH"]})
+    assert [e["kind"] for e in journal.pending("x", kinds=(RESCORED,))] == [RESCORED]
+    assert len(journal.pending("x", limit=1)) == 1
+
+
+def test_latest_per_tender_keeps_the_newest_version(journal):
+    journal.record_snapshot([], [_tender("A1"), _tender("B2")])
+    journal.append(RESCORED, _tender("A1", category="TES"), {"category": ["", "TES"]})
+    latest = latest_per_tender(journal.pending("x"))
+    assert [(t["ref"], t.get("category")) for t in latest] == [("B2", None), ("A1", "TES")]
+
+
+def test_prune_keeps_unread_events(journal):
+    journal.record_snapshot([], [_tender("A1"), _tender("B2")])
+    assert journal.prune(keep_days=0) == 0                # no consumer has read anything
+    journal.ack("digest", 1)
+    assert journal.prune(keep_days=-1) == 1
+    assert [e["tender"]["ref"] for e in journal.pending("other")] == ["B2"]
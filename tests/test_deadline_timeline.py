@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+from scoring_engine import DEADLINE_RISK_DAYS
+from utils.deadline_timeline import DeadlineTimeline, days_until, rescore_crossed, risk_crossings
+from utils.tender_collector import dedupe_key
+
+
+def _tender(ref, closing_date):
+    return {"ref": ref, "title": f"Cooling water treatment {ref}", "category": "TES", "closing_date": closing_date}
+
+
+def test_risk_crossings_follow_the_penalty_days():
+    assert risk_crossings("2026-11-30") == [
+        (date(2026, 11, 30) - timedelta(days=n)).isoformat() for n in DEADLINE_RISK_DAYS
+    ]
+
+
+def test_crossed_between_checks():
+    items = [
+        _tender("A1", "2026-11-05"),     # crosses 14 days on 10-22, 7 days on 10-29
+        _tender("B2", "30/10/2026"),     # non-ISO: crosses on 10-16 and 10-23
+        _tender("C3", "2026-12-31"),
+        _tender("D4", "TBC"),
+    ]
+    timeline = DeadlineTimeline(items)
+    assert len(timeline) == 3
+    assert timeline.crossed("2026-10-20", "2026-10-22") == [dedupe_key(items[0])]
+    assert timeline.crossed("2026-10-22", "2026-10-23") == [dedupe_key(items[1])]
+    assert set(timeline.crossed(None, "2026-10-29")) == {dedupe_key(items[0]), dedupe_key(items[1])}
+    assert timeline.crossed("2026-10-29", "2026-11-30") == []
+
+
+def test_closing_window_queries():
+    items = [_tender("A1", "2026-11-05"), _tender("B2", "30/10/2026"), _tender("C3", "2026-12-31")]
+    timeline = DeadlineTimeline(items)
+    assert [t["ref"] for t in timeline.closing_in(20, today="2026-10-19")] == ["B2", "A1"]
+    assert [t["ref"] for t in timeline.closing_between("2026-11-01", "2026-12-31")] == ["A1", "C3"]
+
+
+def test_rescore_only_touches_crossed_tenders():
+    today = date.today()
+    crossed = _tender("A1", (today + timedelta(days=5)).strftime("%d/%m/%Y"))
+    untouched = _tender("B2", (today + timedelta(days=60)).isoformat())
+    items, rescored = rescore_crossed([crossed, untouched], (today - timedelta(days=30)).isoformat())
+
+    assert [t["ref"] for t in rescored] == ["A1"]
+    assert items[1] is untouched and "scores" not in crossed
+    # the non-ISO date is normalised for scoring, left as scraped on the tender
+    assert any("Tight deadline" in f for f in rescored[0]["scores"]["risk_factors"])
+    assert rescored[0]["closing_date"] == crossed["closing_date"]
+
+
+def test_nothing_to_rescore_returns_the_same_list():
+    items = [_tender("A1", "2026-12-31")]
+    assert rescore_crossed(items, "2026-10-18", today="2026-10-19") == (items, [])
+
+
+def test_days_until():
+    assert days_until("2026-10-25", today="2026-10-19") == 6
+    assert days_until("19/10/2026", today="2026-10-19") == 0
+    assert days_until("", today="2026-10-19") is None
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from openpyxl import Workbook
+
+from utils.importers import ColumnMapper, ImportStats, iter_raw_records, iter_tenders, open_importer
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_csv_headers_are_mapped_and_rows_validated(tmp_path):
+    path = _write(tmp_path / "tenders.csv",
+                  "Reference Number,Tender Title,Organisation,Closing Date\n"
+                  "RW-1,Pump repair,Rand Water,2026-11-01\n"
+                  ",,Eskom,2026-11-02\n"
+                  ",Valve supply,Eskom,\n")
+    stats = ImportStats()
+    tenders = list(iter_tenders(path, stats=stats))
+    assert [t["title"] for t in tenders] == ["Pump repair", "Valve supply"]
+    assert tenders[0] == {"ref": "RW-1", "title": "Pump repair", "description": "Pump repair",
+                          "client": "Rand Water", "closing_date": "2026-11-01", "source": "CSV Import"}
+    assert tenders[1]["ref"] == "NA"
+    assert (stats.read, stats.valid, stats.rejected_total) == (3, 2, 1)
+    assert stats.examples == [(3, "missing title")]
+
+
+def test_configured_column_map(tmp_path):
+    path = _write(tmp_path / "tenders.csv", "Bid Subject,Buyer\nCooling tower service,Sasol\n")
+    tenders = list(iter_tenders(path, column_map={"title": "Bid Subject", "client": ["Buyer"]}))
+    assert tenders[0]["title"] == "Cooling tower service" and tenders[0]["client"] == "Sasol"
+
+    # a configured name wins over another field's built-in alias
+    mapper = ColumnMapper({"description": ["subject"], "title": ["name"]})
+    assert mapper.map_row({"name": "T", "subject": "D"}) == {"title": "T", "description": "D"}
+
+
+def test_jsonl_malformed_lines_are_rejected_not_fatal(tmp_path):
+    path = _write(tmp_path / "tenders.jsonl",
+                  json.dumps({"title": "Pump repair"}) + "\n"
+                  "{not json\n"
+                  "\n"
+                  '["a list"]\n'
+                  + json.dumps({"title": "Valve supply", "ref": "V-2"}) + "\n")
+    stats = ImportStats()
+    tenders = list(iter_tenders(path, stats=stats))
+    assert [t["title"] for t in tenders] == ["Pump repair", "Valve supply"]
+    assert (stats.read, stats.valid) == (4, 2)
+    assert stats.rejected == {"malformed JSON": 1, "not an object": 1}
+    assert stats.examples == [(2, "malformed JSON"), (4, "not an object")]
+
+
+def test_malformed_lines_without_a_callback_are_skipped(tmp_path, capsys):
+    path = _write(tmp_path / "tenders.jsonl", '{"title": "ok"}\n{oops\n')
+    assert list(iter_raw_records(path)) == [{"title": "ok"}]
+    assert "line 2: malformed JSON" in capsys.readouterr().out
+
+
+def test_xlsx_streams_rows_below_the_header_row(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Exported from the portal"])
+    ws.append(["Title", "Client", "Closing"])
+    ws.append(["Pump repair", "Rand Water", None])
+    ws.append([None, None, None])
+    ws.append(["Valve supply", "Eskom", None])
+    path = str(tmp_path / "tenders.xlsx")
+    wb.save(path)
+
+    tenders = list(iter_tenders(path, header_row=2))
+    assert [(t["title"], t["client"]) for t in tenders] == [("Pump repair", "Rand Water"), ("Valve supply", "Eskom")]
+
+
+def test_snapshot_json(tmp_path):
+    path = _write(tmp_path / "new_tenders.json",
+                  json.dumps({"meta": {}, "tenders": [{"ref": "A", "title": "Pump repair", "source": "Eskom"}]}))
+    assert next(iter_tenders(path))["source"] == "Eskom"
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported input format"):
+        open_importer(str(tmp_path / "tenders.txt"))
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from utils.job_runner import JobRunner
+
+
+def _wait(runner, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+@pytest.fixture
+def runner(tmp_path):
+    return JobRunner(str(tmp_path / "jobs"))
+
+
+def _blocking_job(release):
+    def job(progress):
+        progress("scrape")
+        release.wait(5)
+        progress("save")
+        return {"added": 3}
+    return job
+
+
+def test_submit_while_running_is_coalesced(runner):
+    release = threading.Event()
+    first, created = runner.submit("daily", _blocking_job(release))
+    assert created
+
+    again, created_again = runner.submit("daily", _blocking_job(release))
+    assert not created_again
+    assert again["id"] == first["id"]
+    assert again["coalesced"] == 1
+
+    release.set()
+    done = _wait(runner, first["id"])
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"added": 3}
+    assert done["coalesced"] == 1
+    assert [s["name"] for s in done["stages"]] == ["scrape", "save"]
+    assert all(s["finished_at"] for s in done["stages"])
+
+
+def test_new_run_once_the_active_job_finished(runner):
+    first, _ = runner.submit("daily", lambda progress: 1)
+    _wait(runner, first["id"])
+    second, created = runner.submit("daily", lambda progress: 2)
+    assert created and second["id"] != first["id"]
+    assert _wait(runner, second["id"])["result"] == 2
+
+
+def test_other_kinds_are_not_coalesced(runner):
+    release = threading.Event()
+    daily, _ = runner.submit("daily", _blocking_job(release))
+    weekly, created = runner.submit("weekly", lambda progress: "report")
+    assert created and weekly["id"] != daily["id"]
+    assert _wait(runner, weekly["id"])["status"] == "succeeded"
+    release.set()
+    _wait(runner, daily["id"])
+
+
+def test_failure_is_recorded_and_readable_from_another_worker(runner, tmp_path):
+    def broken(progress):
+        progress("scrape")
+        raise RuntimeError("portal down")
+
+    job, _ = runner.submit("daily", broken)
+    done = _wait(runner, job["id"])
+    assert done["status"] == "failed" and done["error"] == "portal down"
+
+    other = JobRunner(str(tmp_path / "jobs"))
+    assert other.get(job["id"])["status"] == "failed"
+    assert other.get("../escape") is None
+    assert [j["id"] for j in other.history()] == [job["id"]]
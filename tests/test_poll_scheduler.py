@@ -0,0 +1,90 @@
+import pytest
+
+from utils.poll_scheduler import PollScheduler, listing_hash
+
+HOUR = 3600
+T0 = 1_800_000_000.0
+SOURCES = ["Rand Water", "Eskom", "Sasol"]
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return PollScheduler(str(tmp_path / "poll_schedule.json"),
+                         {"budget_per_day": 24, "min_interval_hours": 1, "max_interval_hours": 168})
+
+
+def _listing(n, version=0):
+    return [{"ref": f"T{i}", "title": f"Tender {i} v{version}", "closing_date": "2026-11-30"} for i in range(n)]
+
+
+def test_sources_without_history_are_due(scheduler):
+    assert sorted(scheduler.due(SOURCES, now=T0)) == sorted(SOURCES)
+
+
+def test_polled_source_waits_for_its_interval(scheduler):
+    scheduler.observe("Eskom", _listing(3), at=T0)
+    interval = scheduler.plan(SOURCES)["Eskom"]
+    assert "Eskom" not in scheduler.due(SOURCES, now=T0 + 60)
+    assert "Eskom" in scheduler.due(SOURCES, now=T0 + interval * HOUR)
+
+
+def test_empty_or_failed_polls_still_count(scheduler):
+    scheduler.observe("Sasol", _listing(2), at=T0)
+    scheduler.observe("Sasol", [], at=T0 + 10 * HOUR)
+    assert scheduler.sources["Sasol"]["last_polled"] == T0 + 10 * HOUR
+    assert "Sasol" not in scheduler.due(SOURCES, now=T0 + 10 * HOUR + 120)
+    assert scheduler.sources["Sasol"]["polls"] == 0          # no change-rate sample from an empty poll
+
+
+def test_first_empty_poll_of_a_new_source(scheduler):
+    scheduler.observe("Sasol", [], at=T0)
+    assert "Sasol" not in scheduler.due(SOURCES, now=T0 + 120)
+
+
+def test_deferred_source_is_due_at_retry_at(scheduler):
+    scheduler.defer("Rand Water", T0 + 30 * HOUR, at=T0)
+    assert "Rand Water" not in scheduler.due(SOURCES, now=T0 + 29 * HOUR)
+    assert "Rand Water" in scheduler.due(SOURCES, now=T0 + 30 * HOUR)
+
+    scheduler.observe("Rand Water", _listing(1), at=T0 + 30 * HOUR)   # a real poll clears the hold
+    assert "not_before" not in scheduler.sources["Rand Water"]
+
+
+def test_fast_changing_sources_are_polled_more_often(scheduler):
+    at = T0
+    for poll in range(20):
+        scheduler.observe("Rand Water", _listing(5, version=poll), at=at)   # changes every poll
+        scheduler.observe("Eskom", _listing(5), at=at)                      # never changes
+        at += 6 * HOUR
+    plan = scheduler.plan(SOURCES)
+    assert plan["Rand Water"] < plan["Eskom"]
+    assert scheduler.change_rate("Rand Water") > scheduler.change_rate("Eskom")
+
+
+def test_plan_spends_at_most_the_budget(scheduler):
+    names = [f"Source {i}" for i in range(10)]
+    plan = scheduler.plan(names)
+    assert sum(24 / interval for interval in plan.values()) <= 24 + 0.1
+    assert all(1 <= interval <= 168 for interval in plan.values())
+
+
+def test_listing_hash_ignores_order_and_case():
+    listing = _listing(3)
+    shuffled = [{**t, "title": t["title"].upper()} for t in reversed(listing)]
+    assert listing_hash(listing) == listing_hash(shuffled)
+    assert listing_hash(listing) != listing_hash(_listing(3, version=1))
+
+
+def test_state_survives_a_restart(scheduler):
+    scheduler.observe("Eskom", _listing(3), at=T0)
+    scheduler.defer("Sasol", T0 + 50 * HOUR, at=T0)
+    scheduler.save()
+    reloaded = PollScheduler(scheduler.path, scheduler.settings)
+    assert reloaded.due(SOURCES, now=T0 + 60) == ["Rand Water"]
+
+
+def test_state_from_before_empty_polls_were_recorded(scheduler):
+    scheduler.sources["Eskom"] = {"polls": 0.0, "changes": 0.0, "hours": 0.0,
+                                  "last_polled": T0, "last_hash": listing_hash(_listing(3))}
+    assert scheduler.observe("Eskom", _listing(3, version=1), at=T0 + 24 * HOUR)
+    assert scheduler.sources["Eskom"]["hours"] == 24.0
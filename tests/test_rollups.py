@@ -0,0 +1,85 @@
+import random
+
+from utils.rollups import (
+    Rollups, RollupStore, apply_snapshot_delta, log_row_fields, tender_fields,
+)
+from utils.tender_collector import dedupe_key
+
+
+def _tender(i, priority="LOW", score=3.0, status=""):
+    return {
+        "ref": f"T{i}", "title": f"Tender {i}", "source": ["Eskom", "Rand Water", "Sasol"][i % 3],
+        "category": "TES" if i % 2 else "Phakathi", "date_added": f"2026-10-{i % 28 + 1:02d}",
+        "status": status,
+        "scores": {"priority": priority, "composite": score, "tes_suitability": i % 4,
+                   "phakathi_suitability": 2, "industry_matched": "Water"},
+    }
+
+
+def _same(a: Rollups, b: Rollups):
+    assert a.total == b.total
+    assert round(a.score_sum, 6) == round(b.score_sum, 6)
+    for dim, buckets in a.buckets.items():
+        assert {k: (c, round(s, 6)) for k, (c, s) in buckets.items()} == \
+               {k: (c, round(s, 6)) for k, (c, s) in b.buckets[dim].items()}
+
+
+def test_snapshot_delta_matches_a_full_rebuild():
+    rng = random.Random(7)
+    old = [_tender(i) for i in range(40)]
+    rollups = Rollups.build(tender_fields(t) for t in old)
+
+    new = [t for t in old if rng.random() > 0.2]                       # evicted
+    new = [_tender(i, "HIGH", 8.5, "Bid Submitted") if rng.random() < 0.3 else t
+           for i, t in ((int(t["ref"][1:]), t) for t in new)]          # re-scored copies
+    new += [_tender(i) for i in range(40, 50)]                         # added
+
+    apply_snapshot_delta(rollups, old, new, dedupe_key)
+    _same(rollups, Rollups.build(tender_fields(t) for t in new))
+
+
+def test_update_moves_a_tender_between_buckets():
+    rollups = Rollups.build([tender_fields(_tender(1)), tender_fields(_tender(2))])
+    rollups.update(tender_fields(_tender(1)), tender_fields(_tender(1, "HIGH", 9.0)))
+    assert rollups.counts("priority") == {"LOW": 1, "HIGH": 1}
+    assert rollups.average_score("priority", "HIGH") == 9.0
+    assert rollups.average_score() == 6.0
+    assert rollups.counts("status", default="Open") == {"Open": 2}
+
+
+def test_empty_buckets_are_dropped():
+    rollups = Rollups.build([tender_fields(_tender(1))])
+    rollups.remove(tender_fields(_tender(1)))
+    assert rollups.total == 0
+    assert all(not buckets for buckets in rollups.buckets.values())
+
+
+def test_log_row_fields_split_the_industry_column():
+    fields = log_row_fields({"Industry": "Rand Water (Water Treatment)", "Composite Score": float("nan"),
+                             "TES Fit": 7, "Phakathi Fit": 3, "Date Added": "2026-10-19 08:00"})
+    assert (fields["source"], fields["industry"], fields["company"]) == ("Rand Water", "Water Treatment", "TES")
+    assert fields["score"] == 0.0 and fields["day"] == "2026-10-19"
+
+
+def test_store_is_rebuilt_when_the_file_changed_behind_it(tmp_path):
+    store_file = tmp_path / "new_tenders.json"
+    store_file.write_text("[]")
+    store = RollupStore(str(store_file))
+    calls = []
+
+    def rebuild():
+        calls.append(1)
+        return [tender_fields(_tender(1))]
+
+    assert store.load(rebuild).total == 1
+    assert store.load(rebuild).total == 1 and len(calls) == 1      # stored copy matches the file
+
+    rollups = store.load()
+    rollups.add(tender_fields(_tender(2)))
+    store_file.write_text("[1]")
+    store.save(rollups)
+    assert store.load(rebuild).total == 2 and len(calls) == 1      # saved with the write
+
+    store_file.write_text("[1, 2, 3]")
+    assert store.load() is None                                    # changed elsewhere
+    assert store.load(rebuild).total == 1 and len(calls) == 2
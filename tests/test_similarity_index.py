@@ -0,0 +1,34 @@
+from utils.similarity_index import MIN_DF_CUTOFF_ROWS, SimilarityIndex
+
+PUMP = "Supply and installation of borehole pumps"
+
+
+def test_small_corpus_keeps_shared_terms():
+    index = SimilarityIndex()
+    index.add_many([("a", PUMP), ("b", PUMP + " at Vaal"), ("c", "Security guarding services")])
+    assert [key for key, _ in index.similar(PUMP, exclude=("a",))] == ["b"]
+
+
+def test_own_row_does_not_count_towards_df():
+    index = SimilarityIndex()
+    index.add_many([("a", PUMP), ("b", PUMP)])
+    index.add_many((f"other-{i}", f"Catering contract {i} canteen") for i in range(MIN_DF_CUTOFF_ROWS))
+    assert [key for key, _ in index.similar(PUMP, exclude=("a",))] == ["b"]
+
+
+def test_common_terms_are_skipped_in_a_large_corpus():
+    index = SimilarityIndex()
+    index.add_many((f"water-{i}", f"Water supply contract {i}") for i in range(MIN_DF_CUTOFF_ROWS))
+    index.add_many([("pump", "Water pump refurbishment"), ("q", "Water pump spares")])
+    assert [key for key, _ in index.similar("Water pump spares", exclude=("q",))] == ["pump"]
+    # a query made only of common words still ranks on them
+    assert len(index.similar("water supply", k=3)) == 3
+
+
+def test_replaced_and_removed_keys():
+    index = SimilarityIndex()
+    index.add_many([("a", PUMP), ("b", "Security guarding services")])
+    index.add("a", "Security guarding at depots")
+    assert index.remove("b") and not index.remove("b")
+    assert [key for key, _ in index.similar("security guarding")] == ["a"]
+    assert index.similar("borehole pumps") == []
@@ -0,0 +1,111 @@
+import pytest
+
+import utils.source_health as source_health_module
+from utils.source_health import CLOSED, HALF_OPEN, OPEN, SourceHealth, SourceUnavailable
+
+HOUR = 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(source_health_module, "_now", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def health(tmp_path, clock):
+    return SourceHealth(str(tmp_path / "source_health.json"),
+                        {"failure_threshold": 3, "cooldown_hours": 6, "max_cooldown_hours": 20})
+
+
+def _state(health, name="Rand Water"):
+    return health.sources[name]["state"]
+
+
+def test_circuit_opens_after_consecutive_failures(health, clock):
+    health.record_failure("Rand Water", "HTTP 500")
+    health.record_success("Rand Water", 0.5)           # a success resets the run
+    health.record_failure("Rand Water", "HTTP 500")
+    health.record_failure("Rand Water", "HTTP 500")
+    assert _state(health) == CLOSED and health.allow("Rand Water")
+
+    health.record_failure("Rand Water", "HTTP 500")
+    assert _state(health) == OPEN
+    assert health.retry_at("Rand Water") == clock[0] + 6 * HOUR
+    assert not health.allow("Rand Water")
+    assert health.sources["Rand Water"]["skipped"] == 1
+    assert health.open_sources() == ["Rand Water"]
+
+
+def test_half_open_probe_failure_doubles_the_cooldown(health, clock):
+    for _ in range(3):
+        health.record_failure("Rand Water", "timeout")
+    clock[0] += 6 * HOUR
+    assert health.allow("Rand Water")
+    assert _state(health) == HALF_OPEN
+    assert health.retry_at("Rand Water") is None
+
+    health.record_failure("Rand Water", "timeout")      # one failed probe is enough
+    assert _state(health) == OPEN
+    assert health.retry_at("Rand Water") == clock[0] + 12 * HOUR
+
+    clock[0] += 12 * HOUR
+    assert health.allow("Rand Water")
+    health.record_failure("Rand Water", "timeout")
+    assert health.retry_at("Rand Water") == clock[0] + 20 * HOUR   # capped at max_cooldown_hours
+
+
+def test_half_open_probe_success_closes(health, clock):
+    for _ in range(3):
+        health.record_failure("Rand Water", "timeout")
+    clock[0] += 6 * HOUR
+    assert health.allow("Rand Water")
+    health.record_success("Rand Water", 0.8)
+    assert _state(health) == CLOSED
+    assert health.sources["Rand Water"]["open_count"] == 0
+
+    for _ in range(3):
+        health.record_failure("Rand Water", "timeout")
+    assert health.retry_at("Rand Water") == clock[0] + 6 * HOUR     # back to the first cooldown
+
+
+def test_reset_closes_by_hand(health):
+    for _ in range(3):
+        health.record_failure("Eskom", "HTTP 404")
+    health.reset("Eskom")
+    assert _state(health, "Eskom") == CLOSED and health.allow("Eskom")
+
+
+def test_state_survives_a_restart(health, tmp_path, clock):
+    for _ in range(3):
+        health.record_failure("Eskom", "HTTP 404")
+    health.save()
+    reloaded = SourceHealth(health.path)
+    assert not reloaded.allow("Eskom")
+    assert reloaded.retry_at("Eskom") == clock[0] + 6 * HOUR
+
+
+def test_timeouts_adapt_to_observed_latency(health):
+    assert health.timeout_for("Sasol", 20) == 20
+    for _ in range(10):
+        health.record_success("Sasol", 1.0)
+    assert health.timeout_for("Sasol", 20) == 3             # p95 bucket x 1.5, raised to min_timeout
+    for _ in range(10):
+        health.record_success("Sasol", 9.0)
+    assert 9 < health.timeout_for("Sasol", 20) <= 20
+
+
+def test_get_does_not_request_while_open(health):
+    class Session:
+        calls = 0
+
+        def get(self, url, timeout=None, **kwargs):
+            Session.calls += 1
+            raise AssertionError("should not be called")
+
+    for _ in range(3):
+        health.record_failure("Transnet", "HTTP 503")
+    with pytest.raises(SourceUnavailable):
+        health.get("Transnet", "https://example.invalid", session=Session())
+    assert Session.calls == 0
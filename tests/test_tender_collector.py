@@ -0,0 +1,46 @@
+from utils.tender_collector import TenderCollector, dedupe_key, title_client_key
+
+
+def test_real_refs_dedupe_across_spacing_and_case():
+    tenders = TenderCollector()
+    assert tenders.add({"ref": "RW 1234/25", "title": "Pump repair", "source": "Rand Water"})
+    assert not tenders.add({"ref": " rw  1234/25 ", "title": "Pump repair (re-issue)", "source": "Rand Water"})
+    assert tenders.seen("RW 1234/25")
+    assert len(tenders) == 1 and tenders.duplicates == 1
+
+
+def test_placeholder_refs_fall_back_to_the_title():
+    tenders = TenderCollector()
+    assert tenders.add({"ref": "EKU", "title": "Supply of valves"})
+    assert tenders.add({"ref": "EKU", "title": "Supply of pumps"})
+    assert not tenders.add({"ref": "NA", "title": "supply of  VALVES!"})
+    assert dedupe_key({"ref": "EKU", "title": "Supply of valves"}) == "title::supply of valves"
+
+
+def test_generated_refs_dedupe_on_title():
+    tenders = TenderCollector()
+    ref = tenders.placeholder_ref("RW")
+    assert tenders.add({"ref": ref, "title": "Cooling tower service"})
+    # The next row gets a different generated ref but is the same tender
+    assert tenders.seen(tenders.placeholder_ref("RW"), "Cooling tower service")
+
+
+def test_seen_matches_what_add_keys_on():
+    tenders = TenderCollector()
+    title = "Refurbishment of centrifugal pumps " * 5
+    tenders.add({"ref": "", "title": title[:100]})
+    assert tenders.seen("", title[:100])
+    assert not tenders.seen("", title[:150])
+
+
+def test_limit_and_source_counts():
+    tenders = TenderCollector(limit=2)
+    added = tenders.extend({"ref": f"T{i}", "title": f"t{i}", "source": "Eskom"} for i in range(5))
+    assert added == 2 and tenders.full
+    assert tenders.source_counts["Eskom"] == 2
+    assert [t["ref"] for t in tenders] == ["T0", "T1"]
+
+
+def test_title_client_key_ignores_the_ref():
+    assert title_client_key("Pump repair - Phase 2", "Rand Water") == title_client_key("pump repair phase 2", "RAND WATER")
+    assert title_client_key("Pump repair", "Rand Water") != title_client_key("Pump repair", "Eskom")
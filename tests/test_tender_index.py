@@ -0,0 +1,66 @@
+import pytest
+
+from utils.tender_index import QueryError, TenderIndex, decode_cursor, encode_cursor
+
+
+def _tenders():
+    return [
+        {"ref": f"T{i}", "title": f"Tender {i}", "source": "Rand Water" if i % 2 else "Eskom",
+         "category": "TES", "closing_date": f"2026-11-{i + 1:02d}",
+         "scores": {"composite": float(i % 5), "priority": "HIGH" if i % 5 >= 3 else "LOW"}}
+        for i in range(12)
+    ]
+
+
+def _pages(index, params):
+    refs, cursor = [], None
+    while True:
+        page = index.query({**params, "cursor": cursor} if cursor else params)
+        refs.extend(t["ref"] for t in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return refs
+
+
+@pytest.mark.parametrize("sort", ["score", "-score", "closing", "-closing"])
+def test_cursor_pages_cover_the_full_order_once(sort):
+    index = TenderIndex(_tenders(), version="v1")
+    everything = [t["ref"] for t in index.query({"sort": sort, "limit": 100})["items"]]
+    assert _pages(index, {"sort": sort, "limit": 5}) == everything
+    assert len(everything) == 12
+
+
+def test_cursor_pages_with_filters():
+    index = TenderIndex(_tenders(), version="v1")
+    refs = _pages(index, {"sort": "closing", "source": "eskom", "limit": 2})
+    assert refs == ["T0", "T2", "T4", "T6", "T8", "T10"]
+
+
+def test_score_order_breaks_ties_by_position():
+    index = TenderIndex(_tenders(), version="v1")
+    refs = [t["ref"] for t in index.query({"sort": "score", "limit": 4})["items"]]
+    assert refs == ["T4", "T9", "T3", "T8"]
+
+
+def test_cursor_from_another_snapshot_is_rejected():
+    page = TenderIndex(_tenders(), version="v1").query({"limit": 5})
+    with pytest.raises(QueryError, match="expired"):
+        TenderIndex(_tenders(), version="v2").query({"limit": 5, "cursor": page["next_cursor"]})
+
+
+def test_cursor_for_another_sort_is_rejected():
+    index = TenderIndex(_tenders(), version="v1")
+    cursor = index.query({"sort": "score", "limit": 5})["next_cursor"]
+    with pytest.raises(QueryError, match="different sort"):
+        index.query({"sort": "closing", "limit": 5, "cursor": cursor})
+
+
+def test_malformed_cursor():
+    with pytest.raises(QueryError):
+        decode_cursor("not a cursor!")
+    assert decode_cursor(encode_cursor("v1", "-score", 40)) == ("v1", "-score", 40)
+
+
+def test_last_page_has_no_cursor():
+    page = TenderIndex(_tenders(), version="v1").query({"limit": 12})
+    assert page["count"] == 12 and page["next_cursor"] is None
@@ -0,0 +1,86 @@
+import pytest
+
+import utils.work_queue as work_queue_module
+from utils.work_queue import DONE, FAILED, LEASED, QUEUED, SQLiteWorkQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(work_queue_module, "_now", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return SQLiteWorkQueue(str(tmp_path / "work_queue.db"),
+                           {"visibility_timeout": 60, "max_attempts": 3, "retry_delay": 10})
+
+
+def test_units_are_leased_once_in_order(queue):
+    queue.enqueue("run-1", [{"source": "Eskom"}, {"source": "Sasol"}])
+    first = queue.lease("a")
+    second = queue.lease("b")
+    assert (first["payload"], second["payload"]) == ({"source": "Eskom"}, {"source": "Sasol"})
+    assert first["attempts"] == 1
+    assert queue.lease("c") is None
+    assert queue.run_status("run-1") == {QUEUED: 0, LEASED: 2, DONE: 0, FAILED: 0, "total": 2}
+
+
+def test_expired_lease_goes_to_another_worker(queue, clock):
+    queue.enqueue("run-1", [{"source": "Eskom"}])
+    job = queue.lease("a")
+    clock[0] += 59
+    assert queue.lease("b") is None
+
+    clock[0] += 2
+    retry = queue.lease("b")
+    assert retry["id"] == job["id"] and retry["attempts"] == 2
+    assert not queue.heartbeat(job["id"], "a")
+    assert not queue.complete(job["id"], "a", {"tenders": []})       # stale result is dropped
+    assert queue.complete(job["id"], "b", {"tenders": [1]})
+    assert queue.results("run-1")[0]["result"] == {"tenders": [1]}
+
+
+def test_heartbeat_extends_the_lease(queue, clock):
+    queue.enqueue("run-1", [{"source": "Eskom"}])
+    job = queue.lease("a")
+    for _ in range(3):
+        clock[0] += 50
+        assert queue.heartbeat(job["id"], "a")
+    assert queue.lease("b") is None
+    assert queue.complete(job["id"], "a", {"tenders": []})
+
+
+def test_lapsed_leases_stop_at_max_attempts(queue, clock):
+    queue.enqueue("run-1", [{"source": "Eskom"}])
+    for attempt in range(1, 4):
+        job = queue.lease("a")
+        assert job["attempts"] == attempt
+        clock[0] += 61                                               # the worker died mid-unit
+
+    assert queue.lease("a") is None                                  # out of attempts
+    status = queue.results("run-1")[0]
+    assert status["status"] == FAILED and status["error"] == "lease expired" and status["attempts"] == 3
+    assert queue.run_status("run-1")[FAILED] == 1
+
+
+def test_fail_retries_after_the_delay_then_gives_up(queue, clock):
+    queue.enqueue("run-1", [{"source": "Eskom"}])
+    for attempt in range(1, 4):
+        job = queue.lease("a")
+        assert job["attempts"] == attempt
+        assert queue.fail(job["id"], "a", "HTTP 500")
+        assert queue.lease("a") is None                               # not visible during retry_delay
+        clock[0] += 10
+
+    status = queue.results("run-1")[0]
+    assert status["status"] == FAILED and status["error"] == "HTTP 500" and status["attempts"] == 3
+
+
+def test_purge_only_removes_its_run(queue):
+    queue.enqueue("run-1", [{"source": "Eskom"}])
+    queue.enqueue("run-2", [{"source": "Sasol"}])
+    assert queue.purge("run-1") == 1
+    assert queue.run_status("run-1")["total"] == 0
+    assert queue.run_status("run-2")["total"] == 1
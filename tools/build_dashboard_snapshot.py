@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Tuple
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from classify_engine import classify_tender
+from utils.change_journal import ChangeJournal, journal_path
 from scoring_engine import score_tender
 from scrapers.municipalities import scrape_all_municipalities
 from scrapers.soes import (
@@ -186,10 +187,17 @@ def build_summary(meta: Dict[str, Any], tenders: List[dict]) -> Dict[str, Any]:
     }
 
 
-def build_snapshot(limit: int) -> dict:
-    all_tenders = []
-
+def _scrape_sources(distributed: bool) -> list:
     # Keep to non-Selenium sources for CI stability
+    if distributed:
+        from scrapers.distributed import scrape_distributed
+
+        tenders, report = scrape_distributed(selenium=False)
+        print(f"Distributed run {report['run_id']}: {report['done']}/{report['units']} units "
+              f"from {len(report['workers'])} worker host(s)")
+        return tenders
+
+    all_tenders = []
     all_tenders.extend(scrape_all_municipalities())
     soe_scrapers = [
         scrape_rand_water,
@@ -209,6 +217,11 @@ def build_snapshot(limit: int) -> dict:
             all_tenders.extend(scraper())
         except Exception:
             continue
+    return all_tenders
+
+
+def build_snapshot(limit: int, distributed: bool = False) -> dict:
+    all_tenders = _scrape_sources(distributed)
 
     merged = []
     seen = set()
@@ -401,9 +414,20 @@ def main() -> None:
         default=os.environ.get("DASHBOARD_URL") or "https://tender-intelligence-dashboard.vercel.app/",
         help="Dashboard URL to embed in generated email artifact",
     )
+    parser.add_argument(
+        "--journal",
+        default=journal_path(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output")),
+        help="Change journal to record added/amended/closed tenders in (empty string disables; "
+             "email_alerts.py reads the one in the repo's output/)",
+    )
+    parser.add_argument(
+        "--distributed",
+        action="store_true",
+        help="Scrape through the work queue (workers: python tools/scrape_workers.py work)",
+    )
     args = parser.parse_args()
 
-    payload = build_snapshot(limit=args.limit)
+    payload = build_snapshot(limit=args.limit, distributed=args.distributed)
     tenders, meta = validate_payload(payload)
 
     should_write_main = True
@@ -421,7 +445,17 @@ def main() -> None:
             raise
 
     if should_write_main:
+        previous: List[dict] = []
+        if args.journal and os.path.exists(args.out):
+            try:
+                with open(args.out, "r", encoding="utf-8") as f:
+                    previous, _ = validate_payload(json.load(f))
+            except Exception:
+                previous = []
         atomic_write_json(args.out, payload)
+        if args.journal:
+            events = ChangeJournal(args.journal).record_snapshot(previous, tenders)
+            print(f"Journal: {events} change event(s) -> {args.journal}")
 
     public_dir = os.path.abspath(args.public_dir)
     os.makedirs(public_dir, exist_ok=True)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Regenerate the Tender_Log workbook with a streaming (write_only) export.
+
+    python tools/export_tender_log.py                      # restyle/compact the log in place
+    python tools/export_tender_log.py --from output/new_tenders.json --out /tmp/log.xlsx
+"""
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.excel_export import export_tender_log, iter_tender_log, log_row_values, tender_log_row
+from utils.importers import iter_raw_records
+
+
+def _load_config() -> dict:
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f)
+
+
+def main() -> int:
+    config = _load_config()
+    log_path = config["paths"]["tender_log_excel"]
+    sheet_name = config["excel"]["tender_log_sheet"]
+
+    parser = argparse.ArgumentParser(description="Regenerate the Tender_Log workbook (write_only streaming export)")
+    parser.add_argument("--from", dest="source", default=log_path,
+                        help="Tender store to export: an existing Tender_Log .xlsx, or scored tenders "
+                             "as .json snapshot / .jsonl (default: the configured Tender_Log)")
+    parser.add_argument("--out", default=None, help="Output workbook (default: the configured Tender_Log)")
+    args = parser.parse_args()
+
+    out_path = args.out or log_path
+    if not os.path.exists(args.source):
+        print(f"❌ File not found: {args.source}")
+        return 1
+
+    if args.source.lower().endswith((".xlsx", ".xlsm")):
+        rows = (log_row_values(r) for r in iter_tender_log(args.source, sheet_name))
+    else:
+        rows = (tender_log_row(t) for t in iter_raw_records(args.source))
+
+    start = time.time()
+    count = export_tender_log(rows, out_path, sheet_name)
+    print(f"✅ Wrote {count:,} rows to {out_path} in {time.time() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 import argparse
+import heapq
 import json
 import os
 import subprocess
+import sys
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.rollups import Rollups, RollupStore
+
 
 def _now_sast_str() -> str:
     try:
@@ -66,7 +71,20 @@ def _load_payload(path: str) -> Tuple[List[dict], Dict[str, Any]]:
     return tenders, meta
 
 
-def build_summary(tenders: List[dict], meta: Dict[str, Any], build_sha: Optional[str]) -> Dict[str, Any]:
+def _counts_from_rollups(rollups: Rollups) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    by_priority: Dict[str, int] = {}
+    for priority, count in rollups.counts("priority", default="UNKNOWN").items():
+        priority = str(priority).upper()
+        by_priority[priority] = by_priority.get(priority, 0) + count
+    return (
+        rollups.counts("category", default="Unknown"),
+        by_priority,
+        rollups.counts("source", default="Unknown"),
+    )
+
+
+def build_summary(tenders: List[dict], meta: Dict[str, Any], build_sha: Optional[str],
+                  rollups: Optional[Rollups] = None) -> Dict[str, Any]:
     last_sync = meta.get("last_sync") or meta.get("generated_at") or _now_sast_str()
     next_run = meta.get("next_run") or "Daily 08:00"
     build_id = meta.get("build_id") or (f"{last_sync} · {build_sha}" if build_sha else last_sync)
@@ -78,16 +96,17 @@ def build_summary(tenders: List[dict], meta: Dict[str, Any], build_sha: Optional
     scored = []
     for t in tenders:
         company = (t.get("company") or t.get("category") or "Unknown") or "Unknown"
-        by_company[company] = by_company.get(company, 0) + 1
-
         source = (t.get("source") or "Unknown") or "Unknown"
-        by_source[source] = by_source.get(source, 0) + 1
 
         scores = t.get("scores") or {}
         # Support both scoring schemas:
         priority = (scores.get("priority") or t.get("priority") or "UNKNOWN") or "UNKNOWN"
         priority = str(priority).upper()
-        by_priority[priority] = by_priority.get(priority, 0) + 1
+
+        if rollups is None:
+            by_company[company] = by_company.get(company, 0) + 1
+            by_source[source] = by_source.get(source, 0) + 1
+            by_priority[priority] = by_priority.get(priority, 0) + 1
 
         fit = _as_number(scores.get("fit")) if "fit" in scores else _as_number(scores.get("fit_score"))
         revenue = _as_number(scores.get("revenue")) if "revenue" in scores else _as_number(scores.get("revenue_score"))
@@ -119,8 +138,10 @@ def build_summary(tenders: List[dict], meta: Dict[str, Any], build_sha: Optional
             )
         )
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top = [row for _, row in scored[:10]]
+    if rollups is not None:
+        by_company, by_priority, by_source = _counts_from_rollups(rollups)
+
+    top = [row for _, row in heapq.nlargest(10, scored, key=lambda x: x[0])]
 
     return {
         "generated_at": last_sync,
@@ -163,7 +184,9 @@ def main() -> int:
 
     tenders, meta = _load_payload(args.in_path)
     build_sha = _get_git_sha_short(args.repo_root)
-    summary = build_summary(tenders=tenders, meta=meta, build_sha=build_sha)
+    # Stored counters are only used when they match the payload file (no rebuild here)
+    rollups = RollupStore(args.in_path).load()
+    summary = build_summary(tenders=tenders, meta=meta, build_sha=build_sha, rollups=rollups)
     atomic_write_json(args.out_path, summary)
     print(f"OK: wrote {args.out_path} (tenders={len(tenders)})")
     return 0
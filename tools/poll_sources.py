@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Poll sources on their learned change rate instead of all at once each day.
+
+Each source's listing is hashed on every scrape (utils/poll_scheduler.py);
+sources that change often are polled more, static ones less, within
+poll_scheduler.budget_per_day in config.yaml.
+
+    python tools/poll_sources.py plan            # show intervals and what is due
+    python tools/poll_sources.py run             # cron / launchd: scan whatever is due, then exit
+    python tools/poll_sources.py serve           # stay resident, scanning sources as they fall due
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.poll_scheduler import poll_scheduler
+
+MAX_SLEEP = 15 * 60     # re-plan at least this often in serve mode (seconds)
+MIN_SLEEP = 60
+
+
+def _source_names() -> list:
+    from tenderscan import source_names
+    return source_names()
+
+
+def print_plan(sources: list):
+    scheduler = poll_scheduler()
+    rows = scheduler.schedule(sources)
+    per_day = sum(24.0 / r["interval_hours"] for r in rows)
+    print(f"{len(rows)} sources, ~{per_day:.1f} polls/day "
+          f"(budget {scheduler.settings['budget_per_day']})\n")
+    print(f"{'source':26} {'changes/day':>11} {'every':>8}  {'last polled':16}  {'last changed':16}  due")
+    for r in rows:
+        due = "now" if r["overdue_hours"] >= 0 else datetime.fromtimestamp(r["next_due"]).strftime("%Y-%m-%d %H:%M")
+        print(f"{r['source'][:26]:26} {r['changes_per_day']:11.2f} {r['interval_hours']:7.1f}h  "
+              f"{r['last_polled'] or '-':16}  {r['last_changed'] or '-':16}  {due}")
+
+
+def run_due(sources: list) -> list:
+    """Scan the due sources through the normal daily workflow; returns their names"""
+    due = poll_scheduler().due(sources)
+    if not due:
+        print("Nothing due")
+        return []
+    print(f"Due: {', '.join(due)}")
+    from daily_runner import run_daily
+    run_daily(sources=due)
+    return due
+
+
+def serve(sources: list):
+    print(f"Polling {len(sources)} sources (Ctrl+C to stop)")
+    while True:
+        run_due(sources)
+        next_due = poll_scheduler().next_due(sources)
+        wait = MAX_SLEEP if next_due is None else next_due - time.time()
+        wait = min(max(wait, MIN_SLEEP), MAX_SLEEP)
+        print(f"Next check in {wait / 60:.0f} min")
+        time.sleep(wait)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Change-rate adaptive source polling")
+    parser.add_argument("mode", choices=("plan", "run", "serve"), nargs="?", default="plan")
+    args = parser.parse_args()
+
+    sources = _source_names()
+    if args.mode == "plan":
+        print_plan(sources)
+    elif args.mode == "run":
+        run_due(sources)
+    else:
+        try:
+            serve(sources)
+        except KeyboardInterrupt:
+            print("\nStopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+What-if simulation of composite weights and priority thresholds over tender history.
+
+The five sub-scores of every tender are loaded once into an n x 5 matrix
+(read from the columns the search index stores at index time; other
+inputs are cached next to the file as <name>.subscores.npz), then each
+candidate weight set is one column of a 5 x k matrix: composites = S @ W.
+
+    python tools/score_whatif.py --weights fit=0.35,risk=0.10
+    python tools/score_whatif.py --vary revenue=0.10:0.30:0.05 --high 6.5
+    python tools/score_whatif.py --from output/new_tenders.json --weights industry=0.25 --show-top
+"""
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from scoring_engine import COMPANY_PROFILES, SCORING, WEIGHT_KEYS, dimension_scores, score_tender
+from utils.search_index import TenderSearchIndex
+
+CACHE_VERSION = 1
+SEPARATOR = "\x00"
+SUBSCORE_KEYS = ("fit_score", "industry_score", "risk_score", "revenue_score",
+                 *(f"{name}_suitability" for name in COMPANY_PROFILES))
+CANDIDATE_BLOCK = 64   # weight sets evaluated per matrix multiply (bounds the n x k temporary)
+
+# --weights / --vary short names -> scoring config keys
+DIMENSIONS = {key.replace("_weight", ""): key for key in WEIGHT_KEYS}
+
+
+def _default_db_path() -> str:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(os.path.join(root, "config.yaml"), "r") as f:
+            output_dir = yaml.safe_load(f)["paths"]["output_dir"]
+    except Exception:
+        output_dir = os.path.join(root, "output")
+    return os.path.join(output_dir, "tender_search.db")
+
+
+# ----------------------------------------------------------
+# HISTORY -> SUB-SCORE MATRIX
+# ----------------------------------------------------------
+def _index_subscores(path: str):
+    """
+    (S, labels) from the search index's stored sub-scores, so the matrix
+    reflects the scores tenders were given when indexed. Rows indexed
+    before the columns existed are scored once and written back.
+    """
+    index = TenderSearchIndex(path)
+    labels, rows, backfill = [], [], {}
+    for key, title, description, client, closing_date, category, *dims in index.subscore_rows():
+        if any(v is None for v in dims):
+            dims = dimension_scores(score_tender(title or "", description or title or "", client or "",
+                                                 closing_date or "", category or "Unknown"))
+            backfill[key] = dims
+        labels.append(title or "")
+        rows.append(dims)
+    if backfill:
+        index.set_subscores(backfill)
+    return np.asarray(rows, dtype=np.float32).reshape(-1, len(WEIGHT_KEYS)), labels
+
+
+def _iter_history(path: str):
+    """(label, scores) per tender; files without sub-scores are scored here (cached by load_subscores)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        from utils.excel_export import iter_tender_log
+        for row in iter_tender_log(path):
+            title = str(row.get("Tender Name") or "")
+            yield title, score_tender(title, title, str(row.get("Client") or ""),
+                                      str(row.get("Closing Date") or ""), str(row.get("Type") or "Unknown"))
+    else:
+        from utils.importers import iter_raw_records
+        for t in iter_raw_records(path):
+            title = t.get("title") or ""
+            scores = t.get("scores") or {}
+            if not all(k in scores for k in SUBSCORE_KEYS):
+                scores = score_tender(title, t.get("description") or title, t.get("client") or "",
+                                      t.get("closing_date") or "", t.get("category") or "Unknown")
+            yield title, scores
+
+
+def _file_key(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_subscores(path: str):
+    """(S, labels): float32 n x 5 sub-scores in WEIGHT_KEYS order, rebuilt only when `path` changed"""
+    if os.path.splitext(path)[1].lower() == ".db":
+        return _index_subscores(path)
+    cache_path = os.path.splitext(path)[0] + ".subscores.npz"
+    key = (CACHE_VERSION, *_file_key(path))
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as arrays:
+                if tuple(int(v) for v in arrays["key"]) == key:
+                    labels = arrays["labels"].tobytes().decode("utf-8")
+                    return arrays["scores"], labels.split(SEPARATOR) if labels else []
+        except Exception:
+            pass   # corrupt / older layout - rebuild
+
+    labels, rows = [], []
+    for label, scores in _iter_history(path):
+        labels.append(str(label).replace(SEPARATOR, " "))
+        rows.append(dimension_scores(scores))
+    matrix = np.asarray(rows, dtype=np.float32).reshape(-1, len(WEIGHT_KEYS))
+
+    tmp_path = cache_path + ".tmp.npz"
+    try:
+        np.savez(tmp_path, key=np.asarray(key, dtype=np.int64), scores=matrix,
+                 labels=np.frombuffer(SEPARATOR.join(labels).encode("utf-8"), dtype=np.uint8))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return matrix, labels
+
+
+# ----------------------------------------------------------
+# CANDIDATES
+# ----------------------------------------------------------
+def _parse_weights(spec: str) -> dict:
+    weights = {k: SCORING[k] for k in WEIGHT_KEYS}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        if name.strip() not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{name}' (use {', '.join(DIMENSIONS)})")
+        weights[DIMENSIONS[name.strip()]] = float(value)
+    return weights
+
+
+def _parse_vary(spec: str) -> list:
+    name, _, span = spec.partition("=")
+    if name.strip() not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{name}' (use {', '.join(DIMENSIONS)})")
+    lo, hi, step = (float(v) for v in span.split(":"))
+    candidates = []
+    for value in np.arange(lo, hi + step / 2, step):
+        weights = {k: SCORING[k] for k in WEIGHT_KEYS}
+        weights[DIMENSIONS[name.strip()]] = round(float(value), 4)
+        candidates.append(weights)
+    return candidates
+
+
+# ----------------------------------------------------------
+# EVALUATION
+# ----------------------------------------------------------
+def _priorities(composites, high: float, medium: float):
+    """0 = HIGH, 1 = MEDIUM, 2 = LOW, same comparison as scoring_engine.priority_for"""
+    # Round off summation-order noise so e.g. 6.9999999 and 7.0000001 both land on 7.0
+    composites = np.round(composites, 6)
+    return np.where(composites >= high, 0, np.where(composites >= medium, 1, 2)).astype(np.int8)
+
+
+def _top(column, n: int):
+    """Row indices of the n highest composites; ties go to the earlier row"""
+    column = np.round(column, 6)
+    n = min(n, column.shape[0])
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    cutoff = np.partition(column, column.shape[0] - n)[column.shape[0] - n]
+    idx = np.flatnonzero(column >= cutoff)
+    return idx[np.lexsort((idx, -column[idx]))][:n]
+
+
+def simulate(S, candidates: list, high: float, medium: float, top_n: int):
+    """
+    Baseline (current config) plus one result dict per candidate:
+    priority counts, tenders that change priority, and the top-N overlap.
+    """
+    S = S.astype(np.float64)   # same precision as score_tender's composite
+    weights = np.asarray([[c[k] for k in WEIGHT_KEYS] for c in candidates], dtype=np.float64)
+    base_w = np.asarray([SCORING[k] for k in WEIGHT_KEYS], dtype=np.float64)
+    base = S @ base_w
+    base_prio = _priorities(base, SCORING["high_threshold"], SCORING["medium_threshold"])
+    base_top = _top(base, top_n)
+
+    results = []
+    for start in range(0, len(candidates), CANDIDATE_BLOCK):
+        block = S @ weights[start:start + CANDIDATE_BLOCK].T          # n x k
+        prios = _priorities(block, high, medium)
+        for j in range(block.shape[1]):
+            top = _top(block[:, j], top_n)
+            results.append({
+                "weights": candidates[start + j],
+                "counts": np.bincount(prios[:, j], minlength=3),
+                "moved": int((prios[:, j] != base_prio).sum()),
+                "up": int((prios[:, j] < base_prio).sum()),
+                "top": top,
+                "top_kept": len(np.intersect1d(top, base_top)),
+            })
+    baseline = {"counts": np.bincount(base_prio, minlength=3), "top": base_top}
+    return baseline, results
+
+
+def _weights_text(weights: dict) -> str:
+    return "  ".join(f"{weights[k]:.2f}" for k in WEIGHT_KEYS)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate composite weight / threshold changes over tender history")
+    parser.add_argument("--from", dest="source", default=_default_db_path(),
+                        help="Tender history: search index .db (default), scored .json/.jsonl, or Tender_Log .xlsx")
+    parser.add_argument("--weights", action="append", default=[],
+                        help="Candidate as overrides of the config weights, e.g. fit=0.35,risk=0.10 (repeatable)")
+    parser.add_argument("--vary", action="append", default=[],
+                        help="Sweep one weight, others as configured: DIM=LO:HI:STEP (repeatable)")
+    parser.add_argument("--high", type=float, default=SCORING["high_threshold"], help="HIGH threshold for candidates")
+    parser.add_argument("--medium", type=float, default=SCORING["medium_threshold"], help="MEDIUM threshold for candidates")
+    parser.add_argument("--top", type=int, default=10, help="Top-N list size to compare")
+    parser.add_argument("--show-top", action="store_true", help="Print each candidate's top-N titles")
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ numpy is required for score_whatif (pip install numpy)")
+        return 1
+    if not os.path.exists(args.source):
+        print(f"❌ File not found: {args.source}")
+        return 1
+
+    try:
+        candidates = [_parse_weights(spec) for spec in args.weights]
+        for spec in args.vary:
+            candidates.extend(_parse_vary(spec))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not candidates:
+        candidates = [{k: SCORING[k] for k in WEIGHT_KEYS}]   # thresholds-only what-if
+
+    start = time.time()
+    S, labels = load_subscores(args.source)
+    loaded = time.time() - start
+    if not len(S):
+        print("No tenders in history")
+        return 0
+
+    start = time.time()
+    baseline, results = simulate(S, candidates, args.high, args.medium, args.top)
+    elapsed = time.time() - start
+
+    n = len(S)
+    print(f"{n:,} tenders (loaded in {loaded:.2f}s), {len(results)} candidate(s) in {elapsed:.3f}s")
+    print(f"Thresholds: HIGH >= {args.high}, MEDIUM >= {args.medium}\n")
+    dims = "  ".join(f"{name[:4]:>4}" for name in DIMENSIONS)
+    print(f"{'':9}{dims} |   HIGH  MEDIUM     LOW |  moved (up) | top-{args.top} kept")
+    high, medium, low = baseline["counts"]
+    config_weights = {k: SCORING[k] for k in WEIGHT_KEYS}
+    print(f"{'config':9}{_weights_text(config_weights)} | {high:6,} {medium:7,} {low:7,} |")
+    for i, r in enumerate(results, 1):
+        high, medium, low = r["counts"]
+        print(f"{'#' + str(i):9}{_weights_text(r['weights'])} | {high:6,} {medium:7,} {low:7,} | "
+              f"{r['moved']:6,} ({r['up']:,}) | {r['top_kept']}/{len(r['top'])}")
+
+    if args.show_top:
+        print(f"\nconfig top {args.top}:")
+        for idx in baseline["top"]:
+            print(f"   {labels[idx][:90]}")
+        for i, r in enumerate(results, 1):
+            print(f"\n#{i} top {args.top}:")
+            for idx in r["top"]:
+                marker = " " if idx in baseline["top"] else "+"
+                print(f" {marker} {labels[idx][:90]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
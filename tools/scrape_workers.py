@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Distributed scrape workers (scrapers/distributed.py).
+
+Workers lease one source / page range at a time from the work queue
+(work_queue in config.yaml: SQLite file by default, backend: redis to
+share one queue between hosts), heartbeat while scraping and hand the
+result back to the coordinator - tenderscan.py with scrapers.distributed
+enabled, build_dashboard_snapshot.py --distributed, or `scan` below.
+
+    python tools/scrape_workers.py work                  # one worker, until Ctrl+C
+    python tools/scrape_workers.py work --processes 3    # three worker processes
+    python tools/scrape_workers.py scan --sources "Rand Water,Sasol"
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.distributed import run_worker, scrape_distributed
+from utils.browser_pool import browser_pool
+
+
+def _work(idle_exit):
+    browser_pool().keep = True     # resident worker: reuse Chrome between Selenium units
+    try:
+        done = run_worker(idle_exit=idle_exit)
+        print(f"Worker finished: {done} units")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        browser_pool().close()
+
+
+def work(processes: int, idle_exit):
+    if processes <= 1:
+        _work(idle_exit)
+        return
+    procs = [multiprocessing.Process(target=_work, args=(idle_exit,)) for _ in range(processes)]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.join()
+
+
+def scan(sources, selenium: bool):
+    tenders, report = scrape_distributed(only=sources, selenium=selenium)
+    print(json.dumps(report, indent=2, default=str))
+    print(f"{len(tenders)} tenders merged")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Distributed scrape workers")
+    parser.add_argument("mode", choices=("work", "scan"))
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to run (work mode)")
+    parser.add_argument("--idle-exit", type=float, default=None,
+                        help="Stop a worker after this many idle seconds (default: run until stopped)")
+    parser.add_argument("--sources", default="", help="Comma-separated source names (scan mode; default all)")
+    parser.add_argument("--no-selenium", action="store_true", help="Leave Selenium sources out of the scan")
+    args = parser.parse_args()
+
+    if args.mode == "work":
+        work(args.processes, args.idle_exit)
+    else:
+        sources = [s.strip() for s in args.sources.split(",") if s.strip()] or None
+        scan(sources, selenium=not args.no_selenium)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Search tender history from the command line.
+
+Examples:
+  python tools/search_tenders.py pump --client "rand water" --since 6m
+  python tools/search_tenders.py "cooling tower" --priority HIGH --limit 50
+  python tools/search_tenders.py 'title:pump NOT borehole' --raw
+  python tools/search_tenders.py --rebuild-from output/new_tenders.json
+  python tools/search_tenders.py --sync-status
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.excel_writer import ExcelWriter
+from utils.search_index import TenderSearchIndex
+from utils.snapshot_cache import extract_tenders
+
+
+def _config() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(os.path.join(root, "config.yaml"), "r") as f:
+            return yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+
+
+def _default_db_path() -> str:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output_dir = (_config().get("paths") or {}).get("output_dir") or os.path.join(root, "output")
+    return os.path.join(output_dir, "tender_search.db")
+
+
+def _sync_status(index) -> int:
+    """Copy the Tender_Log Status column onto indexed tenders (None if there is no log)"""
+    config = _config()
+    path = (config.get("paths") or {}).get("tender_log_excel")
+    if not path or not os.path.exists(path):
+        return None
+    sheet = (config.get("excel") or {}).get("tender_log_sheet", "Tender_Log")
+    return index.sync_status(ExcelWriter(path, sheet).log_statuses())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Full-text search over indexed tenders")
+    parser.add_argument("query", nargs="?", default="", help="Words to match in title/description/client/ref/reason")
+    parser.add_argument("--db", default=_default_db_path(), help="Search index file")
+    parser.add_argument("--client", help="Client or source contains (e.g. 'rand water')")
+    parser.add_argument("--source", help="Source contains")
+    parser.add_argument("--category", help="Exact category (TES, Phakathi, Both, ...)")
+    parser.add_argument("--priority", help="HIGH, MEDIUM or LOW")
+    parser.add_argument("--since", help="Indexed on/after: YYYY-MM-DD or 30d / 6m / 1y")
+    parser.add_argument("--until", help="Indexed on/before: YYYY-MM-DD or 30d / 6m / 1y")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 unchanged")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--rebuild-from", metavar="JSON", help="Re-index from a tender snapshot file and exit")
+    parser.add_argument("--sync-status", action="store_true",
+                        help="Copy bid status from the tender log into the index and exit")
+    args = parser.parse_args()
+
+    index = TenderSearchIndex(args.db)
+
+    if args.rebuild_from:
+        with open(args.rebuild_from, "r", encoding="utf-8") as f:
+            tenders = extract_tenders(json.load(f))
+        count = index.rebuild(tenders)
+        synced = _sync_status(index)
+        index.optimize()
+        print(f"Indexed {count} tenders into {args.db}"
+              + (f" ({synced} statuses from the tender log)" if synced is not None else ""))
+        return 0
+
+    if args.sync_status:
+        synced = _sync_status(index)
+        if synced is None:
+            print("Tender log not found (paths.tender_log_excel in config.yaml)", file=sys.stderr)
+            return 2
+        print(f"Updated status on {synced} indexed tenders")
+        return 0
+
+    started = time.perf_counter()
+    try:
+        results = index.search(
+            args.query,
+            client=args.client,
+            source=args.source,
+            category=args.category,
+            priority=args.priority,
+            since=args.since,
+            until=args.until,
+            limit=args.limit,
+            raw=args.raw,
+        )
+    except ValueError as e:
+        print(f"Invalid date: {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(f"Search failed: {e}", file=sys.stderr)
+        return 2
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+
+    for r in results:
+        print(f"[{r['priority'] or '-':6}] {r['ref']:<20} {r['title'][:70]}")
+        print(f"         {r['client'] or r['source']} | closes {r['closing_date'] or 'n/a'} | added {r['date_added']}")
+    print(f"\n{len(results)} result(s) from {index.count()} indexed tenders in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Train the statistical tender classifier (utils/text_classifier.py) from labelled history.
+
+Rows labelled TES / Phakathi / Both / Unknown are used; EXCLUDED rows and
+rows the classifier itself labelled are skipped. Unknown (rule-Unknown,
+not excluded) is trained as a class so off-topic tenders are left alone.
+A fixed 10% of tenders (by hash of the text) is held out to report
+accuracy, coverage and per-class precision at the threshold - for
+Unknown rows, how many the model would wrongly promote.
+
+    python tools/train_classifier.py
+    python tools/train_classifier.py --from output/new_tenders.json --threshold 0.85
+    python tools/train_classifier.py --from Tender_Dashboard_v2.xlsx --out /tmp/model.npz
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_classifier import CLASSES, REASON_PREFIX, UNKNOWN, TenderClassifier, classifier_config, np
+
+HOLDOUT_PERCENT = 10
+
+
+def _default_db_path(config: dict) -> str:
+    return os.path.join(os.path.dirname(config["model_path"]), "tender_search.db")
+
+
+def iter_labelled(path: str):
+    """(text, label, reason) per historical tender"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".db":
+        conn = sqlite3.connect(path)
+        try:
+            for title, description, category, reason in conn.execute(
+                    "SELECT title, description, category, reason FROM tenders"):
+                yield f"{title or ''} {description or ''}", category or "", reason or ""
+        finally:
+            conn.close()
+    elif ext in (".xlsx", ".xlsm"):
+        from utils.excel_export import iter_tender_log
+        for row in iter_tender_log(path):
+            yield str(row.get("Tender Name") or ""), str(row.get("Type") or ""), str(row.get("Notes") or "")
+    else:
+        from utils.importers import iter_raw_records
+        for t in iter_raw_records(path):
+            yield (f"{t.get('title') or ''} {t.get('description') or ''}",
+                   t.get("category") or "", t.get("reason") or "")
+
+
+def _is_holdout(text: str) -> bool:
+    return zlib.crc32(text.encode("utf-8")) % 100 < HOLDOUT_PERCENT
+
+
+def main() -> int:
+    config = classifier_config()
+    parser = argparse.ArgumentParser(description="Train the statistical tender classifier")
+    parser.add_argument("--from", dest="source", default=_default_db_path(config),
+                        help="Labelled history: search index .db (default), .json/.jsonl/.csv, or Tender_Log .xlsx")
+    parser.add_argument("--out", default=config["model_path"], help="Model file (.npz)")
+    parser.add_argument("--threshold", type=float, default=config["threshold"],
+                        help="Confidence threshold to report coverage at")
+    parser.add_argument("--alpha", type=float, default=0.5, help="Additive smoothing")
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ numpy is required for train_classifier (pip install numpy)")
+        return 1
+    if not os.path.exists(args.source):
+        print(f"❌ File not found: {args.source}")
+        return 1
+
+    train_texts, train_labels, test_texts, test_labels = [], [], [], []
+    skipped = 0
+    for text, label, reason in iter_labelled(args.source):
+        text = text.strip()
+        if label not in CLASSES or not text or str(reason).startswith(REASON_PREFIX):
+            skipped += 1
+            continue
+        if _is_holdout(text):
+            test_texts.append(text)
+            test_labels.append(label)
+        else:
+            train_texts.append(text)
+            train_labels.append(label)
+
+    if not any(label != UNKNOWN for label in train_labels):
+        print("❌ No labelled TES / Phakathi / Both tenders to train on")
+        return 1
+    if UNKNOWN not in train_labels:
+        print("⚠️ No Unknown tenders in the history - the model will promote every tender it sees")
+
+    start = time.time()
+    model = TenderClassifier(alpha=args.alpha).fit(train_texts, train_labels)
+    print(f"Trained on {len(train_texts):,} tenders in {time.time() - start:.2f}s "
+          f"({skipped:,} unlabelled / classifier-labelled skipped)")
+    for label in CLASSES:
+        print(f"   {label:9} {train_labels.count(label):7,}")
+
+    if test_texts:
+        start = time.time()
+        predictions = model.predict(test_texts)
+        elapsed = max(time.time() - start, 1e-9)
+        correct = sum(1 for (label, _), truth in zip(predictions, test_labels) if label == truth)
+        confident = [(label, truth) for (label, confidence), truth in zip(predictions, test_labels)
+                     if confidence >= args.threshold]
+        confident_correct = sum(1 for label, truth in confident if label == truth)
+
+        print(f"\nHoldout: {len(test_texts):,} tenders")
+        print(f"   Accuracy (all):        {correct / len(test_texts):.1%}")
+        print(f"   Coverage at {args.threshold:.2f}:     {len(confident) / len(test_texts):.1%}")
+        if confident:
+            print(f"   Accuracy at {args.threshold:.2f}:     {confident_correct / len(confident):.1%}")
+        print(f"   Throughput:            {len(test_texts) / elapsed:,.0f} tenders/s")
+
+        print(f"\n   Precision at {args.threshold:.2f} (confident predictions of the class that were right):")
+        for label in CLASSES:
+            predicted = [truth for got, truth in confident if got == label]
+            if predicted:
+                hits = sum(1 for truth in predicted if truth == label)
+                print(f"   {label:9} {hits / len(predicted):7.1%}  ({len(predicted):,} predicted)")
+        unknown_rows = [(label, confidence) for (label, confidence), truth in zip(predictions, test_labels)
+                        if truth == UNKNOWN]
+        if unknown_rows:
+            promoted = sum(1 for label, confidence in unknown_rows
+                           if label != UNKNOWN and confidence >= args.threshold)
+            print(f"   Unknown rows promoted: {promoted / len(unknown_rows):.1%} "
+                  f"({promoted:,} of {len(unknown_rows):,})")
+
+    model.save(args.out)
+    print(f"\n✅ Model saved to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
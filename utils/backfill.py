@@ -0,0 +1,122 @@
+# ==========================================================
+# BACKFILL ENGINE
+# Streams historical tenders in chunks (see utils/importers.py), fans classification
+# and scoring out to a process pool, and hands the results
+# back in input order for one bulk write at the end
+# ==========================================================
+
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from classify_engine import classify_tenders
+from utils.excel_writer import classify_and_score
+
+
+DEFAULT_CHUNK_SIZE = 500
+PROGRESS_EVERY = 5000     # rows between progress lines
+
+
+# ----------------------------------------------------------
+# CHUNKING
+# ----------------------------------------------------------
+def chunked(iterable, size: int):
+    """Yield lists of up to `size` items without materialising the input"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ----------------------------------------------------------
+# WORKERS (top-level so they pickle into the process pool)
+# ----------------------------------------------------------
+def score_record(tender_data: dict):
+    """(tender_data, classification, scores) - the ExcelWriter.write_scored_tenders() item"""
+    classification, scores = classify_and_score(tender_data)
+    return tender_data, classification, scores
+
+
+def reclassify_chunk(chunk: list):
+    """(tender, classification) per tender - current keyword rules plus one batched classifier pass"""
+    classifications = classify_tenders((t.get("title", ""), t.get("description", "")) for t in chunk)
+    return list(zip(chunk, classifications))
+
+
+def reclassify_record(tender: dict):
+    return reclassify_chunk([tender])[0]
+
+
+def _run_chunk(func, chunk, batched=False):
+    return func(chunk) if batched else [func(record) for record in chunk]
+
+
+# ----------------------------------------------------------
+# ENGINE
+# ----------------------------------------------------------
+class Progress:
+    """Rows/sec progress lines every PROGRESS_EVERY rows"""
+
+    def __init__(self, label: str, every: int = PROGRESS_EVERY):
+        self.label = label
+        self.every = every
+        self.done = 0
+        self._printed = 0
+        self._next = every
+        self._start = time.time()
+
+    def update(self, count: int):
+        self.done += count
+        if self.done >= self._next:
+            self._next += self.every
+            self._print()
+
+    def finish(self):
+        if self.done != self._printed:
+            self._print()
+
+    def _print(self):
+        self._printed = self.done
+        elapsed = max(time.time() - self._start, 1e-6)
+        print(f"  [{self.label}] {self.done:,} rows in {elapsed:.1f}s ({self.done / elapsed:,.0f}/s)")
+
+
+def run_backfill(records, func, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 label: str = "BACKFILL", batched: bool = False):
+    """
+    Apply `func` to every record, yielding results in input order.
+
+    Records are pulled from the iterable one chunk at a time and at most
+    2 x workers chunks are in flight, so memory stays flat however large
+    the archive is. workers=1 runs in-process (no pickling overhead).
+    batched=True hands `func` the whole chunk (it returns one result per record).
+    """
+    workers = workers or os.cpu_count() or 1
+    progress = Progress(label)
+
+    if workers <= 1:
+        for chunk in chunked(records, chunk_size):
+            yield from _run_chunk(func, chunk, batched)
+            progress.update(len(chunk))
+        progress.finish()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunked(records, chunk_size):
+            in_flight.append(pool.submit(_run_chunk, func, chunk, batched))
+            if len(in_flight) >= workers * 2:
+                results = in_flight.popleft().result()
+                progress.update(len(results))
+                yield from results
+        while in_flight:
+            results = in_flight.popleft().result()
+            progress.update(len(results))
+            yield from results
+    progress.finish()
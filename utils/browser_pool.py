@@ -0,0 +1,92 @@
+# ==========================================================
+# BROWSER POOL
+# Chrome drivers handed out per scraper key. A one-shot run
+# quits each driver on release (the old behaviour); the scan
+# daemon turns keep on, so drivers are reset and reused by
+# the next scan instead of paying a Chrome start every time.
+# ==========================================================
+
+import threading
+from contextlib import contextmanager
+
+
+class BrowserPool:
+    """
+    with browser_pool().driver("eskom", make_driver) as driver:
+        driver.get(url)
+    """
+
+    def __init__(self, keep: bool = False, max_idle: int = 2):
+        self.keep = keep
+        self.max_idle = max_idle          # idle drivers kept per key
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, key: str, factory):
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                driver = idle.pop() if idle else None
+            if driver is None:
+                self.created += 1
+                return factory()
+            try:
+                driver.current_url          # still attached to a live browser?
+                self.reused += 1
+                return driver
+            except Exception:
+                self._quit(driver)
+
+    def release(self, key: str, driver, broken: bool = False):
+        if driver is None:
+            return
+        if self.keep and not broken:
+            try:
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+                with self._lock:
+                    idle = self._idle.setdefault(key, [])
+                    if len(idle) < self.max_idle:
+                        idle.append(driver)
+                        return
+            except Exception:
+                pass
+        self._quit(driver)
+
+    @contextmanager
+    def driver(self, key: str, factory):
+        driver = self.acquire(key, factory)
+        try:
+            yield driver
+        except Exception:
+            self.release(key, driver, broken=True)
+            raise
+        self.release(key, driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(drivers) for drivers in self._idle.values())
+
+    def close(self):
+        """Quit every idle driver (daemon shutdown)"""
+        with self._lock:
+            drivers = [d for idle in self._idle.values() for d in idle]
+            self._idle = {}
+        for driver in drivers:
+            self._quit(driver)
+
+
+_pool = BrowserPool()
+
+
+def browser_pool() -> BrowserPool:
+    return _pool
@@ -0,0 +1,245 @@
+# ==========================================================
+# TENDER CHANGE JOURNAL
+# Append-only SQLite log of tender events (added / amended /
+# re-scored / status changed / closed / removed) with a
+# monotonic sequence and one cursor per downstream consumer.
+# Consumers read only the events past their cursor and ack
+# once they have acted, so nothing is sent or rebuilt twice.
+# ==========================================================
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from utils.tender_collector import dedupe_key
+
+
+JOURNAL_FILENAME = "tender_journal.db"
+
+ADDED = "added"
+AMENDED = "amended"
+RESCORED = "rescored"
+STATUS_CHANGED = "status_changed"
+CLOSED = "closed"
+REMOVED = "removed"      # evicted from the snapshot while still open
+
+# Snapshot fields whose change makes an event, per kind
+AMEND_FIELDS = ("title", "description", "client", "closing_date", "url", "source")
+SCORE_FIELDS = ("category", "priority", "composite_score")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    tender_key TEXT NOT NULL,
+    ref TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_tender_key ON events(tender_key);
+
+CREATE TABLE IF NOT EXISTS cursors (
+    consumer TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def journal_path(output_dir: str) -> str:
+    return os.path.join(output_dir, JOURNAL_FILENAME)
+
+
+# ----------------------------------------------------------
+# SNAPSHOT DIFF
+# ----------------------------------------------------------
+def _score_fields(t: dict) -> dict:
+    scores = t.get("scores") or {}
+    return {
+        "category": t.get("category") or "",
+        "priority": scores.get("priority") or t.get("priority") or "",
+        "composite_score": scores.get("composite_score", scores.get("composite")),
+    }
+
+
+def _changed(old: dict, new: dict, fields) -> dict:
+    """{field: [old, new]} for the fields that differ"""
+    return {f: [old.get(f), new.get(f)] for f in fields if old.get(f) != new.get(f)}
+
+
+def diff_tenders(old_items: list, new_items: list, key_fn=dedupe_key, today: str = None) -> list:
+    """
+    (kind, tender, changes) events that turn old_items into new_items.
+    A tender can produce several events (e.g. amended and re-scored).
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    old_by_key = {key_fn(t): t for t in old_items}
+    events = []
+    new_keys = set()
+
+    for t in new_items:
+        key = key_fn(t)
+        new_keys.add(key)
+        previous = old_by_key.get(key)
+        if previous is None:
+            events.append((ADDED, t, None))
+            continue
+        if previous is t:
+            continue
+        amended = _changed(previous, t, AMEND_FIELDS)
+        if amended:
+            events.append((AMENDED, t, amended))
+        rescored = _changed(_score_fields(previous), _score_fields(t), SCORE_FIELDS)
+        if rescored:
+            events.append((RESCORED, t, rescored))
+        if (previous.get("status") or "") != (t.get("status") or ""):
+            events.append((STATUS_CHANGED, t, {"status": [previous.get("status"), t.get("status")]}))
+
+    for key, t in old_by_key.items():
+        if key not in new_keys:
+            closing = str(t.get("closing_date") or "")[:10]
+            events.append((CLOSED if closing and closing < today else REMOVED, t, None))
+    return events
+
+
+def latest_per_tender(events: list) -> list:
+    """Collapse events to the newest tender version per key (first-seen order)"""
+    latest = {}
+    for event in events:
+        latest.pop(event["tender_key"], None)
+        latest[event["tender_key"]] = event["tender"]
+    return list(latest.values())
+
+
+# ----------------------------------------------------------
+# JOURNAL
+# ----------------------------------------------------------
+class ChangeJournal:
+    """
+    journal = ChangeJournal(journal_path(OUTPUT_DIR))
+    journal.record_snapshot(old_items, new_items)          # producer
+    events = journal.pending("email_digest", kinds=(ADDED,)) # consumer
+    ... act on events ...
+    journal.ack("email_digest", events[-1]["seq"])
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection; commits on success, always closes"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------
+    # WRITES
+    # ------------------------------------------------------
+    def append_many(self, events, key_fn=dedupe_key) -> int:
+        """Append (kind, tender, changes) events in one transaction; returns the last seq"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (now, kind, key_fn(t), t.get("ref") or "",
+             json.dumps({"tender": t, "changes": changes}, default=str, ensure_ascii=False))
+            for kind, t, changes in events
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO events (created_at, kind, tender_key, ref, payload) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    def append(self, kind: str, tender: dict, changes: dict = None) -> int:
+        return self.append_many([(kind, tender, changes)])
+
+    def record_snapshot(self, old_items: list, new_items: list, key_fn=dedupe_key) -> int:
+        """Journal the difference between two snapshots; returns the number of events"""
+        events = diff_tenders(old_items, new_items, key_fn)
+        if events:
+            self.append_many(events, key_fn)
+        return len(events)
+
+    def ack(self, consumer: str, seq: int) -> None:
+        """Move a consumer's cursor forward to seq (never backwards)"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO cursors (consumer, seq, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(consumer) DO UPDATE SET
+                    seq = MAX(cursors.seq, excluded.seq),
+                    updated_at = excluded.updated_at
+                """,
+                (consumer, int(seq), now),
+            )
+
+    def prune(self, keep_days: int = 90) -> int:
+        """Drop events older than keep_days that every known consumer has already read"""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            floor = conn.execute("SELECT MIN(seq) FROM cursors").fetchone()[0]
+            if floor is None:
+                return 0
+            cur = conn.execute("DELETE FROM events WHERE seq <= ? AND created_at < ?", (floor, cutoff))
+            return cur.rowcount
+
+    # ------------------------------------------------------
+    # READS
+    # ------------------------------------------------------
+    def last_seq(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    def cursor(self, consumer: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT seq FROM cursors WHERE consumer = ?", (consumer,)).fetchone()
+        return row[0] if row else 0
+
+    def events_since(self, seq: int, kinds=None, limit: int = None) -> list:
+        sql = "SELECT seq, created_at, kind, tender_key, ref, payload FROM events WHERE seq > ?"
+        params = [int(seq)]
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        sql += " ORDER BY seq"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        events = []
+        for seq, created_at, kind, key, ref, payload in rows:
+            data = json.loads(payload)
+            events.append({
+                "seq": seq, "created_at": created_at, "kind": kind, "tender_key": key,
+                "ref": ref, "tender": data.get("tender") or {}, "changes": data.get("changes"),
+            })
+        return events
+
+    def pending(self, consumer: str, kinds=None, limit: int = None) -> list:
+        """Events past the consumer's cursor (oldest first)"""
+        return self.events_since(self.cursor(consumer), kinds=kinds, limit=limit)
+
+    def pending_counts(self, consumer: str):
+        """({kind: count}, last seq) past the consumer's cursor, without loading payloads"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT seq FROM cursors WHERE consumer = ?", (consumer,)).fetchone()
+            since = row[0] if row else 0
+            counts = dict(conn.execute(
+                "SELECT kind, COUNT(*) FROM events WHERE seq > ? GROUP BY kind", (since,)
+            ).fetchall())
+            last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        return counts, max(last, since)
@@ -0,0 +1,128 @@
+# ==========================================================
+# CLOSING-DATE TIMELINE
+# Sorted closing dates plus the dates on which each tender's
+# deadline risk changes (scoring_engine.DEADLINE_RISK_DAYS).
+# Finds the tenders whose score went stale since the last run
+# and answers "closing in N days" with two bisects.
+# ==========================================================
+
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scoring_engine import DEADLINE_RISK_DAYS, score_tender
+from utils.tender_collector import dedupe_key
+from utils.tender_index import parse_closing_date
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    return value
+
+
+def days_until(closing_date, today=None):
+    """Whole days from today to the closing date (negative once closed), None if undated"""
+    closing = parse_closing_date(closing_date)
+    if not closing:
+        return None
+    today = _as_date(today) or datetime.now().date()
+    return (_as_date(closing) - today).days
+
+
+def risk_crossings(closing: str) -> list:
+    """
+    Dates (YYYY-MM-DD) from which calculate_risk_score applies each deadline
+    penalty: days_left < N holds from closing - N days onwards.
+    """
+    close = _as_date(closing)
+    return [(close - timedelta(days=n)).isoformat() for n in DEADLINE_RISK_DAYS]
+
+
+class DeadlineTimeline:
+    """
+    Built once per snapshot (or column cache load):
+      - keys sorted by closing date, for closing_between / closing_in
+      - (crossing date, key) pairs sorted by date, for crossed()
+    Queries are O(log n + k); tenders without a parseable date are skipped.
+    """
+
+    def __init__(self, items, key_fn=dedupe_key, closing_fn=None):
+        closing_fn = closing_fn or (lambda t: t.get("closing_date"))
+        self.items = {}
+        dated = []
+        crossings = []
+        for t in items:
+            key = key_fn(t)
+            self.items[key] = t
+            closing = parse_closing_date(closing_fn(t))
+            if not closing:
+                continue
+            dated.append((closing, key))
+            crossings.extend((day, key) for day in risk_crossings(closing))
+
+        dated.sort()
+        crossings.sort()
+        self._closing = [c for c, _ in dated]
+        self._closing_keys = [k for _, k in dated]
+        self._crossing = [d for d, _ in crossings]
+        self._crossing_keys = [k for _, k in crossings]
+
+    def __len__(self):
+        return len(self._closing)
+
+    def closing_between(self, start: str, end: str) -> list:
+        """Tenders closing on or between start and end (YYYY-MM-DD), soonest first"""
+        lo = bisect_left(self._closing, start)
+        hi = bisect_right(self._closing, end)
+        return [self.items[k] for k in self._closing_keys[lo:hi]]
+
+    def closing_in(self, days: int, today=None) -> list:
+        """Tenders still open and closing within `days` days, soonest first"""
+        today = _as_date(today) or datetime.now().date()
+        return self.closing_between(today.isoformat(), (today + timedelta(days=days)).isoformat())
+
+    def crossed(self, since, until=None) -> list:
+        """
+        Keys whose deadline risk changed after `since` and up to `until`
+        (both YYYY-MM-DD; since=None means every crossing up to until).
+        """
+        until = (_as_date(until) or datetime.now().date()).isoformat()
+        lo = bisect_right(self._crossing, _as_date(since).isoformat()) if since else 0
+        hi = bisect_right(self._crossing, until)
+        return list(dict.fromkeys(self._crossing_keys[lo:hi]))
+
+
+def rescore_crossed(items: list, since, today=None, key_fn=dedupe_key):
+    """
+    Re-score only the snapshot tenders whose deadline risk changed since
+    the last check. Returns (items, rescored): a new list with fresh
+    dicts for the re-scored tenders (inputs are not mutated).
+    """
+    today = (_as_date(today) or datetime.now().date()).isoformat()
+    keys = set(DeadlineTimeline(items, key_fn).crossed(since, today))
+    if not keys:
+        return items, []
+
+    result, rescored = [], []
+    for t in items:
+        if key_fn(t) not in keys:
+            result.append(t)
+            continue
+        title = t.get("title", "")
+        fresh = dict(t)
+        fresh["scores"] = score_tender(
+            title=title,
+            description=t.get("description") or title,
+            client=t.get("client", ""),
+            # crossings come from parse_closing_date; calculate_risk_score only reads YYYY-MM-DD
+            closing_date=parse_closing_date(t.get("closing_date")),
+            category=t.get("category", "Unknown"),
+        )
+        result.append(fresh)
+        rescored.append(fresh)
+    return result, rescored
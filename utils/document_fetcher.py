@@ -0,0 +1,424 @@
+# ==========================================================
+# TENDER DOCUMENT FETCHER
+# Downloads linked tender documents into 02_Documents
+# Concurrent, per-host limited, range-resumable,
+# stored once by SHA-256 and hard-linked into each tender
+# ==========================================================
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+from utils.pdf_tools import is_pdf_url
+
+
+PRIORITY_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+DOCUMENTS_SUBFOLDER = "02_Documents"
+MANIFEST_NAME = "manifest.json"
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "min_priority": "HIGH",
+    "fetch_unknown": True,      # also fetch for Unknown tenders, whose documents may classify them
+    "max_workers": 8,
+    "per_host": 2,
+    "timeout": 30,
+    "max_bytes": 200 * 1024 * 1024,
+}
+
+
+# ----------------------------------------------------------
+# HELPERS
+# ----------------------------------------------------------
+def document_urls(tender: dict) -> list:
+    """Document links for a tender: explicit 'documents' plus a direct PDF url"""
+    urls = []
+    for doc in tender.get("documents") or []:
+        url = doc.get("url") if isinstance(doc, dict) else doc
+        if url:
+            urls.append(url)
+    if is_pdf_url(tender.get("url", "")):
+        urls.append(tender["url"])
+    return list(dict.fromkeys(urls))
+
+
+def wants_documents(tender: dict, settings: dict) -> bool:
+    """
+    At or above min_priority, or still Unknown: the document text stage
+    only acts on Unknown tenders, and those rarely score HIGH on listing text
+    """
+    if settings.get("fetch_unknown") and tender.get("category", "Unknown") == "Unknown":
+        return True
+    return meets_priority(tender, settings["min_priority"])
+
+
+def meets_priority(tender: dict, min_priority: str) -> bool:
+    priority = (tender.get("scores") or {}).get("priority") or tender.get("priority") or "LOW"
+    return PRIORITY_ORDER.get(priority.upper(), 0) >= PRIORITY_ORDER.get(min_priority.upper(), 2)
+
+
+def _filename(url: str, response=None) -> str:
+    """File name from Content-Disposition, else the URL path"""
+    name = ""
+    if response is not None:
+        disposition = response.headers.get("content-disposition") or ""
+        match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition, flags=re.I)
+        if match:
+            name = unquote(match.group(1))
+    if not name:
+        name = unquote(os.path.basename(urlsplit(url).path)) or "document"
+    name = re.sub(r"[^A-Za-z0-9._\- ]", "_", name).strip(" .") or "document"
+    return name[:150]
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------
+# FETCHER
+# ----------------------------------------------------------
+class DocumentFetcher:
+    """
+    Content-addressed document store:
+      <store_dir>/objects/ab/abcdef....pdf   one copy per unique document
+      <store_dir>/partial/<sha1(url)>.part   interrupted downloads (resumed with Range)
+    Each tender's 02_Documents/ gets hard links to the objects plus a manifest.json.
+    """
+
+    def __init__(self, store_dir: str, max_workers: int = 8, per_host: int = 2,
+                 timeout: int = 30, max_bytes: int = DEFAULT_SETTINGS["max_bytes"],
+                 user_agent: str = "Mozilla/5.0"):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, "objects")
+        self.partial_dir = os.path.join(store_dir, "partial")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.headers = {"User-Agent": user_agent}
+
+        self._host_lock = threading.Lock()
+        self._host_slots = {}
+        self._url_locks = {}
+        self._downloaded = {}  # url -> download() result for this run
+        self._manifest_lock = threading.Lock()
+        self._local = threading.local()
+
+    # ------------------------------------------------------
+    # CONCURRENCY
+    # ------------------------------------------------------
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        """The same URL linked from several tenders is downloaded once"""
+        with self._host_lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    # ------------------------------------------------------
+    # DOWNLOAD
+    # ------------------------------------------------------
+    def _object_path(self, sha256: str, filename: str) -> str:
+        ext = os.path.splitext(filename)[1].lower()[:10]
+        return os.path.join(self.objects_dir, sha256[:2], sha256 + ext)
+
+    def download(self, url: str) -> dict:
+        """
+        Download url into the object store (resuming any partial file).
+        Returns {sha256, size, filename, content_type, path}.
+        """
+        part_path = os.path.join(self.partial_dir, _url_key(url) + ".part")
+        digest = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part_path):
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    offset += len(chunk)
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self._host_slot(url):
+            response = self._session().get(url, headers=headers, stream=True, timeout=self.timeout)
+            if response.status_code == 416 and offset:
+                # Partial file is stale (remote file shrank): start over
+                response.close()
+                digest = hashlib.sha256()
+                offset = 0
+                response = self._session().get(url, stream=True, timeout=self.timeout)
+            try:
+                response.raise_for_status()
+
+                if offset and response.status_code != 206:
+                    # Server ignored the Range header: restart from scratch
+                    digest = hashlib.sha256()
+                    offset = 0
+
+                size = offset
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise ValueError(f"Document larger than {self.max_bytes} bytes")
+                        digest.update(chunk)
+                        f.write(chunk)
+
+                filename = _filename(url, response)
+                content_type = (response.headers.get("content-type") or "").split(";")[0].strip()
+            finally:
+                response.close()
+
+        sha256 = digest.hexdigest()
+        object_path = self._object_path(sha256, filename)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.exists(object_path):
+            os.remove(part_path)  # already stored via another URL
+        else:
+            os.replace(part_path, object_path)
+
+        return {
+            "sha256": sha256,
+            "size": size,
+            "filename": filename,
+            "content_type": content_type,
+            "path": object_path,
+        }
+
+    # ------------------------------------------------------
+    # TENDER FOLDERS
+    # ------------------------------------------------------
+    @staticmethod
+    def _link(object_path: str, target: str):
+        """Hard link into the tender folder (copy if links are unsupported)"""
+        try:
+            os.link(object_path, target)
+        except OSError:
+            shutil.copy2(object_path, target)
+
+    def _place(self, result: dict, docs_dir: str) -> str:
+        """Link a stored object into docs_dir; returns the file name used"""
+        name = result["filename"]
+        target = os.path.join(docs_dir, name)
+        if os.path.exists(target):
+            if os.path.samefile(target, result["path"]):
+                return name
+            with open(target, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == result["sha256"]:
+                    return name
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}_{result['sha256'][:8]}{ext}"
+            target = os.path.join(docs_dir, name)
+            if os.path.exists(target):
+                return name
+        self._link(result["path"], target)
+        return name
+
+    @staticmethod
+    def _read_manifest(docs_dir: str) -> dict:
+        path = os.path.join(docs_dir, MANIFEST_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"documents": []}
+
+    @staticmethod
+    def _write_manifest(docs_dir: str, manifest: dict):
+        path = os.path.join(docs_dir, MANIFEST_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _fetch_one(self, tender: dict, tender_dir: str, url: str) -> dict:
+        docs_dir = os.path.join(tender_dir, DOCUMENTS_SUBFOLDER)
+        entry = {"url": url, "fetched_at": datetime.now().isoformat(timespec="seconds")}
+        try:
+            with self._url_lock(url):
+                result = self._downloaded.get(url)
+                if result is None or not os.path.exists(result["path"]):
+                    result = self._downloaded[url] = self.download(url)
+            os.makedirs(docs_dir, exist_ok=True)
+            entry.update({
+                "status": "ok",
+                "file": self._place(result, docs_dir),
+                "sha256": result["sha256"],
+                "size": result["size"],
+                "content_type": result["content_type"],
+            })
+        except Exception as e:
+            entry.update({"status": "error", "error": str(e)[:300]})
+
+        with self._manifest_lock:
+            manifest = self._read_manifest(docs_dir)
+            manifest["ref"] = tender.get("ref", "")
+            manifest["documents"] = [d for d in manifest.get("documents", []) if d.get("url") != url]
+            manifest["documents"].append(entry)
+            os.makedirs(docs_dir, exist_ok=True)
+            self._write_manifest(docs_dir, manifest)
+        return entry
+
+    def fetch_all(self, jobs) -> list:
+        """
+        jobs: iterable of (tender, tender_dir).
+        Documents already recorded as ok in a tender's manifest are skipped.
+        Returns the manifest entries written this run.
+        """
+        work = []
+        for tender, tender_dir in jobs:
+            docs_dir = os.path.join(tender_dir, DOCUMENTS_SUBFOLDER)
+            done = {
+                d["url"] for d in self._read_manifest(docs_dir).get("documents", [])
+                if d.get("status") == "ok" and os.path.exists(os.path.join(docs_dir, d.get("file", "")))
+            }
+            for url in document_urls(tender):
+                if url not in done:
+                    work.append((tender, tender_dir, url))
+
+        if not work:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(work)),
+                                thread_name_prefix="docs") as pool:
+            return list(pool.map(lambda job: self._fetch_one(*job), work))
+
+
+def fetch_tender_documents(jobs, config: dict) -> list:
+    """
+    Pipeline entry point. jobs: [(tender, tender_dir)].
+    Reads the 'documents' section of config.yaml and only fetches for
+    tenders at or above documents.min_priority, plus Unknown tenders
+    (documents.fetch_unknown).
+    """
+    settings = dict(DEFAULT_SETTINGS, **(config.get("documents") or {}))
+    if not settings["enabled"]:
+        return []
+
+    selected = [(t, d) for t, d in jobs if wants_documents(t, settings)]
+    if not selected:
+        return []
+
+    paths = config.get("paths", {})
+    store_dir = settings.get("store_dir") or os.path.join(paths.get("output_dir", "output"), "document_store")
+    fetcher = DocumentFetcher(
+        store_dir,
+        max_workers=settings["max_workers"],
+        per_host=settings["per_host"],
+        timeout=settings["timeout"],
+        max_bytes=settings["max_bytes"],
+        user_agent=config.get("scrapers", {}).get("user_agent", "Mozilla/5.0"),
+    )
+    return fetcher.fetch_all(selected)
+
+
+# ==========================================================
+# SELF-TEST (local HTTP stand-in server, no network needed)
+#   python -m utils.document_fetcher
+# ==========================================================
+if __name__ == "__main__":
+    import tempfile
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class RangeHandler(SimpleHTTPRequestHandler):
+        """Static file handler with single-range support"""
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.translate_path(self.path)
+            if not os.path.isfile(path):
+                self.send_error(404)
+                return
+            with open(path, "rb") as f:
+                data = f.read()
+            match = re.match(r"bytes=(\d+)-", self.headers.get("Range") or "")
+            start = int(match.group(1)) if match else 0
+            if start >= len(data) and match:
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206 if match else 200)
+            if match:
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(data) - start))
+            self.end_headers()
+            self.wfile.write(data[start:])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site = os.path.join(tmp, "site")
+        os.makedirs(site)
+        shared = os.urandom(300_000)
+        with open(os.path.join(site, "spec.pdf"), "wb") as f:
+            f.write(shared)
+        with open(os.path.join(site, "spec-copy.pdf"), "wb") as f:
+            f.write(shared)
+        with open(os.path.join(site, "boq.pdf"), "wb") as f:
+            f.write(os.urandom(50_000))
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeHandler, directory=site))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        fetcher = DocumentFetcher(os.path.join(tmp, "store"), per_host=2)
+
+        # Simulate an interrupted download of boq.pdf
+        with open(os.path.join(site, "boq.pdf"), "rb") as f:
+            boq = f.read()
+        with open(os.path.join(fetcher.partial_dir, _url_key(f"{base}/boq.pdf") + ".part"), "wb") as f:
+            f.write(boq[:20_000])
+
+        high = {"ref": "T1", "scores": {"priority": "HIGH"}, "url": f"{base}/spec.pdf",
+                "documents": [f"{base}/boq.pdf", f"{base}/missing.pdf"]}
+        other = {"ref": "T2", "scores": {"priority": "HIGH"}, "url": f"{base}/spec-copy.pdf"}
+        low = {"ref": "T3", "scores": {"priority": "LOW"}, "url": f"{base}/spec.pdf"}
+        dirs = {t["ref"]: os.path.join(tmp, "tenders", t["ref"]) for t in (high, other, low)}
+
+        config = {"documents": {"store_dir": fetcher.store_dir}, "paths": {}}
+        entries = fetch_tender_documents([(t, dirs[t["ref"]]) for t in (high, other, low)], config)
+        server.shutdown()
+
+        ok = [e for e in entries if e["status"] == "ok"]
+        assert len(entries) == 4 and len(ok) == 3, entries
+        assert not os.path.exists(os.path.join(dirs["T3"], DOCUMENTS_SUBFOLDER)), "LOW tender fetched"
+
+        boq_path = os.path.join(dirs["T1"], DOCUMENTS_SUBFOLDER, "boq.pdf")
+        with open(boq_path, "rb") as f:
+            assert f.read() == boq, "resumed download is corrupt"
+
+        spec_a = os.path.join(dirs["T1"], DOCUMENTS_SUBFOLDER, "spec.pdf")
+        spec_b = os.path.join(dirs["T2"], DOCUMENTS_SUBFOLDER, "spec-copy.pdf")
+        assert os.path.samefile(spec_a, spec_b), "identical documents not shared"
+
+        manifest = DocumentFetcher._read_manifest(os.path.join(dirs["T1"], DOCUMENTS_SUBFOLDER))
+        assert {d["status"] for d in manifest["documents"]} == {"ok", "error"}
+        assert fetcher.fetch_all([(other, dirs["T2"])]) == [], "already-fetched document re-downloaded"
+
+        print(f"Document fetcher self-test passed ({len(ok)} downloaded, 1 resumed, 1 shared, 1 missing)")
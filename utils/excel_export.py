@@ -0,0 +1,164 @@
+# ==========================================================
+# STREAMING TENDER LOG EXPORT / FAST LOADER
+# Regenerates the Tender_Log workbook with openpyxl write_only
+# mode (rows are streamed to disk, no cell graph in memory)
+# and reads it back with read_only mode for reports
+# ==========================================================
+
+import os
+import sys
+from datetime import date, datetime
+from itertools import zip_longest
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scoring_engine import score_tender
+from utils.excel_writer import (
+    COLUMN_WIDTHS, HEADER_COLOR, HEADERS, PRIORITY_COLORS, _row_values, scored_tender_fields,
+)
+
+
+HEADER_STYLE = "tender_log_header"
+PRIORITY_COLUMN = HEADERS.index("Priority")
+
+# Keys scored_tender_fields() needs; older snapshots may lack some of them
+REQUIRED_SCORE_KEYS = {
+    "priority", "composite_score", "recommendation", "industry_matched", "fit_score",
+    "risk_level", "revenue_potential", "tes_suitability", "phakathi_suitability",
+}
+
+
+def _priority_style(priority: str) -> str:
+    return f"tender_priority_{priority.lower()}"
+
+
+# ----------------------------------------------------------
+# READ-ONLY LOADER
+# ----------------------------------------------------------
+def iter_tender_log(path: str, sheet_name: str = None):
+    """
+    Yield one dict per Tender_Log row, keyed by HEADERS.
+    Uses read_only + values_only, so no Cell objects are built.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name and sheet_name in wb.sheetnames else wb.active
+        for values in ws.iter_rows(min_row=2, max_col=len(HEADERS), values_only=True):
+            if not values or all(v is None for v in values):
+                continue
+            values = tuple(values) + (None,) * (len(HEADERS) - len(values))
+            yield dict(zip(HEADERS, values))
+    finally:
+        wb.close()
+
+
+def log_row_values(row: dict) -> list:
+    """A loaded Tender_Log row back in HEADERS order"""
+    return [row.get(h) for h in HEADERS]
+
+
+# ----------------------------------------------------------
+# SNAPSHOT TENDERS -> LOG ROWS
+# ----------------------------------------------------------
+def tender_log_row(tender: dict) -> list:
+    """Tender_Log values for a scored tender dict (new_tenders.json / search store shape)"""
+    tender_data = {
+        "ref": tender.get("ref") or "NA",
+        "title": tender.get("title", ""),
+        "client": tender.get("client", ""),
+        "closing_date": tender.get("closing_date", ""),
+        "source": tender.get("source", ""),
+    }
+    classification = {"category": tender.get("category", "Unknown"), "reason": tender.get("reason", "")}
+
+    scores = tender.get("scores") or {}
+    if not REQUIRED_SCORE_KEYS <= scores.keys():
+        scores = score_tender(
+            title=tender_data["title"],
+            description=tender.get("description", tender_data["title"]),
+            client=tender_data["client"],
+            closing_date=tender_data["closing_date"],
+            category=classification["category"],
+        )
+
+    fields = scored_tender_fields(tender_data, classification, scores)
+    return _row_values(**fields, date_added=tender.get("date_added"))
+
+
+# ----------------------------------------------------------
+# WRITE-ONLY EXPORT
+# ----------------------------------------------------------
+def _register_styles(wb: Workbook):
+    """One NamedStyle per priority plus the header; cells only reference them by name"""
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(bold=True, color="FFFFFF")
+    header.fill = PatternFill(start_color=HEADER_COLOR, end_color=HEADER_COLOR, fill_type="solid")
+    header.alignment = Alignment(horizontal="center")
+    wb.add_named_style(header)
+
+    for priority, color in PRIORITY_COLORS.items():
+        style = NamedStyle(name=_priority_style(priority))
+        style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        wb.add_named_style(style)
+
+
+def _cell_value(value):
+    # Keep dates as text, matching what ExcelWriter writes
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def export_tender_log(rows, path: str, sheet_name: str = "Tender_Log") -> int:
+    """
+    Write HEADERS-ordered rows to a fresh workbook in write_only mode and
+    atomically replace `path`. Rows are consumed lazily, so memory stays
+    flat for any log size. Returns the number of rows written.
+    """
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    ws = wb.create_sheet(sheet_name)
+
+    for col_letter, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[col_letter].width = width
+    ws.freeze_panes = "A2"
+
+    header_cells = []
+    for header in HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = HEADER_STYLE
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # One styled row of cells per priority, reused for every row: a
+    # write_only sheet serialises each row on append(), so only the
+    # values change and the style lookup happens once per priority
+    styled_rows = {}
+    for priority in PRIORITY_COLORS:
+        cells = [WriteOnlyCell(ws) for _ in HEADERS]
+        for cell in cells:
+            cell.style = _priority_style(priority)
+        styled_rows[priority] = cells
+
+    count = 0
+    for values in rows:
+        cells = styled_rows.get(values[PRIORITY_COLUMN])
+        if cells is None:
+            ws.append([_cell_value(v) for v in values])
+        else:
+            # zip_longest blanks cells a short row does not reach
+            for cell, value in zip_longest(cells, values[:len(HEADERS)]):
+                cell.value = _cell_value(value)
+            ws.append(cells)
+        count += 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp.xlsx"
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+    return count
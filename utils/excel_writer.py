@@ -13,6 +13,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from classify_engine import classify_tender
 from scoring_engine import score_tender
+from utils.tender_collector import title_client_key
 
 
 # Column headers (with new scoring columns)
@@ -44,24 +45,192 @@ PRIORITY_COLORS = {
     "LOW": "C8E6C9"       # Green
 }
 
+# One shared fill per priority (openpyxl de-duplicates styles, but building
+# a new PatternFill for every cell is wasted work on big writes)
+PRIORITY_FILLS = {
+    priority: PatternFill(start_color=color, end_color=color, fill_type="solid")
+    for priority, color in PRIORITY_COLORS.items()
+}
+
+HEADER_COLOR = "2E7D32"
+
+# Column widths, in HEADERS order
+COLUMN_WIDTHS = {
+    'A': 40,  # Tender Name
+    'B': 20,  # Client
+    'C': 12,  # Type
+    'D': 25,  # Industry
+    'E': 10,  # Fit Score
+    'F': 14,  # Composite Score
+    'G': 10,  # Priority
+    'H': 10,  # TES Fit
+    'I': 12,  # Phakathi Fit
+    'J': 12,  # Risk Level
+    'K': 15,  # Revenue Potential
+    'L': 10,  # Stage
+    'M': 12,  # Closing Date
+    'N': 10,  # Status
+    'O': 15,  # Next Action
+    'P': 50,  # Notes
+    'Q': 20,  # Reference Number
+    'R': 12,  # Date Added
+}
+
+
+# ==========================================================
+# ROW BUILDING (shared by single and bulk writes)
+# ==========================================================
+def _row_values(tender_name, client, tender_type, industry, fit_score, stage, closing_date,
+                status, next_action, notes, reference_number, composite_score=None,
+                priority=None, risk_level=None, revenue_potential=None,
+                tes_fit=None, phakathi_fit=None, date_added=None) -> list:
+    """Cell values in HEADERS order"""
+    return [
+        tender_name,
+        client,
+        tender_type,
+        industry,
+        fit_score,
+        composite_score or fit_score,
+        priority or "MEDIUM",
+        tes_fit or 0,
+        phakathi_fit or 0,
+        risk_level or "Medium",
+        revenue_potential or "Medium",
+        stage,
+        closing_date,
+        status,
+        next_action,
+        notes,
+        reference_number,
+        date_added or datetime.now().strftime("%Y-%m-%d")
+    ]
+
+
+def classify_and_score(tender_data: dict):
+    """
+    Classification + AI scoring for one tender, with no Excel access
+    (safe to run in worker processes). Returns (classification, scores).
+    """
+    classification = classify_tender(tender_data["title"], tender_data["description"])
+    scores = score_tender(
+        title=tender_data["title"],
+        description=tender_data["description"],
+        client=tender_data["client"],
+        closing_date=tender_data["closing_date"],
+        category=classification["category"]
+    )
+    return classification, scores
+
+
+def log_tender_name(ref, title) -> str:
+    """Tender Name column value: 'REF - title', or the bare title for missing refs"""
+    return f"{ref} - {title}" if ref and ref != "NA" else title
+
+
+def log_row_tender(tender_name, reference_number) -> dict:
+    """{'ref', 'title'} of a Tender_Log row (the inverse of log_tender_name)"""
+    name = str(tender_name or "").strip()
+    ref = str(reference_number or "").strip()
+    prefix = f"{ref} - "
+    if ref and ref != "NA" and name.startswith(prefix):
+        name = name[len(prefix):]
+    return {"ref": ref, "title": name}
+
+
+def scored_tender_fields(tender_data: dict, classification: dict, scores: dict) -> dict:
+    """write_tender() keyword arguments for a classified and scored tender"""
+    category = classification["category"]
+    reason = classification["reason"]
+    priority = scores["priority"]
+    composite_score = scores["composite_score"]
+
+    tender_name = log_tender_name(tender_data['ref'], tender_data['title'])
+
+    # Build notes with scoring info
+    enhanced_notes = f"{reason}\n" if reason else ""
+    enhanced_notes += f"[AI Score: {composite_score}/10 | Priority: {priority}]"
+    enhanced_notes += f"\n{scores['recommendation']}"
+
+    return {
+        "tender_name": tender_name,
+        "client": tender_data["client"],
+        "tender_type": category,
+        "industry": f"{tender_data['source']} ({scores['industry_matched']})",
+        "fit_score": scores["fit_score"],
+        "stage": "New",
+        "closing_date": tender_data["closing_date"],
+        "status": "Open",
+        "next_action": "Review" if priority == "LOW" else "Prepare Bid" if priority == "MEDIUM" else "URGENT BID",
+        "notes": enhanced_notes,
+        "reference_number": tender_data["ref"],
+        "composite_score": composite_score,
+        "priority": priority,
+        "risk_level": scores["risk_level"],
+        "revenue_potential": scores["revenue_potential"],
+        "tes_fit": scores["tes_suitability"],
+        "phakathi_fit": scores["phakathi_suitability"],
+    }
+
 
 class ExcelWriter:
     """Writes tender data to Excel spreadsheet with scoring"""
     
-    def __init__(self, file_path: str, sheet_name: str = "Tender_Log"):
+    def __init__(self, file_path: str, sheet_name: str = "Tender_Log", search_index=None):
+        from utils.log_cache import TenderLogCache
+        from utils.rollups import RollupStore
+        
         self.file_path = file_path
         self.sheet_name = sheet_name
+        self.search_index = search_index    # TenderSearchIndex kept in step with Status edits
+        self.log_cache = TenderLogCache(file_path, sheet_name)
+        self.rollup_store = RollupStore(file_path)
+        self._wb = None
+        self._refs = None
+        self._names = None
+        self._titles = None
+        self._rollups = None
+        self._file_key = None
         self._ensure_workbook()
     
     def _ensure_workbook(self):
         """Create workbook if it doesn't exist"""
-        if os.path.exists(self.file_path):
-            self.wb = load_workbook(self.file_path)
-        else:
-            self.wb = Workbook()
-            self.wb.active.title = self.sheet_name
+        if not os.path.exists(self.file_path):
+            self._wb = Workbook()
+            self._wb.active.title = self.sheet_name
             self._write_headers()
-            self.wb.save(self.file_path)
+            self._wb.save(self.file_path)
+    
+    @property
+    def wb(self):
+        """Full read/write workbook, loaded on first write (readers use the column cache)"""
+        if self._wb is None:
+            self._file_key = self._file_key or self._stat()
+            self._wb = load_workbook(self.file_path)
+        return self._wb
+    
+    def _stat(self):
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def refresh_if_changed(self) -> bool:
+        """
+        Drop the in-memory workbook, key sets and rollups if the file was
+        changed by someone else since it was loaded (long-lived processes
+        call this before each run so hand edits are never overwritten)
+        """
+        if self._wb is None and self._refs is None and self._rollups is None:
+            return False
+        if self._stat() == self._file_key:
+            return False
+        self._wb = None
+        self._refs = self._names = self._titles = None
+        self._rollups = None
+        self._file_key = None
+        return True
     
     def _write_headers(self):
         """Write column headers with formatting"""
@@ -69,7 +238,7 @@ class ExcelWriter:
         
         # Header style
         header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="2E7D32", end_color="2E7D32", fill_type="solid")
+        header_fill = PatternFill(start_color=HEADER_COLOR, end_color=HEADER_COLOR, fill_type="solid")
         
         for col, header in enumerate(HEADERS, 1):
             cell = ws.cell(row=1, column=col, value=header)
@@ -78,41 +247,68 @@ class ExcelWriter:
             cell.alignment = Alignment(horizontal="center")
         
         # Set column widths
-        col_widths = {
-            'A': 40,  # Tender Name
-            'B': 20,  # Client
-            'C': 12,  # Type
-            'D': 25,  # Industry
-            'E': 10,  # Fit Score
-            'F': 14,  # Composite Score
-            'G': 10,  # Priority
-            'H': 10,  # TES Fit
-            'I': 12,  # Phakathi Fit
-            'J': 12,  # Risk Level
-            'K': 15,  # Revenue Potential
-            'L': 10,  # Stage
-            'M': 12,  # Closing Date
-            'N': 10,  # Status
-            'O': 15,  # Next Action
-            'P': 50,  # Notes
-            'Q': 20,  # Reference Number
-            'R': 12,  # Date Added
-        }
-        
-        for col_letter, width in col_widths.items():
+        for col_letter, width in COLUMN_WIDTHS.items():
             ws.column_dimensions[col_letter].width = width
     
-    def _get_existing_references(self):
-        """Get set of existing tender reference numbers"""
+    def _load_keys(self):
+        """Reference, name and title+client sets, built once from the column cache and kept current on append"""
+        if self._refs is None:
+            self._file_key = self._file_key or self._stat()
+            cols = self.log_cache.load()
+            self._refs = {r.strip().upper() for r in cols["Reference Number"] if r.strip()}
+            self._names = {n.strip().upper() for n in cols["Tender Name"] if n.strip()}
+            self._titles = {
+                title_client_key(log_row_tender(name, ref)["title"], client)
+                for name, ref, client in zip(cols["Tender Name"], cols["Reference Number"], cols["Client"])
+            }
+    
+    def existing_references(self):
+        """Set of logged reference numbers (upper-cased)"""
+        self._load_keys()
+        return self._refs
+    
+    def existing_titles(self):
+        """Set of title_client_key() values of logged tenders (matches rows whatever ref they were given)"""
+        self._load_keys()
+        return self._titles
+    
+    def _existing_names(self):
+        """Get set of existing tender names (upper-cased)"""
+        self._load_keys()
+        return self._names
+    
+    @property
+    def rollups(self):
+        """Counters for this log (utils/rollups.py), loaded before the first change"""
+        if self._rollups is None:
+            self._file_key = self._file_key or self._stat()
+            from utils.rollups import tender_log_rollups
+            self._rollups = tender_log_rollups(self.file_path, self.rollup_store)
+        return self._rollups
+    
+    def _append_row(self, data: list, priority: str = None):
+        """Append one row of HEADERS-ordered values, coloured by priority"""
+        from utils.rollups import log_row_fields
+        
+        self.rollups.add(log_row_fields(dict(zip(HEADERS, data))))
         ws = self.wb.active
-        existing = set()
+        row = ws.max_row + 1
         
-        for row in range(2, ws.max_row + 1):
-            ref = ws.cell(row=row, column=17).value  # Reference Number column
-            if ref:
-                existing.add(str(ref).strip().upper())
+        fill = PRIORITY_FILLS.get(priority)
         
-        return existing
+        for col, value in enumerate(data, 1):
+            cell = ws.cell(row=row, column=col, value=value)
+            
+            # Apply priority color to the row
+            if fill is not None:
+                cell.fill = fill
+        
+        self._load_keys()
+        ref_normalized = str(data[16] or "").strip().upper()
+        if ref_normalized:
+            self._refs.add(ref_normalized)
+        self._names.add(str(data[0] or "").strip().upper())
+        self._titles.add(title_client_key(log_row_tender(data[0], data[16])["title"], data[1]))
     
     def write_tender(self, tender_name: str, client: str, tender_type: str,
                     industry: str, fit_score: int, stage: str, closing_date: str,
@@ -126,138 +322,182 @@ class ExcelWriter:
         """
         
         # Check for duplicates
-        existing = self._get_existing_references()
+        existing = self.existing_references()
         ref_normalized = str(reference_number).strip().upper()
         
         if ref_normalized and ref_normalized != "NA" and ref_normalized in existing:
             return False  # Duplicate
         
         # Also check by tender name
-        ws = self.wb.active
-        for row in range(2, ws.max_row + 1):
-            existing_name = ws.cell(row=row, column=1).value
-            if existing_name and existing_name.strip().upper() == tender_name.strip().upper():
-                return False  # Duplicate
+        if tender_name.strip().upper() in self._existing_names():
+            return False  # Duplicate
         
         # Add new row
-        row = ws.max_row + 1
-        
-        data = [
-            tender_name,
-            client,
-            tender_type,
-            industry,
-            fit_score,
-            composite_score or fit_score,
-            priority or "MEDIUM",
-            tes_fit or 0,
-            phakathi_fit or 0,
-            risk_level or "Medium",
-            revenue_potential or "Medium",
-            stage,
-            closing_date,
-            status,
-            next_action,
-            notes,
-            reference_number,
-            datetime.now().strftime("%Y-%m-%d")
-        ]
-        
-        for col, value in enumerate(data, 1):
-            cell = ws.cell(row=row, column=col, value=value)
-            
-            # Apply priority color to the row
-            if priority and priority in PRIORITY_COLORS:
-                cell.fill = PatternFill(
-                    start_color=PRIORITY_COLORS[priority],
-                    end_color=PRIORITY_COLORS[priority],
-                    fill_type="solid"
-                )
+        self._append_row(_row_values(
+            tender_name, client, tender_type, industry, fit_score, stage, closing_date,
+            status, next_action, notes, reference_number, composite_score, priority,
+            risk_level, revenue_potential, tes_fit, phakathi_fit
+        ), priority)
         
         # Save workbook
-        self.wb.save(self.file_path)
+        self.save()
         return True
 
     def add_tender_with_scoring(self, tender_data: dict):
         """
         Scores a tender and writes it to the Excel file.
         """
-        # Classify tender (returns dict)
-        classification = classify_tender(tender_data["title"], tender_data["description"])
-        category = classification["category"]
-        reason = classification["reason"]
-        short_title = classification["short_title"]
-
-        tender_name = f"{tender_data['ref']} - {tender_data['title']}" if tender_data['ref'] and tender_data['ref'] != "NA" else tender_data['title']
-
-        # AI SCORING ENGINE
-        scores = score_tender(
-            title=tender_data["title"],
-            description=tender_data["description"],
-            client=tender_data["client"],
-            closing_date=tender_data["closing_date"],
-            category=category
-        )
-
-        fit_score = scores["fit_score"]
-        composite_score = scores["composite_score"]
-        priority = scores["priority"]
-        recommendation = scores["recommendation"]
-
-        # Build notes with scoring info
-        enhanced_notes = f"{reason}\n" if reason else ""
-        enhanced_notes += f"[AI Score: {composite_score}/10 | Priority: {priority}]"
-        enhanced_notes += f"\n{recommendation}"
-
-        # Write to Excel
-        was_added = self.write_tender(
-            tender_name=tender_name,
-            client=tender_data["client"],
-            tender_type=category,
-            industry=f"{tender_data['source']} ({scores['industry_matched']})",
-            fit_score=fit_score,
-            stage="New",
-            closing_date=tender_data["closing_date"],
-            status="Open",
-            next_action="Review" if priority == "LOW" else "Prepare Bid" if priority == "MEDIUM" else "URGENT BID",
-            notes=enhanced_notes,
-            reference_number=tender_data["ref"],
-            composite_score=composite_score,
-            priority=priority,
-            risk_level=scores["risk_level"],
-            revenue_potential=scores["revenue_potential"],
-            tes_fit=scores["tes_suitability"],
-            phakathi_fit=scores["phakathi_suitability"]
-        )
-
+        classification, scores = classify_and_score(tender_data)
+        was_added = self.write_tender(**scored_tender_fields(tender_data, classification, scores))
         return was_added, scores, classification
+
+    def write_scored_tenders(self, items, save: bool = True) -> list:
+        """
+        Bulk write for backfills: items is an iterable of
+        (tender_data, classification, scores) from classify_and_score().
+        Duplicate checks use the writer's reference/name sets, and the workbook
+        is saved once at the end (save=False leaves that to save(), for
+        callers writing several batches). Returns a was_added flag per item.
+        """
+        existing_refs = self.existing_references()
+        existing_names = self._existing_names()
+        flags = []
+        
+        for tender_data, classification, scores in items:
+            fields = scored_tender_fields(tender_data, classification, scores)
+            ref_normalized = str(fields["reference_number"]).strip().upper()
+            name_normalized = fields["tender_name"].strip().upper()
+            
+            if (ref_normalized and ref_normalized != "NA" and ref_normalized in existing_refs) \
+                    or name_normalized in existing_names:
+                flags.append(False)
+                continue
+            
+            self._append_row(_row_values(**fields), fields["priority"])
+            flags.append(True)
+        
+        if save and any(flags):
+            self.save()
+        return flags
     
-    def get_stats(self):
-        """Get tender statistics"""
+    def update_status(self, reference_number: str, status: str) -> bool:
+        """Set the Status of the tender with this reference (and in the search index); True if found"""
+        from utils.rollups import log_row_fields
+        
+        ref_normalized = str(reference_number).strip().upper()
+        status_col = HEADERS.index("Status") + 1
         ws = self.wb.active
+        for row in range(2, ws.max_row + 1):
+            if str(ws.cell(row=row, column=17).value or "").strip().upper() != ref_normalized:
+                continue
+            old = dict(zip(HEADERS, (c.value for c in ws[row][:len(HEADERS)])))
+            if old["Status"] == status:
+                return True
+            rollups = self.rollups
+            ws.cell(row=row, column=status_col, value=status)
+            rollups.update(log_row_fields(old), log_row_fields({**old, "Status": status}))
+            self.save()
+            if self.search_index is not None:
+                tender = log_row_tender(old["Tender Name"], old["Reference Number"])
+                self.search_index.sync_status([{**tender, "status": status}])
+            return True
+        return False
+    
+    def log_statuses(self):
+        """{'ref', 'title', 'status'} for every logged tender with a Status (from the column cache)"""
+        cols = self.log_cache.load()
+        for name, ref, status in zip(cols["Tender Name"], cols["Reference Number"], cols["Status"]):
+            if status.strip():
+                yield {**log_row_tender(name, ref), "status": status.strip()}
+    
+    def update_scores(self, tenders, with_type: bool = False) -> int:
+        """
+        Write fresh scores (Composite Score, Priority, Risk Level, row colour)
+        for already-logged snapshot tenders, matched on Tender Name, in one
+        pass and one save. with_type also writes the Type column from the
+        tender's category and the fit columns that depend on it (tenders
+        reclassified after they were logged). Returns the number of rows updated.
+        """
+        from utils.rollups import log_row_fields
         
-        stats = {
-            "total": ws.max_row - 1,  # Exclude header
-            "by_type": {},
-            "by_priority": {"HIGH": 0, "MEDIUM": 0, "LOW": 0},
-            "by_status": {}
+        updates = {
+            log_tender_name(t.get("ref"), t.get("title", "")).strip().upper(): t
+            for t in tenders if t.get("scores")
         }
+        if not updates:
+            return 0
         
+        headers = ["Composite Score", "Priority", "Risk Level"]
+        if with_type:
+            headers += ["Type", "Fit Score", "TES Fit", "Phakathi Fit", "Revenue Potential"]
+        columns = {h: HEADERS.index(h) + 1 for h in headers}
+        ws = self.wb.active
+        rollups = self.rollups
+        updated = 0
         for row in range(2, ws.max_row + 1):
-            # By type
-            t_type = ws.cell(row=row, column=3).value or "Unknown"
-            stats["by_type"][t_type] = stats["by_type"].get(t_type, 0) + 1
-            
-            # By priority
-            priority = ws.cell(row=row, column=7).value or "MEDIUM"
-            if priority in stats["by_priority"]:
-                stats["by_priority"][priority] += 1
-            
-            # By status
-            status = ws.cell(row=row, column=14).value or "Unknown"
-            stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
+            tender = updates.get(str(ws.cell(row=row, column=1).value or "").strip().upper())
+            if tender is None:
+                continue
+            scores = tender["scores"]
+            old = dict(zip(HEADERS, (c.value for c in ws[row][:len(HEADERS)])))
+            new = {
+                **old,
+                "Composite Score": scores["composite_score"],
+                "Priority": scores["priority"],
+                "Risk Level": scores["risk_level"],
+            }
+            if with_type:
+                new.update({
+                    "Type": tender.get("category", old["Type"]),
+                    "Fit Score": scores["fit_score"],
+                    "TES Fit": scores["tes_suitability"],
+                    "Phakathi Fit": scores["phakathi_suitability"],
+                    "Revenue Potential": scores["revenue_potential"],
+                })
+            if new == old:
+                continue
+            for header, col in columns.items():
+                ws.cell(row=row, column=col, value=new[header])
+            fill = PRIORITY_FILLS.get(new["Priority"])
+            if fill is not None and new["Priority"] != old["Priority"]:
+                for col in range(1, len(HEADERS) + 1):
+                    ws.cell(row=row, column=col).fill = fill
+            rollups.update(log_row_fields(old), log_row_fields(new))
+            updated += 1
+        
+        if updated:
+            self.save()
+        return updated
+    
+    def save(self):
+        self.wb.save(self.file_path)
+        self._file_key = self._stat()
         
-        return stats
+        # Refresh the column cache from memory so readers skip the XML parse
+        ws = self.wb.active
+        self.log_cache.store(
+            dict(zip(HEADERS, values))
+            for values in ws.iter_rows(min_row=2, max_col=len(HEADERS), values_only=True)
+            if values and any(v is not None for v in values)
+        )
+        if self._rollups is not None:
+            self.rollup_store.save(self._rollups)
+    
+    def get_stats(self):
+        """Get tender statistics (from the rollup counters, O(buckets))"""
+        rollups = self.rollups
+        
+        by_priority = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        for priority, count in rollups.counts("priority", default="MEDIUM").items():
+            if priority in by_priority:
+                by_priority[priority] += count
+        
+        return {
+            "total": rollups.total,
+            "by_type": rollups.counts("category", default="Unknown"),
+            "by_priority": by_priority,
+            "by_status": rollups.counts("status", default="Unknown")
+        }
 
 
 # ==========================================================
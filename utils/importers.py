@@ -0,0 +1,267 @@
+# ==========================================================
+# BULK TENDER IMPORTERS
+# Streaming readers for CSV, JSONL and XLSX (plus tender JSON
+# snapshots), header -> field mapping from config, and row
+# validation. Every reader yields one row at a time so memory
+# stays flat for files with hundreds of thousands of rows.
+# ==========================================================
+
+import csv
+import json
+import os
+import re
+from collections import Counter
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+
+TENDER_FIELDS = ("ref", "title", "description", "client", "closing_date", "source")
+
+# Canonical field -> accepted header names (matched case/space/underscore-insensitively)
+DEFAULT_COLUMN_MAP = {
+    "ref": ["ref", "reference", "reference number", "ref no", "tender number", "bid number"],
+    "title": ["title", "tender name", "tender title", "subject"],
+    "description": ["description", "details", "scope"],
+    "client": ["client", "organisation", "organization", "department", "entity"],
+    "closing_date": ["closing date", "closing", "deadline"],
+    "source": ["source", "portal"],
+}
+
+MAX_TITLE_CHARS = 500
+MAX_DESCRIPTION_CHARS = 5000
+
+
+def _header_key(name) -> str:
+    return re.sub(r"[\s_\-]+", " ", str(name or "")).strip().lower()
+
+
+# ----------------------------------------------------------
+# READERS
+# ----------------------------------------------------------
+IMPORTERS = {}
+
+
+def register_importer(*extensions):
+    """Class decorator: make an importer available for the given file extensions"""
+    def decorator(cls):
+        for ext in extensions:
+            IMPORTERS[ext.lower()] = cls
+        return cls
+    return decorator
+
+
+class TenderImporter:
+    """
+    Base reader. Subclasses implement iter_rows(), yielding one raw
+    dict per row keyed by the file's own headers. Rows that cannot be
+    parsed at all are skipped and reported to on_malformed(line, reason).
+    """
+
+    def __init__(self, path: str, on_malformed=None, **options):
+        self.path = path
+        self.options = options
+        self.on_malformed = on_malformed
+        self.line_number = None     # file line of the row just yielded, where the format has lines
+
+    def malformed(self, line_number: int, reason: str):
+        if self.on_malformed is not None:
+            self.on_malformed(line_number, reason)
+        else:
+            print(f"  ⚠️ {os.path.basename(self.path)} line {line_number}: {reason} - skipped")
+
+    def iter_rows(self):
+        raise NotImplementedError
+
+
+@register_importer(".csv")
+class CsvImporter(TenderImporter):
+    def iter_rows(self):
+        with open(self.path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                self.line_number = reader.line_num
+                yield row
+
+
+@register_importer(".jsonl", ".ndjson")
+class JsonlImporter(TenderImporter):
+    def iter_rows(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    self.malformed(line_number, "malformed JSON")
+                    continue
+                self.line_number = line_number
+                yield row
+
+
+@register_importer(".json")
+class JsonSnapshotImporter(TenderImporter):
+    """A list of tenders or new_tenders.json's {"meta", "tenders"} shape (loaded whole)"""
+
+    def iter_rows(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield from (data.get("tenders", []) if isinstance(data, dict) else data)
+
+
+@register_importer(".xlsx", ".xlsm")
+class XlsxImporter(TenderImporter):
+    """
+    openpyxl read_only + iter_rows(values_only=True): rows are streamed
+    from the sheet XML instead of building the full cell graph.
+    Options: sheet (name, default the active sheet), header_row (1-based).
+    """
+
+    def iter_rows(self):
+        wb = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            sheet = self.options.get("sheet")
+            ws = wb[sheet] if sheet else wb.active
+            header_row = int(self.options.get("header_row") or 1)
+            rows = ws.iter_rows(min_row=header_row, values_only=True)
+            headers = next(rows, None)
+            if not headers:
+                return
+            headers = [str(h).strip() if h is not None else "" for h in headers]
+            for values in rows:
+                if values is None or all(v is None or v == "" for v in values):
+                    continue
+                yield {h: v for h, v in zip(headers, values) if h}
+        finally:
+            wb.close()
+
+
+def open_importer(path: str, **options) -> TenderImporter:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in IMPORTERS:
+        supported = ", ".join(sorted(IMPORTERS))
+        raise ValueError(f"Unsupported input format: {ext or path} (supported: {supported})")
+    return IMPORTERS[ext](path, **options)
+
+
+def iter_raw_records(path: str, **options):
+    """Raw rows from any supported file, keyed by the file's own headers"""
+    return open_importer(path, **options).iter_rows()
+
+
+# ----------------------------------------------------------
+# MAPPING + VALIDATION
+# ----------------------------------------------------------
+class ColumnMapper:
+    """Resolves a file's headers to tender fields once, then maps each row"""
+
+    def __init__(self, column_map: dict = None):
+        column_map = column_map or {}
+        self._aliases = {}
+        # Every field's configured names first, then the built-in defaults,
+        # so a default alias of one field never shadows another's configured one
+        for field in TENDER_FIELDS:
+            names = column_map.get(field) or []
+            if isinstance(names, str):
+                names = [names]
+            for name in [field, *names]:
+                self._aliases.setdefault(_header_key(name), field)
+        for field in TENDER_FIELDS:
+            for name in DEFAULT_COLUMN_MAP[field]:
+                self._aliases.setdefault(_header_key(name), field)
+        self._resolved = {}
+
+    def _resolve(self, headers) -> dict:
+        resolved = {}
+        for header in headers:
+            field = self._aliases.get(_header_key(header))
+            if field and field not in resolved.values():
+                resolved[header] = field
+        return resolved
+
+    def map_row(self, row: dict) -> dict:
+        headers = tuple(row)
+        if headers not in self._resolved:
+            self._resolved[headers] = self._resolve(headers)
+        return {field: row.get(header) for header, field in self._resolved[headers].items()}
+
+
+def _as_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return re.sub(r"\s+", " ", str(value)).strip()
+
+
+def validate_row(mapped: dict, default_source: str = "CSV Import"):
+    """
+    (tender_data, None) for a usable row, (None, reason) otherwise.
+    Mirrors the fields the scraper pipeline produces.
+    """
+    title = _as_text(mapped.get("title"))
+    if not title:
+        return None, "missing title"
+    if len(title) > MAX_TITLE_CHARS:
+        title = title[:MAX_TITLE_CHARS]
+
+    description = _as_text(mapped.get("description")) or title
+    return {
+        "ref": _as_text(mapped.get("ref")) or "NA",
+        "title": title,
+        "description": description[:MAX_DESCRIPTION_CHARS],
+        "client": _as_text(mapped.get("client")),
+        "closing_date": _as_text(mapped.get("closing_date")),
+        "source": _as_text(mapped.get("source")) or default_source,
+    }, None
+
+
+class ImportStats:
+    """Row counters plus the first few rejected rows for the summary"""
+
+    def __init__(self, keep_examples: int = 5):
+        self.read = 0
+        self.valid = 0
+        self.rejected = Counter()
+        self.examples = []
+        self.keep_examples = keep_examples
+
+    def reject(self, row_number: int, reason: str):
+        self.rejected[reason] += 1
+        if len(self.examples) < self.keep_examples:
+            self.examples.append((row_number, reason))
+
+    @property
+    def rejected_total(self) -> int:
+        return sum(self.rejected.values())
+
+
+def iter_tenders(path: str, column_map: dict = None, stats: ImportStats = None,
+                 default_source: str = "CSV Import", **options):
+    """Stream validated tender_data dicts from any supported file"""
+    mapper = ColumnMapper(column_map)
+    stats = stats if stats is not None else ImportStats()
+
+    def malformed(line_number, reason):
+        stats.read += 1
+        stats.reject(line_number, reason)
+
+    importer = open_importer(path, on_malformed=malformed, **options)
+    for row_number, row in enumerate(importer.iter_rows(), 1):
+        row_number = importer.line_number or row_number
+        stats.read += 1
+        if not isinstance(row, dict):
+            stats.reject(row_number, "not an object")
+            continue
+        tender_data, error = validate_row(mapper.map_row(row), default_source)
+        if error:
+            stats.reject(row_number, error)
+            continue
+        stats.valid += 1
+        yield tender_data
@@ -0,0 +1,249 @@
+# ==========================================================
+# BACKGROUND JOB RUNNER
+# Runs daily scans / weekly reports off the request thread
+# Tracks stage progress + timings, persists job history
+# ==========================================================
+
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import fcntl  # POSIX only - cross-process duplicate guard
+except ImportError:
+    fcntl = None
+
+
+ACTIVE_STATES = ("queued", "running")
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class JobRunner:
+    """
+    In-process job queue backed by a small thread pool.
+
+    - submit() returns immediately with a job record (status "queued")
+    - a second submit() for a kind that is already queued/running is
+      coalesced onto the existing job instead of starting a new run
+    - a per-kind lock file stops duplicate runs across gunicorn workers
+    - every state change is written to <history_dir>/<job_id>.json so any
+      worker process can answer /api/jobs/<id>
+    """
+
+    def __init__(self, history_dir: str, max_workers: int = 2, history_limit: int = 100):
+        self.history_dir = history_dir
+        self.history_limit = history_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active = {}  # kind -> job_id
+        os.makedirs(history_dir, exist_ok=True)
+
+    # ------------------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------------------
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.history_dir, f"{job_id}.json")
+
+    def _persist(self, job: dict):
+        path = self._job_path(job["id"])
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(job, f, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[JOBS] Could not persist job {job['id']}: {e}")
+
+    def _prune_history(self):
+        try:
+            files = [
+                os.path.join(self.history_dir, name)
+                for name in os.listdir(self.history_dir)
+                if name.endswith(".json")
+            ]
+            files.sort(key=os.path.getmtime, reverse=True)
+            for path in files[self.history_limit:]:
+                os.remove(path)
+        except OSError:
+            pass
+
+    # ------------------------------------------------------
+    # CROSS-PROCESS GUARD
+    # ------------------------------------------------------
+    def _acquire_kind_lock(self, kind: str):
+        """Non-blocking exclusive lock for this job kind; None if held elsewhere"""
+        handle = open(os.path.join(self.history_dir, f".{kind}.lock"), "w")
+        if fcntl is None:
+            return handle
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except OSError:
+            handle.close()
+            return None
+
+    # ------------------------------------------------------
+    # SUBMIT / RUN
+    # ------------------------------------------------------
+    def submit(self, kind: str, func) -> tuple:
+        """
+        Queue func(progress) to run in the background.
+        Returns (job, created) - created is False when coalesced onto a
+        job of the same kind that is already queued or running.
+        """
+        with self._lock:
+            active_id = self._active.get(kind)
+            if active_id and self._jobs[active_id]["status"] in ACTIVE_STATES:
+                active = self._jobs[active_id]
+                active["coalesced"] += 1
+                self._persist(self._public(active))
+                return self._public(active), False
+
+            job_id = f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            job = {
+                "id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "created_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "duration_s": None,
+                "current_stage": None,
+                "stages": [],
+                "result": None,
+                "error": None,
+                "coalesced": 0,
+            }
+            self._jobs[job_id] = job
+            self._active[kind] = job_id
+            self._persist(job)
+
+            # Keep only recent jobs in memory; older ones stay on disk
+            finished = [j for j in self._jobs if self._jobs[j]["status"] not in ACTIVE_STATES]
+            for old_id in finished[:-self.history_limit]:
+                del self._jobs[old_id]
+
+        self._executor.submit(self._run, job_id, func)
+        self._prune_history()
+        return dict(job), True
+
+    def _progress(self, job_id: str):
+        """Build the progress(stage_name) callback handed to the job function"""
+        def progress(stage: str):
+            with self._lock:
+                job = self._jobs[job_id]
+                now = time.monotonic()
+                if job["stages"]:
+                    last = job["stages"][-1]
+                    if last["finished_at"] is None:
+                        last["finished_at"] = _now()
+                        last["duration_s"] = round(now - last.pop("_t0"), 2)
+                job["stages"].append({
+                    "name": stage,
+                    "started_at": _now(),
+                    "finished_at": None,
+                    "duration_s": None,
+                    "_t0": now,
+                })
+                job["current_stage"] = stage
+                self._persist(self._public(job))
+        return progress
+
+    @staticmethod
+    def _public(job: dict) -> dict:
+        """Copy of a job without internal timing fields"""
+        clean = dict(job)
+        clean["stages"] = [{k: v for k, v in s.items() if not k.startswith("_")} for s in job["stages"]]
+        return clean
+
+    def _finish(self, job_id: str, status: str, result=None, error=None, t0=None):
+        with self._lock:
+            job = self._jobs[job_id]
+            now = time.monotonic()
+            if job["stages"] and job["stages"][-1]["finished_at"] is None:
+                last = job["stages"][-1]
+                last["finished_at"] = _now()
+                last["duration_s"] = round(now - last.pop("_t0"), 2)
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["current_stage"] = None
+            job["finished_at"] = _now()
+            if t0 is not None:
+                job["duration_s"] = round(now - t0, 2)
+            if self._active.get(job["kind"]) == job_id:
+                del self._active[job["kind"]]
+            self._persist(self._public(job))
+
+    def _run(self, job_id: str, func):
+        kind = self._jobs[job_id]["kind"]
+        lock_handle = self._acquire_kind_lock(kind)
+        if lock_handle is None:
+            self._finish(job_id, "skipped", error=f"A {kind} run is already in progress in another worker")
+            return
+
+        t0 = time.monotonic()
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = _now()
+            self._persist(self._public(job))
+
+        try:
+            result = func(self._progress(job_id))
+            self._finish(job_id, "succeeded", result=result, t0=t0)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job_id, "failed", error=str(e), t0=t0)
+        finally:
+            lock_handle.close()
+
+    # ------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------
+    def get(self, job_id: str):
+        """Job record by id (memory first, then history from any worker)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return self._public(job)
+
+        if os.path.basename(job_id) != job_id:
+            return None
+        path = self._job_path(job_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def history(self, limit: int = 20) -> list:
+        """Most recent jobs, newest first"""
+        try:
+            names = [n for n in os.listdir(self.history_dir) if n.endswith(".json")]
+        except OSError:
+            return []
+        paths = sorted(
+            (os.path.join(self.history_dir, n) for n in names),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        jobs = []
+        for path in paths[:limit]:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    jobs.append(json.load(f))
+            except Exception:
+                continue
+        return jobs
@@ -0,0 +1,184 @@
+# ==========================================================
+# TENDER LOG COLUMNAR CACHE
+# NumPy .npz sidecar of the Tender_Log columns, keyed by the
+# workbook's mtime + size. Readers (stats, dedupe, reports)
+# load it in milliseconds; the XML is only parsed again when
+# the workbook has changed.
+# ==========================================================
+
+import os
+import threading
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency - falls back to parsing the workbook
+    np = None
+
+from utils.excel_export import iter_tender_log
+from utils.excel_writer import HEADERS
+
+
+CACHE_VERSION = 1
+NUMERIC_COLUMNS = ("Fit Score", "Composite Score", "TES Fit", "Phakathi Fit")
+# Notes is free text no reader needs; leaving it out keeps the sidecar small
+CACHED_COLUMNS = tuple(h for h in HEADERS if h != "Notes")
+SEPARATOR = "\x00"   # cannot occur in xlsx cell text
+
+
+def _file_key(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).replace(SEPARATOR, " ")
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class TenderLogColumns:
+    """
+    Column-oriented view of the log: text columns are lists of str
+    ('' for empty cells), numeric columns are float arrays (NaN for empty).
+    """
+
+    def __init__(self, columns: dict, rows: int):
+        self.columns = columns
+        self.rows = rows
+        self._timeline = None
+
+    def __getitem__(self, header):
+        return self.columns[header]
+
+    def __len__(self):
+        return self.rows
+
+    def timeline(self):
+        """DeadlineTimeline over row positions (built on first use, kept with the columns)"""
+        if self._timeline is None:
+            from utils.deadline_timeline import DeadlineTimeline
+            self._timeline = DeadlineTimeline(
+                range(self.rows), key_fn=lambda i: i, closing_fn=self.columns["Closing Date"].__getitem__
+            )
+        return self._timeline
+
+    def iter_rows(self, headers=CACHED_COLUMNS):
+        """Row dicts over the requested columns (for full-scan rebuilds)"""
+        columns = [self.columns[h] for h in headers]
+        for values in zip(*columns):
+            yield dict(zip(headers, values))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from HEADERS-keyed row dicts (see utils.excel_export.iter_tender_log)"""
+        columns = {h: [] for h in CACHED_COLUMNS}
+        count = 0
+        for row in rows:
+            count += 1
+            for h in CACHED_COLUMNS:
+                value = row.get(h)
+                columns[h].append(_number(value) if h in NUMERIC_COLUMNS else _text(value))
+        if np is not None:
+            for h in NUMERIC_COLUMNS:
+                columns[h] = np.asarray(columns[h], dtype=np.float64)
+        return cls(columns, count)
+
+    # -- .npz (de)serialisation: text columns are one UTF-8 buffer each --
+    def to_arrays(self) -> dict:
+        arrays = {"__rows__": np.asarray([self.rows], dtype=np.int64)}
+        for h in CACHED_COLUMNS:
+            if h in NUMERIC_COLUMNS:
+                arrays[h] = np.asarray(self.columns[h], dtype=np.float64)
+            else:
+                data = SEPARATOR.join(self.columns[h]).encode("utf-8")
+                arrays[h] = np.frombuffer(data, dtype=np.uint8)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        rows = int(arrays["__rows__"][0])
+        columns = {}
+        for h in CACHED_COLUMNS:
+            if h in NUMERIC_COLUMNS:
+                columns[h] = arrays[h]
+            else:
+                columns[h] = arrays[h].tobytes().decode("utf-8").split(SEPARATOR) if rows else []
+        return cls(columns, rows)
+
+
+class TenderLogCache:
+    """
+    cache = TenderLogCache(EXCEL_PATH)
+    cols = cache.load()          # TenderLogColumns, rebuilt only if the .xlsx changed
+    """
+
+    def __init__(self, excel_path: str, sheet_name: str = None, cache_path: str = None):
+        self.excel_path = excel_path
+        self.sheet_name = sheet_name
+        self.cache_path = cache_path or os.path.splitext(excel_path)[0] + ".columns.npz"
+        self._lock = threading.Lock()
+        self._memo = (None, None)   # (file key, TenderLogColumns) for repeat calls in-process
+
+    def load(self) -> TenderLogColumns:
+        if not os.path.exists(self.excel_path):
+            return TenderLogColumns({h: [] for h in CACHED_COLUMNS}, 0)
+
+        with self._lock:
+            key = _file_key(self.excel_path)
+            if self._memo[0] == key:
+                return self._memo[1]
+
+            columns = self._read_sidecar(key)
+            if columns is None:
+                columns = TenderLogColumns.from_rows(iter_tender_log(self.excel_path, self.sheet_name))
+                self._write_sidecar(key, columns)
+            self._memo = (key, columns)
+            return columns
+
+    def store(self, rows):
+        """
+        Refresh the sidecar from rows already in memory (e.g. right after
+        ExcelWriter saved), so the next reader does not re-parse the XML.
+        """
+        with self._lock:
+            key = _file_key(self.excel_path)
+            columns = TenderLogColumns.from_rows(rows)
+            self._write_sidecar(key, columns)
+            self._memo = (key, columns)
+            return columns
+
+    def _read_sidecar(self, key):
+        if np is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as arrays:
+                stored = tuple(int(v) for v in arrays["__key__"])
+                if stored != (CACHE_VERSION, *key):
+                    return None
+                return TenderLogColumns.from_arrays(arrays)
+        except Exception:
+            return None   # corrupt / older layout - rebuild
+
+    def _write_sidecar(self, key, columns: TenderLogColumns):
+        if np is None:
+            return
+        arrays = columns.to_arrays()
+        arrays["__key__"] = np.asarray([CACHE_VERSION, *key], dtype=np.int64)
+        tmp_path = self.cache_path + ".tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass   # read-only location - the in-process memo still applies
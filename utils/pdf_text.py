@@ -0,0 +1,173 @@
+# ==========================================================
+# PDF TEXT EXTRACTION
+# Pulls text out of downloaded tender documents so the
+# classifier sees more than the listing-page snippet
+# Process pool + text cache keyed by document SHA-256
+# ==========================================================
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency
+    PdfReader = None
+
+from utils.document_fetcher import DOCUMENTS_SUBFOLDER, MANIFEST_NAME
+
+
+MAX_PAGES = 60                # specs can run to 200+ pages; the scope is up front
+MAX_EXTRACT_CHARS = 60_000    # stored per document
+MAX_FEATURE_CHARS = 20_000    # handed to classify/score per tender
+
+
+# ----------------------------------------------------------
+# NORMALISATION
+# ----------------------------------------------------------
+def normalize_text(text: str, limit: int = MAX_FEATURE_CHARS) -> str:
+    """Join hyphenated line breaks, collapse whitespace, cap length"""
+    if not text:
+        return ""
+    text = re.sub(r"(\w)-\s*\n\s*(\w)", r"\1\2", text)
+    text = re.sub(r"[^\S\n]+", " ", text)
+    text = re.sub(r"\s*\n\s*", " ", text)
+    return text.strip()[:limit]
+
+
+# ----------------------------------------------------------
+# EXTRACTION (runs inside worker processes)
+# ----------------------------------------------------------
+def extract_pdf_text(path: str, max_pages: int = MAX_PAGES, max_chars: int = MAX_EXTRACT_CHARS) -> str:
+    """
+    Extract text page by page and stop once max_pages / max_chars is
+    reached, so a 200-page spec never has to be held in memory at once.
+    """
+    if PdfReader is None:
+        raise RuntimeError("pypdf is not installed")
+
+    reader = PdfReader(path)
+    parts = []
+    total = 0
+    for page_number, page in enumerate(reader.pages):
+        if page_number >= max_pages or total >= max_chars:
+            break
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            continue  # one bad page should not lose the whole document
+        text = normalize_text(text, limit=max_chars - total)
+        if text:
+            parts.append(text)
+            total += len(text) + 1
+    return " ".join(parts)
+
+
+def _extract_worker(path: str):
+    """(text, error) - never raises, so one corrupt PDF cannot break the pool"""
+    try:
+        return extract_pdf_text(path), None
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}"[:300]
+
+
+# ----------------------------------------------------------
+# TEXT CACHE
+# ----------------------------------------------------------
+class TextCache:
+    """Extracted text stored as <cache_dir>/ab/<sha256>.txt"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, sha256[:2], sha256 + ".txt")
+
+    def get(self, sha256: str):
+        try:
+            with open(self._path(sha256), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, sha256: str, text: str):
+        path = self._path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def extract_documents(documents, cache_dir: str, max_workers: int = None) -> dict:
+    """
+    documents: iterable of (sha256, path).
+    Returns {sha256: text}; only documents missing from the cache are
+    parsed, in a process pool (PDF parsing is CPU-bound).
+    """
+    cache = TextCache(cache_dir)
+    texts = {}
+    pending = {}
+    for sha256, path in documents:
+        if sha256 in texts or sha256 in pending:
+            continue
+        cached = cache.get(sha256)
+        if cached is not None:
+            texts[sha256] = cached
+        elif path.lower().endswith(".pdf") and os.path.exists(path):
+            pending[sha256] = path
+
+    if pending and PdfReader is None:
+        print("[PDF TEXT] pypdf not installed - skipping document text extraction")
+        return texts
+
+    if pending:
+        workers = max_workers or min(len(pending), os.cpu_count() or 2)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_extract_worker, pending.values(), chunksize=1)
+            for sha256, (text, error) in zip(pending, results):
+                if error:
+                    print(f"[PDF TEXT] {os.path.basename(pending[sha256])}: {error}")
+                # Cache empty results too (scanned / corrupt PDFs) so they are not re-parsed
+                cache.put(sha256, text)
+                texts[sha256] = text
+    return texts
+
+
+# ----------------------------------------------------------
+# TENDER FOLDERS
+# ----------------------------------------------------------
+def manifest_documents(tender_dir: str) -> list:
+    """(sha256, path) for every downloaded document listed in 02_Documents/manifest.json"""
+    docs_dir = os.path.join(tender_dir, DOCUMENTS_SUBFOLDER)
+    try:
+        with open(os.path.join(docs_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [
+        (d["sha256"], os.path.join(docs_dir, d["file"]))
+        for d in manifest.get("documents", [])
+        if d.get("status") == "ok" and d.get("sha256") and d.get("file")
+    ]
+
+
+def document_text_for_tenders(jobs, cache_dir: str, max_workers: int = None) -> list:
+    """
+    jobs: [(tender, tender_dir)].
+    Returns [(tender, text)] with the combined, capped document text for
+    every tender that has at least one readable document.
+    """
+    per_tender = [(t, manifest_documents(d)) for t, d in jobs]
+    texts = extract_documents(
+        (doc for _, docs in per_tender for doc in docs), cache_dir, max_workers=max_workers
+    )
+
+    results = []
+    for tender, docs in per_tender:
+        combined = " ".join(texts.get(sha256, "") for sha256, _ in docs).strip()
+        if combined:
+            results.append((tender, normalize_text(combined)))
+    return results
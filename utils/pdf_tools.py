@@ -1,31 +1,30 @@
 # ==========================================================
 # PDF TOOLS - File size and metadata detection
+# Concurrent HEAD probing with an on-disk TTL cache
 # ==========================================================
 
+import json
+import os
+import threading
+import time
 import urllib.request
-from urllib.error import URLError
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
 
 
-def get_pdf_size(url):
-    """
-    Get PDF file size from URL without downloading full file
-    Returns human-readable size string or None if unavailable
-    """
-    if not url or not url.endswith('.pdf'):
-        return None
-    
-    try:
-        # Get headers without downloading body
-        request = urllib.request.Request(url, method='HEAD')
-        response = urllib.request.urlopen(request, timeout=5)
-        
-        size_bytes = int(response.headers.get('content-length', 0))
-        if size_bytes == 0:
-            return None
-            
-        return format_bytes(size_bytes)
-    except (URLError, ValueError, TimeoutError):
-        return None
+DEFAULT_TIMEOUT = 5
+DEFAULT_WORKERS = 16
+CACHE_TTL_SECONDS = 7 * 24 * 3600    # successful probes
+FAILURE_TTL_SECONDS = 6 * 3600       # unreachable / non-PDF URLs are retried sooner
+
+
+def is_pdf_url(url):
+    """True if the URL path ends in .pdf (ignores query string and case)"""
+    if not url:
+        return False
+    return urlsplit(url).path.lower().endswith(".pdf")
 
 
 def format_bytes(bytes_size):
@@ -39,14 +38,147 @@ def format_bytes(bytes_size):
     return f"{bytes_size:.1f} TB"
 
 
-def add_pdf_metadata(tender):
+# ----------------------------------------------------------
+# SINGLE-URL PROBE
+# ----------------------------------------------------------
+def _open(url, method, timeout, headers=None):
+    request = urllib.request.Request(url, method=method, headers=headers or {})
+    return urllib.request.urlopen(request, timeout=timeout)
+
+
+def probe_pdf_metadata(url, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch size / content-type / last-modified for a URL without
+    downloading the body. Falls back to a one-byte ranged GET for
+    servers that reject HEAD. Always returns a dict ("ok" False on failure).
+    """
+    meta = {"ok": False, "size": None, "content_type": None, "last_modified": None,
+            "checked_at": time.time()}
+    try:
+        try:
+            response = _open(url, "HEAD", timeout)
+            size = int(response.headers.get("content-length") or 0)
+        except HTTPError as e:
+            if e.code not in (403, 405, 501):
+                raise
+            response = _open(url, "GET", timeout, {"Range": "bytes=0-0"})
+            content_range = response.headers.get("content-range") or ""
+            total = content_range.rsplit("/", 1)[-1]
+            size = int(total) if total.isdigit() else int(response.headers.get("content-length") or 0)
+        headers = response.headers
+        response.close()
+
+        last_modified = headers.get("last-modified")
+        if last_modified:
+            try:
+                last_modified = parsedate_to_datetime(last_modified).isoformat()
+            except (TypeError, ValueError):
+                pass
+
+        meta.update({
+            "ok": True,
+            "size": size or None,
+            "content_type": (headers.get("content-type") or "").split(";")[0].strip() or None,
+            "last_modified": last_modified,
+        })
+    except (URLError, ValueError, TimeoutError, OSError) as e:
+        meta["error"] = str(e)[:200]
+    return meta
+
+
+def get_pdf_size(url):
+    """
+    Get PDF file size from URL without downloading full file
+    Returns human-readable size string or None if unavailable
+    """
+    if not is_pdf_url(url):
+        return None
+    meta = probe_pdf_metadata(url)
+    return format_bytes(meta["size"]) if meta["size"] else None
+
+
+# ----------------------------------------------------------
+# BATCH SERVICE
+# ----------------------------------------------------------
+class PdfMetadataCache:
+    """URL -> probe result, persisted as JSON with per-entry expiry"""
+
+    def __init__(self, path, ttl=CACHE_TTL_SECONDS, failure_ttl=FAILURE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception:
+                self._entries = {}
+
+    def get(self, url):
+        entry = self._entries.get(url)
+        if not entry:
+            return None
+        ttl = self.ttl if entry.get("ok") else self.failure_ttl
+        if time.time() - entry.get("checked_at", 0) > ttl:
+            return None
+        return entry
+
+    def put(self, url, meta):
+        with self._lock:
+            self._entries[url] = meta
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        now = time.time()
+        with self._lock:
+            # Drop long-expired entries so the file does not grow forever
+            keep = {u: m for u, m in self._entries.items()
+                    if now - m.get("checked_at", 0) <= max(self.ttl, self.failure_ttl) * 4}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(keep, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def fetch_pdf_metadata(urls, cache_path=None, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """
+    Probe many PDF URLs concurrently (bounded pool), reusing cached
+    results that are still fresh. Returns {url: metadata}.
+    """
+    cache = PdfMetadataCache(cache_path)
+    results = {}
+    pending = []
+    for url in dict.fromkeys(u for u in urls if is_pdf_url(u)):
+        cached = cache.get(url)
+        if cached is not None:
+            results[url] = cached
+        else:
+            pending.append(url)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            for url, meta in zip(pending, pool.map(lambda u: probe_pdf_metadata(u, timeout), pending)):
+                cache.put(url, meta)
+                results[url] = meta
+        cache.save()
+
+    return results
+
+
+def add_pdf_metadata(tender, metadata=None):
     """
     Add PDF size to tender dict if URL is PDF
+    metadata: optional {url: probe result} from fetch_pdf_metadata()
     Returns modified tender dict
     """
     url = tender.get("url", "")
-    if url.endswith('.pdf'):
-        pdf_size = get_pdf_size(url)
-        if pdf_size:
-            tender["pdf_size"] = pdf_size
+    if not is_pdf_url(url):
+        return tender
+    meta = metadata.get(url) if metadata is not None else probe_pdf_metadata(url)
+    if meta and meta.get("size"):
+        tender["pdf_size"] = format_bytes(meta["size"])
     return tender
@@ -0,0 +1,245 @@
+# ==========================================================
+# ADAPTIVE POLL SCHEDULER
+# Learns how often each source's listing actually changes
+# (hash of the tenders it lists, compared poll to poll) and
+# spreads a daily poll budget across sources: frequency is
+# proportional to sqrt(change rate x weight), clamped to
+# [min_interval, max_interval]. Hot portals get polled
+# hourly, monthly-updated SOE pages about weekly.
+# ==========================================================
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+import yaml
+
+
+SCHEDULE_FILENAME = "poll_schedule.json"
+SCHEDULE_VERSION = 1
+
+DEFAULTS = {
+    "budget_per_day": 48,          # source polls per day across all sources
+    "min_interval_hours": 1,
+    "max_interval_hours": 168,
+    "prior_changes_per_day": 1.0,  # assumed rate until a source has history
+    "decay": 0.9,                  # weight of older observations per new poll
+    "weights": {},                 # source -> relative importance (default 1)
+}
+
+
+def scheduler_config(config_path: str = None) -> dict:
+    """config.yaml `poll_scheduler:` over DEFAULTS, plus the state file path"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(config_path or os.path.join(root, "config.yaml"), "r") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        config = {}
+    settings = {**DEFAULTS, **(config.get("poll_scheduler") or {})}
+    output_dir = (config.get("paths") or {}).get("output_dir") or os.path.join(root, "output")
+    settings.setdefault("path", os.path.join(output_dir, SCHEDULE_FILENAME))
+    return settings
+
+
+def listing_hash(tenders: list) -> str:
+    """
+    Order-independent hash of what a listing shows (ref, title, closing
+    date per tender) - page chrome, session tokens and ad slots don't count
+    """
+    lines = sorted(
+        "\x1f".join(str(t.get(f) or "").strip().lower() for f in ("ref", "title", "closing_date"))
+        for t in tenders
+    )
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _stamp(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M") if ts else ""
+
+
+class PollScheduler:
+    """
+    scheduler = poll_scheduler()
+    due = scheduler.due(sources)              # names to poll now
+    ... scrape them ...
+    scheduler.observe(name, tenders)          # per polled source
+    scheduler.save()
+    """
+
+    def __init__(self, path: str, settings: dict = None):
+        self.path = path
+        self.settings = {**DEFAULTS, **(settings or {})}
+        self._lock = threading.RLock()
+        self.sources = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == SCHEDULE_VERSION:
+            self.sources = data.get("sources") or {}
+
+    def save(self):
+        with self._lock:
+            payload = {"version": SCHEDULE_VERSION, "updated_at": _stamp(time.time()), "sources": self.sources}
+            tmp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=1)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
+
+    # ------------------------------------------------------
+    # OBSERVATIONS
+    # ------------------------------------------------------
+    def _source(self, name: str) -> dict:
+        return self.sources.setdefault(name, {"polls": 0.0, "changes": 0.0, "hours": 0.0})
+
+    def observe(self, name: str, tenders: list, at: float = None) -> bool:
+        """
+        Record a poll of the source; returns True if its listing changed.
+        Every attempt - empty or failed ([]) included - counts as a poll for
+        scheduling, so a source is not due again until its interval passes.
+        Only non-empty listings feed the change rate (an empty result is
+        usually a failed fetch, not a listing that really emptied).
+        """
+        at = at or time.time()
+        with self._lock:
+            s = self._source(name)
+            # State written before empty polls were recorded only has last_polled
+            last_listed = s.get("last_listed", s.get("last_polled"))
+            s["last_polled"] = at
+            s.pop("not_before", None)
+            if not tenders:
+                s.setdefault("last_listed", last_listed)
+                return False
+            digest = listing_hash(tenders)
+            changed = False
+            if s.get("last_hash") is not None and last_listed:
+                decay = self.settings["decay"]
+                changed = digest != s["last_hash"]
+                s["polls"] = s["polls"] * decay + 1.0
+                s["changes"] = s["changes"] * decay + (1.0 if changed else 0.0)
+                s["hours"] = s["hours"] * decay + max(at - last_listed, 60.0) / 3600.0
+            if changed:
+                s["last_changed"] = at
+            s["last_hash"] = digest
+            s["last_listed"] = at
+            return changed
+
+    def defer(self, name: str, until: float, at: float = None):
+        """
+        A poll skipped because the source's circuit is open: counts as
+        polled, and the source is not due before `until` (the breaker's retry_at)
+        """
+        at = at or time.time()
+        with self._lock:
+            s = self._source(name)
+            s["last_polled"] = at
+            if until:
+                s["not_before"] = until
+
+    def change_rate(self, name: str) -> float:
+        """
+        Estimated listing changes per hour. A poll only shows whether at
+        least one change happened since the previous one, so the change
+        fraction p over mean interval I gives rate = -ln(1 - p) / I
+        (Poisson changes); +0.5 / +1 keeps it finite at p = 0 or 1.
+        """
+        s = self.sources.get(name)
+        if not s or s.get("polls", 0) < 1:
+            return self.settings["prior_changes_per_day"] / 24.0
+        p = (s["changes"] + 0.5) / (s["polls"] + 1.0)
+        mean_interval = s["hours"] / s["polls"]
+        return -math.log(1.0 - p) / max(mean_interval, 1e-6)
+
+    # ------------------------------------------------------
+    # PLANNING
+    # ------------------------------------------------------
+    def plan(self, sources) -> dict:
+        """
+        {source: poll interval in hours} spending at most budget_per_day
+        polls: frequency ~ sqrt(rate x weight), clamped, with the budget
+        freed by clamped sources re-spread over the rest.
+        """
+        sources = list(dict.fromkeys(sources))
+        if not sources:
+            return {}
+        lo = 1.0 / self.settings["max_interval_hours"]      # polls per hour
+        hi = 1.0 / self.settings["min_interval_hours"]
+        budget = self.settings["budget_per_day"] / 24.0
+        weights = self.settings.get("weights") or {}
+        demand = {s: math.sqrt(self.change_rate(s) * float(weights.get(s, 1.0))) for s in sources}
+
+        freq = {}
+        free = list(sources)
+        remaining = budget
+        while free:
+            total = sum(demand[s] for s in free) or 1.0
+            scale = remaining / total
+            clamped = {}
+            for s in free:
+                f = demand[s] * scale
+                if f < lo or f > hi:
+                    clamped[s] = min(max(f, lo), hi)
+            if not clamped:
+                freq.update({s: demand[s] * scale for s in free})
+                break
+            freq.update(clamped)
+            remaining = max(remaining - sum(clamped.values()), 0.0)
+            free = [s for s in free if s not in clamped]
+        return {s: round(1.0 / max(freq[s], lo), 2) for s in sources}
+
+    def schedule(self, sources, now: float = None) -> list:
+        """One dict per source: interval, next due time, change rate, overdue hours"""
+        now = now or time.time()
+        intervals = self.plan(sources)
+        rows = []
+        for name, interval in intervals.items():
+            s = self.sources.get(name) or {}
+            last = s.get("last_polled")
+            next_due = (last + interval * 3600) if last else now
+            next_due = max(next_due, s.get("not_before") or 0)
+            rows.append({
+                "source": name,
+                "interval_hours": interval,
+                "changes_per_day": round(self.change_rate(name) * 24, 2),
+                "last_polled": _stamp(last),
+                "last_changed": _stamp(s.get("last_changed")),
+                "next_due": next_due,
+                "overdue_hours": round((now - next_due) / 3600.0, 2),
+            })
+        rows.sort(key=lambda r: r["next_due"])
+        return rows
+
+    def due(self, sources, now: float = None) -> list:
+        """Sources whose next poll is due, most overdue first"""
+        return [r["source"] for r in self.schedule(sources, now) if r["overdue_hours"] >= 0]
+
+    def next_due(self, sources, now: float = None):
+        """Earliest next-due timestamp across the sources (None without sources)"""
+        rows = self.schedule(sources, now)
+        return rows[0]["next_due"] if rows else None
+
+
+_scheduler_lock = threading.Lock()
+_scheduler = {}
+
+
+def poll_scheduler() -> PollScheduler:
+    """Process-wide PollScheduler for the configured state file"""
+    with _scheduler_lock:
+        if "instance" not in _scheduler:
+            settings = scheduler_config()
+            _scheduler["instance"] = PollScheduler(settings.pop("path"), settings)
+        return _scheduler["instance"]
@@ -0,0 +1,246 @@
+# ==========================================================
+# ROLLUP AGGREGATES
+# Per-day / source / category / company / priority / status /
+# industry counters and score sums, updated incrementally as
+# tenders are inserted, re-scored or change status, persisted
+# next to the store they describe. Reports read O(buckets)
+# instead of scanning every tender.
+# ==========================================================
+
+import json
+import os
+import threading
+
+from utils.tender_index import composite_score
+
+
+DIMENSIONS = ("day", "source", "category", "company", "priority", "status", "industry")
+ROLLUP_VERSION = 1
+
+
+# ----------------------------------------------------------
+# RECORD -> BUCKET KEYS
+# Raw values are kept ('' when missing); each consumer applies
+# its own default (the weekly report treats '' status as Open,
+# ExcelWriter.get_stats as Unknown ...)
+# ----------------------------------------------------------
+def _company(tes, phakathi) -> str:
+    try:
+        tes, phakathi = float(tes or 0), float(phakathi or 0)
+    except (TypeError, ValueError):
+        return "Both"
+    return "TES" if tes > phakathi else "Phakathi" if phakathi > tes else "Both"
+
+
+def tender_fields(t: dict) -> dict:
+    """Bucket keys for a snapshot tender (new_tenders.json shape)"""
+    scores = t.get("scores") or {}
+    return {
+        "day": str(t.get("date_added") or "")[:10],
+        "source": t.get("source") or "",
+        "category": t.get("category") or "",
+        "company": _company(scores.get("tes_suitability"), scores.get("phakathi_suitability")),
+        "priority": scores.get("priority") or t.get("priority") or "",
+        "status": t.get("status") or "",
+        "industry": scores.get("industry_matched") or "",
+        "score": composite_score(t),
+    }
+
+
+def log_row_fields(row: dict) -> dict:
+    """Bucket keys for a Tender_Log row (HEADERS-keyed; Industry is 'Source (industry)')"""
+    industry = str(row.get("Industry") or "")
+    source, _, matched = industry.partition("(")
+    try:
+        score = float(row.get("Composite Score") or 0)
+    except (TypeError, ValueError):
+        score = 0.0
+    return {
+        "day": str(row.get("Date Added") or "")[:10],
+        "source": source.strip(),
+        "category": str(row.get("Type") or ""),
+        "company": _company(row.get("TES Fit"), row.get("Phakathi Fit")),
+        "priority": str(row.get("Priority") or ""),
+        "status": str(row.get("Status") or ""),
+        "industry": matched.rstrip(")").strip(),
+        "score": score if score == score else 0.0,   # NaN from the column cache
+    }
+
+
+# ----------------------------------------------------------
+# COUNTERS
+# ----------------------------------------------------------
+class Rollups:
+    """bucket -> [count, score_sum] per dimension, plus overall totals"""
+
+    def __init__(self):
+        self.total = 0
+        self.score_sum = 0.0
+        self.buckets = {dim: {} for dim in DIMENSIONS}
+
+    def add(self, fields: dict, sign: int = 1):
+        score = fields.get("score") or 0.0
+        self.total += sign
+        self.score_sum += sign * score
+        for dim in DIMENSIONS:
+            key = fields.get(dim) or ""
+            bucket = self.buckets[dim].setdefault(key, [0, 0.0])
+            bucket[0] += sign
+            bucket[1] += sign * score
+            if bucket[0] <= 0:
+                del self.buckets[dim][key]
+
+    def remove(self, fields: dict):
+        self.add(fields, sign=-1)
+
+    def update(self, old_fields: dict, new_fields: dict):
+        """Re-score / status change: move one tender between buckets"""
+        self.remove(old_fields)
+        self.add(new_fields)
+
+    def counts(self, dim: str, default: str = None) -> dict:
+        """{bucket: count}; '' buckets are folded into `default` when given"""
+        result = {}
+        for key, (count, _) in self.buckets[dim].items():
+            if not key and default is not None:
+                key = default
+            result[key] = result.get(key, 0) + count
+        return result
+
+    def average_score(self, dim: str = None, key: str = "") -> float:
+        if dim is None:
+            count, total = self.total, self.score_sum
+        else:
+            count, total = self.buckets[dim].get(key, (0, 0.0))
+        return round(total / count, 2) if count else 0.0
+
+    def count_since(self, day: str) -> int:
+        """Tenders whose day bucket (YYYY-MM-DD) is on or after `day`"""
+        return sum(count for key, (count, _) in self.buckets["day"].items() if key and key >= day)
+
+    def to_dict(self) -> dict:
+        return {"total": self.total, "score_sum": round(self.score_sum, 4), "buckets": self.buckets}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Rollups":
+        rollups = cls()
+        rollups.total = int(data.get("total", 0))
+        rollups.score_sum = float(data.get("score_sum", 0.0))
+        for dim in DIMENSIONS:
+            rollups.buckets[dim] = {k: list(v) for k, v in (data.get("buckets", {}).get(dim) or {}).items()}
+        return rollups
+
+    @classmethod
+    def build(cls, fields_iter) -> "Rollups":
+        rollups = cls()
+        for fields in fields_iter:
+            rollups.add(fields)
+        return rollups
+
+
+def apply_snapshot_delta(rollups: Rollups, old_items: list, new_items: list, key_fn):
+    """
+    Bring snapshot rollups from old_items to new_items: tenders that
+    appeared are added, evicted ones removed, replaced ones updated.
+    """
+    old_by_key = {key_fn(t): t for t in old_items}
+    new_keys = set()
+    for t in new_items:
+        key = key_fn(t)
+        new_keys.add(key)
+        previous = old_by_key.get(key)
+        if previous is None:
+            rollups.add(tender_fields(t))
+        elif previous is not t:
+            old_fields, new_fields = tender_fields(previous), tender_fields(t)
+            if old_fields != new_fields:
+                rollups.update(old_fields, new_fields)
+    for key, t in old_by_key.items():
+        if key not in new_keys:
+            rollups.remove(tender_fields(t))
+
+
+# ----------------------------------------------------------
+# PERSISTENCE
+# ----------------------------------------------------------
+def _file_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class RollupStore:
+    """
+    <store>.rollups.json tied to the store file's (mtime, size).
+    If the store was changed by something that did not update the
+    rollups, load() rebuilds them once from a full scan.
+    """
+
+    def __init__(self, store_path: str, path: str = None):
+        self.store_path = store_path
+        self.path = path or os.path.splitext(store_path)[0] + ".rollups.json"
+        self._lock = threading.Lock()
+
+    def load(self, rebuild=None) -> Rollups:
+        """
+        Stored rollups if they match the store file; otherwise
+        Rollups.build(rebuild()) (saved for next time), or None without rebuild.
+        """
+        with self._lock:
+            key = _file_key(self.store_path)
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == ROLLUP_VERSION and data.get("store_key") == key:
+                    return Rollups.from_dict(data)
+            except (OSError, ValueError):
+                pass
+
+            if rebuild is None:
+                return None
+            rollups = Rollups.build(rebuild())
+            self._write(rollups, key)
+            return rollups
+
+    def save(self, rollups: Rollups):
+        """Persist after the store file has been written"""
+        with self._lock:
+            self._write(rollups, _file_key(self.store_path))
+
+    def _write(self, rollups: Rollups, key):
+        payload = {"version": ROLLUP_VERSION, "store_key": key, **rollups.to_dict()}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass   # read-only location - callers still get the computed rollups
+
+
+def tender_log_rollups(excel_path: str, store: RollupStore = None) -> Rollups:
+    """Rollups for the Tender_Log workbook (rebuilt from the column cache if stale)"""
+    from utils.log_cache import TenderLogCache
+
+    def rebuild():
+        return (log_row_fields(row) for row in TenderLogCache(excel_path).load().iter_rows())
+
+    return (store or RollupStore(excel_path)).load(rebuild)
+
+
+def snapshot_rollups(snapshot_path: str, tenders=None) -> Rollups:
+    """Rollups for a new_tenders.json snapshot (rebuilt from `tenders` or the file if stale)"""
+    def rebuild():
+        items = tenders
+        if items is None:
+            from utils.snapshot_cache import extract_tenders
+            try:
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    items = extract_tenders(json.load(f))
+            except (OSError, ValueError):
+                items = []
+        return (tender_fields(t) for t in items)
+
+    return RollupStore(snapshot_path).load(rebuild)
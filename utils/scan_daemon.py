@@ -0,0 +1,229 @@
+# ==========================================================
+# SCAN DAEMON
+# `python tenderscan.py daemon` - one resident process that
+# keeps config, keyword rules, the tender log / search index
+# state, HTTP sessions and Chrome drivers warm between scans.
+# Scans run in-process on a JobRunner that shares output/jobs
+# with app.py (same per-kind lock, same /api/jobs history); a
+# local HTTP control endpoint triggers them and app.py's
+# /api/run/daily hands scans to it when it is up.
+#
+#   GET  /status                 daemon + scheduler state
+#   POST /run/daily[?sources=a,b] queue a scan (joins a running scan of the
+#                                same sources; 409 if it covers others)
+#   GET  /jobs/<id>              job progress / result
+# ==========================================================
+
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import yaml
+
+from utils.browser_pool import browser_pool
+from utils.job_runner import ACTIVE_STATES, JobRunner
+from utils.poll_scheduler import poll_scheduler
+
+
+DEFAULTS = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "schedule": "daily",       # daily: full scan at daily_at; poll: sources as they fall due (utils/poll_scheduler.py)
+    "daily_at": "08:00",
+    "check_minutes": 5,        # how often the scheduler looks for due work
+}
+
+
+def daemon_config(config_path: str = None) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(config_path or os.path.join(root, "config.yaml"), "r") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        config = {}
+    return {**DEFAULTS, **(config.get("daemon") or {})}
+
+
+def daemon_url(config_path: str = None) -> str:
+    """Control endpoint, overridable with TENDERSCAN_DAEMON_URL"""
+    env = os.environ.get("TENDERSCAN_DAEMON_URL")
+    if env:
+        return env.rstrip("/")
+    settings = daemon_config(config_path)
+    return f"http://{settings['host']}:{settings['port']}"
+
+
+class ScanConflict(Exception):
+    """A scan of a different source list is already queued or running"""
+
+    def __init__(self, job: dict):
+        super().__init__(f"Scan {job['id']} is already running for other sources")
+        self.job = job
+
+
+class ScanDaemon:
+    def __init__(self, jobs_dir: str, settings: dict = None):
+        self.settings = {**DEFAULTS, **(settings or {})}
+        self.runner = JobRunner(jobs_dir, max_workers=1)
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.scans = 0
+        self.last_scan = None
+        self._stop = threading.Event()
+        self._server = None
+        self._submit_lock = threading.Lock()
+        self._active = (None, None)      # (job id, sorted sources or None) of the last submitted scan
+
+    # ------------------------------------------------------
+    # SCANS
+    # ------------------------------------------------------
+    def _scan_job(self, sources):
+        def job(progress):
+            import tenderscan
+            from daily_runner import run_daily
+
+            # Hand edits to the tender log since the last scan win over the cached copy
+            if tenderscan.excel_writer.refresh_if_changed():
+                print("[DAEMON] Tender log changed on disk - reloaded")
+            result = run_daily(progress=progress, sources=sources)
+            self.scans += 1
+            self.last_scan = datetime.now().isoformat(timespec="seconds")
+            return result
+        return job
+
+    def submit(self, sources=None):
+        """
+        (job, created). A queued or running scan of the same sources is
+        joined rather than duplicated; one covering other sources raises
+        ScanConflict, so the caller is never told a source is being
+        scanned when it is not.
+        """
+        wanted = sorted(sources) if sources else None
+        with self._submit_lock:
+            job_id, active_sources = self._active
+            job = self.runner.get(job_id) if job_id else None
+            if job and job["status"] in ACTIVE_STATES and active_sources != wanted:
+                raise ScanConflict(job)
+            job, created = self.runner.submit("daily", self._scan_job(sources))
+            if created:
+                self._active = (job["id"], wanted)
+            return job, created
+
+    def _due_sources(self, now: datetime):
+        """Sources to scan now, [] for nothing, None for a full scan"""
+        if self.settings["schedule"] == "daily":
+            hour, minute = (int(v) for v in str(self.settings["daily_at"]).split(":"))
+            slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            last = datetime.fromisoformat(self.last_scan) if self.last_scan else None
+            if now >= slot and (last is None or last < slot):
+                return None
+            return []
+        from tenderscan import source_names
+        return poll_scheduler().due(source_names())
+
+    def _schedule_loop(self):
+        while not self._stop.is_set():
+            try:
+                due = self._due_sources(datetime.now())
+                if due is None or due:
+                    job, created = self.submit(due)
+                    if created:
+                        print(f"[DAEMON] Scheduled scan {job['id']}: {', '.join(due) if due else 'all sources'}")
+            except ScanConflict:
+                pass   # picked up on a later check once the running scan ends
+            except Exception as e:
+                print(f"[DAEMON] Scheduler error: {e}")
+            self._stop.wait(self.settings["check_minutes"] * 60)
+
+    # ------------------------------------------------------
+    # CONTROL ENDPOINT
+    # ------------------------------------------------------
+    def status(self) -> dict:
+        pool = browser_pool()
+        recent = self.runner.history(limit=1)
+        return {
+            "status": "running",
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "schedule": self.settings["schedule"],
+            "scans": self.scans,
+            "last_scan": self.last_scan,
+            "last_job": recent[0] if recent else None,
+            "browsers": {"idle": pool.idle_count(), "created": pool.created, "reused": pool.reused},
+        }
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, code, payload):
+                body = json.dumps(payload, default=str).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = urlparse(self.path).path.rstrip("/")
+                if path == "/status":
+                    return self._send(200, daemon.status())
+                if path.startswith("/jobs/"):
+                    job = daemon.runner.get(path[len("/jobs/"):])
+                    return self._send(200, job) if job else self._send(404, {"error": "Unknown job"})
+                return self._send(404, {"error": f"Unknown path: {path}"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path.rstrip("/") != "/run/daily":
+                    return self._send(404, {"error": f"Unknown path: {url.path}"})
+                names = parse_qs(url.query).get("sources", [""])[0]
+                sources = [s.strip() for s in names.split(",") if s.strip()] or None
+                try:
+                    job, created = daemon.submit(sources)
+                except ScanConflict as e:
+                    return self._send(409, {"error": str(e), "job": e.job})
+                return self._send(202, {"job": job, "created": created})
+
+            def log_message(self, fmt, *args):
+                pass   # keep the daemon log to scans
+
+        return Handler
+
+    # ------------------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------------------
+    def serve(self):
+        """Run until Ctrl+C / SIGTERM; warm state lives as long as the process"""
+        browser_pool().keep = True
+        self._server = ThreadingHTTPServer((self.settings["host"], int(self.settings["port"])), self._handler())
+        threading.Thread(target=self._schedule_loop, name="daemon-scheduler", daemon=True).start()
+        print(f"[DAEMON] Listening on http://{self.settings['host']}:{self.settings['port']} "
+              f"(schedule: {self.settings['schedule']})")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.server_close()
+        browser_pool().close()
+        print("[DAEMON] Stopped")
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_daemon(output_dir: str):
+    import signal
+
+    daemon = ScanDaemon(os.path.join(output_dir, "jobs"), daemon_config())
+    signal.signal(signal.SIGTERM, _raise_interrupt)   # launchd/systemd stop -> clean shutdown
+    daemon.serve()
@@ -0,0 +1,342 @@
+# ==========================================================
+# TENDER FULL-TEXT SEARCH INDEX
+# SQLite FTS5 index over tender history with BM25 ranking
+# Updated incrementally as tenders are added
+# ==========================================================
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from scoring_engine import dimension_scores
+
+
+# BM25 column weights: title, description, client, ref, reason
+BM25_WEIGHTS = (5.0, 1.0, 3.0, 4.0, 0.5)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenders (
+    id INTEGER PRIMARY KEY,
+    tender_key TEXT UNIQUE NOT NULL,
+    ref TEXT,
+    title TEXT,
+    description TEXT,
+    client TEXT,
+    reason TEXT,
+    source TEXT,
+    category TEXT,
+    priority TEXT,
+    composite REAL,
+    closing_date TEXT,
+    url TEXT,
+    date_added TEXT,
+    status TEXT,
+    fit_score REAL,
+    industry_score REAL,
+    risk_score REAL,
+    revenue_score REAL,
+    suitability_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tenders_date_added ON tenders(date_added);
+CREATE INDEX IF NOT EXISTS idx_tenders_ref ON tenders(ref COLLATE NOCASE);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tenders_fts USING fts5(
+    title, description, client, ref, reason,
+    content='tenders', content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS tenders_ai AFTER INSERT ON tenders BEGIN
+    INSERT INTO tenders_fts(rowid, title, description, client, ref, reason)
+    VALUES (new.id, new.title, new.description, new.client, new.ref, new.reason);
+END;
+CREATE TRIGGER IF NOT EXISTS tenders_ad AFTER DELETE ON tenders BEGIN
+    INSERT INTO tenders_fts(tenders_fts, rowid, title, description, client, ref, reason)
+    VALUES ('delete', old.id, old.title, old.description, old.client, old.ref, old.reason);
+END;
+CREATE TRIGGER IF NOT EXISTS tenders_au AFTER UPDATE ON tenders BEGIN
+    INSERT INTO tenders_fts(tenders_fts, rowid, title, description, client, ref, reason)
+    VALUES ('delete', old.id, old.title, old.description, old.client, old.ref, old.reason);
+    INSERT INTO tenders_fts(rowid, title, description, client, ref, reason)
+    VALUES (new.id, new.title, new.description, new.client, new.ref, new.reason);
+END;
+"""
+
+# The five composite inputs as scored when the tender was indexed (scoring_engine.WEIGHT_KEYS order)
+SUBSCORE_COLUMNS = ("fit_score", "industry_score", "risk_score", "revenue_score", "suitability_score")
+
+RESULT_COLUMNS = (
+    "ref", "title", "description", "client", "reason", "source", "category",
+    "priority", "composite", "closing_date", "url", "date_added", "status",
+)
+
+
+# ----------------------------------------------------------
+# HELPERS
+# ----------------------------------------------------------
+def tender_key(t: dict) -> str:
+    """Stable key for a tender (placeholder refs like 'EKU' are shared, so include the title)"""
+    ref = (t.get("ref") or "").strip().lower()
+    title = (t.get("title") or "").strip().lower()
+    return f"{ref}::{title}"
+
+
+def parse_since(value: str) -> str:
+    """
+    Accept YYYY-MM-DD or a relative window ('30d', '6m', '1y').
+    Returns an ISO date string.
+    """
+    value = (value or "").strip().lower()
+    match = re.fullmatch(r"(\d+)\s*([dwmy])", value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        days = {"d": 1, "w": 7, "m": 30, "y": 365}[unit] * amount
+        return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+def to_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match (prefix match)"""
+    words = re.findall(r"\w+", text or "", flags=re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+# ----------------------------------------------------------
+# INDEX
+# ----------------------------------------------------------
+class TenderSearchIndex:
+    """Full-text index stored in a single SQLite file (WAL mode)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tenders)")}
+            if "status" not in columns:   # indexes created before bid outcomes were kept
+                conn.execute("ALTER TABLE tenders ADD COLUMN status TEXT")
+            for column in SUBSCORE_COLUMNS:   # ... and before sub-scores were stored
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE tenders ADD COLUMN {column} REAL")
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection; commits on success, always closes"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(t: dict, date_added: str) -> tuple:
+        scores = t.get("scores") or {}
+        composite = scores.get("composite", scores.get("composite_score"))
+        try:
+            subscores = tuple(float(v) for v in dimension_scores(scores))
+        except (KeyError, TypeError, ValueError):
+            subscores = (None,) * len(SUBSCORE_COLUMNS)
+        return (
+            tender_key(t),
+            t.get("ref") or "",
+            t.get("title") or "",
+            t.get("description") or "",
+            t.get("client") or "",
+            t.get("reason") or "",
+            t.get("source") or "",
+            t.get("category") or "",
+            scores.get("priority") or t.get("priority") or "",
+            float(composite) if isinstance(composite, (int, float)) else None,
+            t.get("closing_date") or "",
+            t.get("url") or "",
+            date_added,
+            t.get("status") or "",
+            *subscores,
+        )
+
+    # ------------------------------------------------------
+    # WRITES
+    # ------------------------------------------------------
+    def upsert_many(self, tenders, date_added: str = None) -> int:
+        """
+        Insert or update tenders in one transaction.
+        date_added is kept from the first time a tender was indexed,
+        status (bid / won / lost ...) and sub-scores until new ones replace them.
+        """
+        date_added = date_added or datetime.now().strftime("%Y-%m-%d")
+        rows = [self._row(t, t.get("date_added") or date_added) for t in tenders]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO tenders (tender_key, ref, title, description, client, reason,
+                                     source, category, priority, composite, closing_date,
+                                     url, date_added, status, fit_score, industry_score,
+                                     risk_score, revenue_score, suitability_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(tender_key) DO UPDATE SET
+                    description = excluded.description,
+                    client = excluded.client,
+                    reason = excluded.reason,
+                    source = excluded.source,
+                    category = excluded.category,
+                    priority = excluded.priority,
+                    composite = excluded.composite,
+                    closing_date = excluded.closing_date,
+                    url = excluded.url,
+                    status = COALESCE(NULLIF(excluded.status, ''), tenders.status),
+                    fit_score = COALESCE(excluded.fit_score, tenders.fit_score),
+                    industry_score = COALESCE(excluded.industry_score, tenders.industry_score),
+                    risk_score = COALESCE(excluded.risk_score, tenders.risk_score),
+                    revenue_score = COALESCE(excluded.revenue_score, tenders.revenue_score),
+                    suitability_score = COALESCE(excluded.suitability_score, tenders.suitability_score)
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def sync_status(self, tenders) -> int:
+        """
+        Copy bid status ({'ref', 'title', 'status'}, e.g. from the Tender_Log)
+        onto indexed tenders; returns the number of rows changed.
+        """
+        rows = [(t["status"], tender_key(t), t["status"]) for t in tenders if t.get("status")]
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            cursor = conn.executemany("UPDATE tenders SET status = ? WHERE tender_key = ? AND status IS NOT ?", rows)
+            return cursor.rowcount
+
+    def upsert(self, tender: dict, date_added: str = None) -> None:
+        self.upsert_many([tender], date_added=date_added)
+
+    def rebuild(self, tenders) -> int:
+        """Drop everything and re-index (e.g. from a snapshot file)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tenders")
+            conn.execute("INSERT INTO tenders_fts(tenders_fts) VALUES ('rebuild')")
+        return self.upsert_many(tenders)
+
+    def optimize(self) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT INTO tenders_fts(tenders_fts) VALUES ('optimize')")
+
+    # ------------------------------------------------------
+    # READS
+    # ------------------------------------------------------
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tenders").fetchone()[0]
+
+    def texts_since(self, last_id: int = 0) -> list:
+        """(id, tender_key, title, description, client) for rows indexed after last_id"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, tender_key, title, description, client FROM tenders WHERE id > ? ORDER BY id",
+                (int(last_id),),
+            ).fetchall()
+
+    def subscore_rows(self) -> list:
+        """(tender_key, title, description, client, closing_date, category, *SUBSCORE_COLUMNS) in index order"""
+        columns = ", ".join(SUBSCORE_COLUMNS)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT tender_key, title, description, client, closing_date, category, {columns} "
+                "FROM tenders ORDER BY id"
+            ).fetchall()
+
+    def set_subscores(self, values: dict) -> None:
+        """tender_key -> five sub-scores, for rows indexed before sub-scores were stored"""
+        assignments = ", ".join(f"{column} = ?" for column in SUBSCORE_COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"UPDATE tenders SET {assignments} WHERE tender_key = ?",
+                [(*(float(v) for v in dims), key) for key, dims in values.items()],
+            )
+
+    def _fetch(self, where: str, params) -> list:
+        columns = ", ".join(RESULT_COLUMNS)
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT tender_key, {columns} FROM tenders WHERE {where}", params).fetchall()
+        return [{"tender_key": row[0], **dict(zip(RESULT_COLUMNS, row[1:]))} for row in rows]
+
+    def get_many(self, keys) -> dict:
+        """tender_key -> row for the given keys (missing keys are left out)"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = self._fetch(f"tender_key IN ({', '.join('?' for _ in keys)})", keys)
+        return {row["tender_key"]: row for row in rows}
+
+    def find_ref(self, ref: str) -> list:
+        """Rows with this reference (case-insensitive), most recently indexed first"""
+        return self._fetch("ref = ? COLLATE NOCASE ORDER BY date_added DESC, id DESC", ((ref or "").strip(),))
+
+    def search(self, query: str = "", client: str = None, source: str = None,
+               category: str = None, priority: str = None, since: str = None,
+               until: str = None, limit: int = 20, raw: bool = False) -> list:
+        """
+        Ranked search. query is free text (all words must match, prefix
+        matching) unless raw=True, in which case it is passed to FTS5 as-is.
+        client/source match as case-insensitive substrings; since/until
+        filter on the date the tender was first indexed.
+        """
+        where = []
+        params = []
+
+        match = query if raw else to_match_query(query)
+        if match:
+            where.append("tenders_fts MATCH ?")
+            params.append(match)
+        if client:
+            where.append("(t.client LIKE ? OR t.source LIKE ?)")
+            params.extend([f"%{client}%", f"%{client}%"])
+        if source:
+            where.append("t.source LIKE ?")
+            params.append(f"%{source}%")
+        if category:
+            where.append("t.category = ?")
+            params.append(category)
+        if priority:
+            where.append("t.priority = ?")
+            params.append(priority.upper())
+        if since:
+            where.append("t.date_added >= ?")
+            params.append(parse_since(since))
+        if until:
+            where.append("t.date_added <= ?")
+            params.append(parse_since(until))
+
+        columns = ", ".join(f"t.{c}" for c in RESULT_COLUMNS)
+        if match:
+            weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+            sql = (
+                f"SELECT {columns}, bm25(tenders_fts, {weights}) AS rank "
+                "FROM tenders_fts JOIN tenders t ON t.id = tenders_fts.rowid"
+            )
+            order = "ORDER BY rank"
+        else:
+            sql = f"SELECT {columns}, 0.0 AS rank FROM tenders t"
+            order = "ORDER BY t.date_added DESC, t.id DESC"
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" {order} LIMIT ?"
+        params.append(int(limit))
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            item = dict(zip(RESULT_COLUMNS, row[:-1]))
+            item["rank"] = round(-row[-1], 3)  # bm25() is lower-is-better
+            results.append(item)
+        return results
@@ -0,0 +1,246 @@
+# ==========================================================
+# SIMILAR PAST TENDERS
+# TF-IDF vectors (sublinear tf, smoothed idf, L2-normalised)
+# over title + description + client, kept as CSR rows plus a
+# term -> postings (CSC) view. A query is one sparse product
+# q . X^T computed from the query terms' postings, so a lookup
+# touches only the tenders that share a word with it.
+# New tenders are appended without re-reading the history;
+# idf / norms / postings are recomputed with NumPy on the next
+# query (O(nnz), no re-tokenising).
+# ==========================================================
+
+import os
+import threading
+from collections import Counter
+
+from utils.search_index import tender_key
+from utils.text_classifier import np, tokenize
+
+
+DEFAULT_K = 5
+MAX_DF_RATIO = 0.5      # query terms in more than half the history barely rank - skip their postings
+MIN_DF_CUTOFF_ROWS = 50 # below this many other tenders every shared term counts
+
+
+def similarity_text(t: dict) -> str:
+    return " ".join(str(t.get(f) or "") for f in ("title", "description", "client"))
+
+
+def _terms(text: str) -> Counter:
+    return Counter(tok for tok in tokenize(text) if len(tok) > 1 and not tok.isdigit())
+
+
+class SimilarityIndex:
+    """
+    index = SimilarityIndex()
+    index.add_many((key, text) for ...)      # re-adding a key replaces it
+    index.similar(text, k=5, exclude=(key,)) # [(key, cosine), ...]
+    """
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("numpy is required for tender similarity (pip install numpy)")
+        self._lock = threading.RLock()
+        self.vocab = {}
+        self.keys = []             # row -> key
+        self.rows = {}             # key -> row
+        self._live = []            # row -> still current (False once replaced / removed)
+        self._pending = []         # (row, term ids, tf) not yet in the arrays
+        self._row_lengths = np.zeros(0, dtype=np.int64)
+        self._terms = np.zeros(0, dtype=np.int64)
+        self._tf = np.zeros(0, dtype=np.float32)
+        self._n = 0
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------
+    def add_many(self, items) -> int:
+        """Add (key, text) pairs; returns the number added"""
+        added = 0
+        with self._lock:
+            for key, text in items:
+                counts = _terms(text)
+                ids = np.fromiter((self.vocab.setdefault(term, len(self.vocab)) for term in counts),
+                                  dtype=np.int64, count=len(counts))
+                tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+                self.remove(key)
+                row = len(self.keys)
+                self.keys.append(key)
+                self._live.append(True)
+                self.rows[key] = row
+                self._pending.append((row, ids, tf.astype(np.float32)))
+                added += 1
+            self._dirty = self._dirty or added > 0
+        return added
+
+    def add(self, key: str, text: str):
+        self.add_many([(key, text)])
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            row = self.rows.pop(key, None)
+            if row is None:
+                return False
+            self._live[row] = False
+            self._dirty = True
+            return True
+
+    def _compact(self):
+        """Fold pending rows in, drop dead ones, recompute idf, norms and postings"""
+        if self._pending:
+            self._row_lengths = np.concatenate([self._row_lengths,
+                                                [len(ids) for _, ids, _ in self._pending]]).astype(np.int64)
+            self._terms = np.concatenate([self._terms] + [ids for _, ids, _ in self._pending])
+            self._tf = np.concatenate([self._tf] + [tf for _, _, tf in self._pending])
+            self._pending = []
+
+        live = np.asarray(self._live, dtype=bool)
+        if not live.all():
+            entry_live = np.repeat(live, self._row_lengths)
+            self._terms = self._terms[entry_live]
+            self._tf = self._tf[entry_live]
+            self._row_lengths = self._row_lengths[live]
+            self.keys = [k for k, alive in zip(self.keys, live) if alive]
+            self.rows = {k: i for i, k in enumerate(self.keys)}
+            self._live = [True] * len(self.keys)
+
+        n = len(self.keys)
+        entry_row = np.repeat(np.arange(n, dtype=np.int64), self._row_lengths)
+        df = np.bincount(self._terms, minlength=len(self.vocab))
+        self._df = df
+        self._idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        weights = self._tf * self._idf[self._terms]
+        norms = np.sqrt(np.bincount(entry_row, weights=weights * weights, minlength=n))
+        norms[norms == 0] = 1.0
+        weights = (weights / norms[entry_row]).astype(np.float32)
+
+        # Postings: entries grouped by term (a CSC view of the same matrix)
+        order = np.argsort(self._terms, kind="stable")
+        self._post_rows = entry_row[order]
+        self._post_weights = weights[order]
+        self._post_ptr = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self._n = n
+        self._dirty = False
+
+    # ------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------
+    def similar(self, text: str, k: int = DEFAULT_K, exclude=()) -> list:
+        """Top-k (key, cosine similarity) for the text, best first; zero-overlap rows never appear"""
+        with self._lock:
+            if self._dirty:
+                self._compact()
+            if not self._n:
+                return []
+
+            counts = {self.vocab[t]: c for t, c in _terms(text).items() if t in self.vocab}
+            ids = np.fromiter(counts, dtype=np.int64, count=len(counts))
+            if not len(ids):
+                return []
+            q = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self._idf[ids]
+            q /= np.sqrt((q * q).sum()) or 1.0
+
+            # df is counted over the other tenders: the query's own row must not push its terms over the cutoff
+            excluded = np.fromiter((self.rows[key] for key in exclude if key in self.rows), dtype=np.int64)
+            others = self._n - len(excluded)
+            max_df = int(others * MAX_DF_RATIO) if others >= MIN_DF_CUTOFF_ROWS else others
+
+            kept, common = [], []
+            for term, weight in zip(ids, q):
+                start, end = self._post_ptr[term], self._post_ptr[term + 1]
+                if start == end:
+                    continue
+                posting = (self._post_rows[start:end], self._post_weights[start:end] * weight)
+                df = end - start
+                if len(excluded):
+                    df -= int(np.isin(posting[0], excluded).sum())
+                (common if df > max_df else kept).append(posting)
+            postings = kept or common      # only common words in the query - rank on those rather than nothing
+            if not postings:
+                return []
+            rows = np.concatenate([r for r, _ in postings])
+            contrib = np.concatenate([c for _, c in postings])
+            scores = np.bincount(rows, weights=contrib, minlength=self._n)
+
+            for key in exclude:
+                row = self.rows.get(key)
+                if row is not None:
+                    scores[row] = 0.0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+            return [(self.keys[i], round(float(scores[i]), 4)) for i in candidates]
+
+
+# ----------------------------------------------------------
+# SEARCH-INDEX BACKED (tender history in tender_search.db)
+# ----------------------------------------------------------
+class TenderSimilarity:
+    """
+    Similarity over a TenderSearchIndex, synced incrementally: rows
+    indexed since the last lookup are added when the database file
+    changes. In-place edits of already-indexed text are picked up on
+    the next process start (results always carry the current row).
+    """
+
+    def __init__(self, search_index):
+        self.search_index = search_index
+        self.index = None          # built on first lookup
+        self._last_id = 0
+        self._file_key = None
+        self._lock = threading.Lock()
+
+    def _db_key(self):
+        key = []
+        for path in (self.search_index.db_path, self.search_index.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                key.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def refresh(self) -> int:
+        """Pull rows added since the last refresh; returns how many"""
+        with self._lock:
+            key = self._db_key()
+            if self.index is None:
+                self.index = SimilarityIndex()
+            elif key == self._file_key:
+                return 0
+            rows = self.search_index.texts_since(self._last_id)
+            self.index.add_many((k, f"{title or ''} {description or ''} {client or ''}")
+                                for _, k, title, description, client in rows)
+            if rows:
+                self._last_id = rows[-1][0]
+            self._file_key = key
+            return len(rows)
+
+    def similar_to(self, tender: dict, k: int = DEFAULT_K) -> list:
+        """Search-index rows most similar to the tender, each with a 'similarity' score"""
+        self.refresh()
+        key = tender.get("tender_key") or tender_key(tender)
+        matches = self.index.similar(similarity_text(tender), k=k, exclude=(key,))
+        rows = self.search_index.get_many(m for m, _ in matches)
+        results = []
+        for match, score in matches:
+            row = rows.get(match)
+            if row is not None:
+                row.pop("description", None)
+                results.append({**row, "similarity": score})
+        return results
+
+    def similar_to_ref(self, ref: str, k: int = DEFAULT_K):
+        """(tender, similar rows) for the most recently indexed tender with this ref; (None, []) if unknown"""
+        found = self.search_index.find_ref(ref)
+        if not found:
+            return None, []
+        tender = found[0]
+        return tender, self.similar_to(tender, k)
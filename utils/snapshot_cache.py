@@ -0,0 +1,174 @@
+# ==========================================================
+# DASHBOARD SNAPSHOT CACHE
+# Keeps the parsed new_tenders.json snapshot in memory
+# Rebuilt only when the file's mtime/size changes
+# ==========================================================
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from utils.rollups import snapshot_rollups
+from utils.tender_index import TenderIndex
+
+
+PRIORITIES = ("HIGH", "MEDIUM", "LOW")
+
+
+# ----------------------------------------------------------
+# SNAPSHOT HELPERS
+# ----------------------------------------------------------
+def extract_tenders(payload) -> list:
+    """Return the tender list from either snapshot shape ({meta, tenders} or bare list)"""
+    if isinstance(payload, dict):
+        tenders = payload.get("tenders") or payload.get("data") or []
+        return tenders if isinstance(tenders, list) else []
+    return payload if isinstance(payload, list) else []
+
+
+def dashboard_row(t: dict) -> dict:
+    """Flatten a stored tender into the row shape used by the Flask dashboard"""
+    scores = t.get("scores", {}) or {}
+    return {
+        "ref": t.get("ref", "N/A"),
+        "title": t.get("title", "Unknown"),
+        "client": t.get("client", ""),
+        "category": t.get("category", ""),
+        "closing": t.get("closing_date", ""),
+        "source": t.get("source", ""),
+        "priority": scores.get("priority", "LOW"),
+        "score": scores.get("composite", 0)
+    }
+
+
+def compute_counts(tenders: list) -> dict:
+    """Aggregate counters shown on the dashboard stat cards"""
+    counts = {"total": len(tenders), "HIGH": 0, "MEDIUM": 0, "LOW": 0, "tes": 0, "phakathi": 0}
+
+    for t in tenders:
+        priority = (t.get("scores", {}) or {}).get("priority", "LOW")
+        if priority in PRIORITIES:
+            counts[priority] += 1
+
+        source_lower = (t.get("source") or t.get("client") or "").lower()
+        if "tes" in source_lower:
+            counts["tes"] += 1
+        if "phakathi" in source_lower:
+            counts["phakathi"] += 1
+
+    return counts
+
+
+def counts_from_rollups(rollups) -> dict:
+    """compute_counts() from the snapshot's rollup counters, O(buckets)"""
+    counts = {"total": rollups.total, "HIGH": 0, "MEDIUM": 0, "LOW": 0, "tes": 0, "phakathi": 0}
+
+    for priority, count in rollups.counts("priority", default="LOW").items():
+        if priority in PRIORITIES:
+            counts[priority] += count
+
+    for source, count in rollups.counts("source").items():
+        source_lower = source.lower()
+        if "tes" in source_lower:
+            counts["tes"] += count
+        if "phakathi" in source_lower:
+            counts["phakathi"] += count
+
+    return counts
+
+
+# ----------------------------------------------------------
+# SNAPSHOT VIEW (immutable once built)
+# ----------------------------------------------------------
+class SnapshotView:
+    """Everything the web layer needs from one version of the snapshot"""
+
+    def __init__(self, key, payload, last_run: str, rollups=None):
+        self.key = key
+        self.payload = payload
+        self.tenders = extract_tenders(payload)
+        self.rows = [dashboard_row(t) for t in self.tenders]
+        self.counts = counts_from_rollups(rollups) if rollups is not None else compute_counts(self.tenders)
+        self.last_run = last_run
+
+        # Pre-serialised API body (compact) plus a gzip variant
+        self.body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self.body_gzip = gzip.compress(self.body, compresslevel=6)
+        self.etag = hashlib.sha1(self.body).hexdigest()[:20]
+
+        # Sorted / inverted indexes for filtered API queries
+        self.index = TenderIndex(self.tenders, version=self.etag)
+
+        # Derived artifacts (rendered HTML etc.) memoised per version
+        self.memo = {}
+
+
+# ----------------------------------------------------------
+# CACHE
+# ----------------------------------------------------------
+class SnapshotCache:
+    """
+    Thread-safe, process-local cache of a JSON snapshot file.
+    The file is only stat()'d once per check_interval seconds and
+    only re-read when its (mtime, size) key changes.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._view = None
+        self._checked_at = 0.0
+
+    def _file_key(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, key) -> SnapshotView:
+        if key is None:
+            return SnapshotView(None, [], "No runs yet")
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        last_run = datetime.fromtimestamp(key[0] / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            rollups = snapshot_rollups(self.path, extract_tenders(payload))
+        except Exception:
+            rollups = None
+        return SnapshotView(key, payload, last_run, rollups)
+
+    def get(self) -> SnapshotView:
+        """Return the current view, reloading only if the snapshot file changed"""
+        now = time.monotonic()
+        view = self._view
+        if view is not None and now - self._checked_at < self.check_interval:
+            return view
+
+        with self._lock:
+            if self._view is not None and now - self._checked_at < self.check_interval:
+                return self._view
+
+            key = self._file_key()
+            if self._view is None or key != self._view.key:
+                try:
+                    self._view = self._load(key)
+                except Exception as e:
+                    # Half-written or corrupt file: keep serving the previous version
+                    print(f"Error loading tenders snapshot: {e}")
+                    if self._view is None:
+                        self._view = SnapshotView(None, [], "No runs yet")
+            self._checked_at = now
+            return self._view
+
+    def invalidate(self):
+        """Force the next get() to re-check the file"""
+        with self._lock:
+            self._checked_at = 0.0
@@ -0,0 +1,330 @@
+# ==========================================================
+# SOURCE HEALTH
+# Per-source latency histograms persisted across runs, adaptive
+# request timeouts from the observed p95, and a circuit breaker
+# that stops paying full timeouts for dead portals:
+#   closed    - requests go through
+#   open      - skipped until the cool-down ends (doubles per failed probe)
+#   half_open - one probe run; success closes, failure re-opens
+# ==========================================================
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import yaml
+
+
+HEALTH_FILENAME = "source_health.json"
+HEALTH_VERSION = 1
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latency bucket upper bounds (seconds), roughly x1.4 apart; the last catches everything
+BUCKETS = tuple(round(0.1 * 1.4 ** i, 2) for i in range(22)) + (float("inf"),)
+
+DEFAULTS = {
+    "failure_threshold": 3,       # consecutive failures before the circuit opens
+    "cooldown_hours": 6,          # first open period; doubled per failed probe
+    "max_cooldown_hours": 168,
+    "min_samples": 5,             # successes needed before timeouts adapt
+    "timeout_factor": 1.5,        # timeout = p95 x factor, within [min_timeout, default]
+    "min_timeout": 3,
+    "decay": 0.97,                # per-observation weight decay, so old latencies fade
+}
+
+
+class SourceUnavailable(Exception):
+    """Raised instead of a request while a source's circuit is open"""
+
+
+def health_config(config_path: str = None) -> dict:
+    """config.yaml `source_health:` over DEFAULTS, plus the state file path"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(config_path or os.path.join(root, "config.yaml"), "r") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        config = {}
+    settings = {**DEFAULTS, **(config.get("source_health") or {})}
+    output_dir = (config.get("paths") or {}).get("output_dir") or os.path.join(root, "output")
+    settings.setdefault("path", os.path.join(output_dir, HEALTH_FILENAME))
+    return settings
+
+
+_local = threading.local()
+
+
+def http_session():
+    """Per-thread requests.Session, so repeat requests to a portal reuse its connection"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        session = _local.session = requests.Session()
+    return session
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _stamp(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M") if ts else ""
+
+
+def _new_state() -> dict:
+    return {
+        "histogram": [0.0] * len(BUCKETS),
+        "samples": 0,
+        "state": CLOSED,
+        "consecutive_failures": 0,
+        "open_count": 0,            # opens in a row without a successful probe
+        "opened_at": None,
+        "retry_at": None,
+        "successes": 0,
+        "failures": 0,
+        "skipped": 0,
+        "last_error": "",
+        "last_success": None,
+        "last_failure": None,
+    }
+
+
+class SourceHealth:
+    """
+    health = source_health()
+    if health.allow("Rand Water"):
+        resp = health.get("Rand Water", url, default_timeout=20, headers=HEADERS)
+    health.save()
+    """
+
+    def __init__(self, path: str, settings: dict = None):
+        self.path = path
+        self.settings = {**DEFAULTS, **(settings or {})}
+        self._lock = threading.RLock()
+        self.sources = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != HEALTH_VERSION:
+            return
+        for name, state in (data.get("sources") or {}).items():
+            merged = {**_new_state(), **state}
+            if len(merged["histogram"]) != len(BUCKETS):
+                merged["histogram"], merged["samples"] = [0.0] * len(BUCKETS), 0
+            self.sources[name] = merged
+
+    def save(self):
+        with self._lock:
+            payload = {"version": HEALTH_VERSION, "updated_at": _stamp(_now()), "sources": self.sources}
+            tmp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=1)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass   # read-only location - state is kept for this run only
+
+    def _source(self, name: str) -> dict:
+        return self.sources.setdefault(name, _new_state())
+
+    # ------------------------------------------------------
+    # LATENCY
+    # ------------------------------------------------------
+    def _observe(self, s: dict, seconds: float):
+        decay = self.settings["decay"]
+        histogram = s["histogram"]
+        for i in range(len(histogram)):
+            histogram[i] *= decay
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1.0
+                break
+        s["samples"] += 1
+
+    def percentile(self, name: str, q: float = 0.95):
+        """Upper bound of the bucket holding the q-th latency, None without data"""
+        with self._lock:
+            s = self.sources.get(name)
+            if not s or not s["samples"]:
+                return None
+            histogram = s["histogram"]
+            target = q * sum(histogram)
+            running = 0.0
+            for bound, count in zip(BUCKETS, histogram):
+                running += count
+                if running >= target:
+                    return bound
+            return BUCKETS[-2]
+
+    def timeout_for(self, name: str, default: float) -> float:
+        """Request timeout for the source: p95 x factor once there is enough history"""
+        with self._lock:
+            s = self.sources.get(name)
+            if not s or s["successes"] < self.settings["min_samples"]:
+                return default
+            p95 = self.percentile(name)
+            if p95 is None or p95 == float("inf"):
+                return default
+            timeout = p95 * self.settings["timeout_factor"]
+            return round(min(default, max(self.settings["min_timeout"], timeout)), 1)
+
+    # ------------------------------------------------------
+    # CIRCUIT BREAKER
+    # ------------------------------------------------------
+    def allow(self, name: str) -> bool:
+        """
+        False while the circuit is open (counted as a skip); once the
+        cool-down has passed the source goes half-open for one probe run
+        """
+        with self._lock:
+            s = self._source(name)
+            if s["state"] == OPEN:
+                if _now() < (s["retry_at"] or 0):
+                    s["skipped"] += 1
+                    return False
+                s["state"] = HALF_OPEN
+            return True
+
+    def record_success(self, name: str, seconds: float):
+        with self._lock:
+            s = self._source(name)
+            self._observe(s, seconds)
+            s["successes"] += 1
+            s["consecutive_failures"] = 0
+            s["open_count"] = 0
+            s["state"] = CLOSED
+            s["opened_at"] = s["retry_at"] = None
+            s["last_success"] = _stamp(_now())
+
+    def record_failure(self, name: str, error: str, seconds: float = None, timed_out: bool = False):
+        """
+        A failed request. Timeouts also go into the histogram (at the
+        timeout used) so a too-tight adaptive timeout widens again.
+        """
+        with self._lock:
+            s = self._source(name)
+            if timed_out and seconds:
+                self._observe(s, seconds)
+            s["failures"] += 1
+            s["consecutive_failures"] += 1
+            s["last_error"] = str(error)[:200]
+            s["last_failure"] = _stamp(_now())
+            if s["state"] == HALF_OPEN or s["consecutive_failures"] >= self.settings["failure_threshold"]:
+                self._open(s)
+
+    def _open(self, s: dict):
+        hours = min(self.settings["cooldown_hours"] * 2 ** s["open_count"], self.settings["max_cooldown_hours"])
+        now = _now()
+        s["state"] = OPEN
+        s["open_count"] += 1
+        s["opened_at"] = now
+        s["retry_at"] = now + hours * 3600
+
+    def reset(self, name: str):
+        """Close the circuit by hand (e.g. after a portal's URL was fixed)"""
+        with self._lock:
+            s = self._source(name)
+            s["state"] = CLOSED
+            s["consecutive_failures"] = s["open_count"] = 0
+            s["opened_at"] = s["retry_at"] = None
+
+    # ------------------------------------------------------
+    # WRAPPERS
+    # ------------------------------------------------------
+    def get(self, name: str, url: str, default_timeout: float = 20, session=None, **kwargs):
+        """
+        requests.get with the source's adaptive timeout, recorded against it.
+        HTTP errors (4xx/5xx, e.g. a 405 from a retired endpoint) count as
+        failures but the response is still returned to the caller.
+        """
+        import requests
+
+        if self.sources.get(name, {}).get("state") == OPEN and not self.allow(name):
+            raise SourceUnavailable(f"{name}: circuit open until {_stamp(self.sources[name]['retry_at'])}")
+        timeout = self.timeout_for(name, default_timeout)
+        start = time.monotonic()
+        try:
+            resp = (session or http_session()).get(url, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            self.record_failure(name, f"timeout after {timeout}s: {e}", timeout, timed_out=True)
+            raise
+        except requests.exceptions.RequestException as e:
+            self.record_failure(name, e)
+            raise
+        elapsed = time.monotonic() - start
+        if resp.status_code >= 400:
+            self.record_failure(name, f"HTTP {resp.status_code} from {url}")
+        else:
+            self.record_success(name, elapsed)
+        return resp
+
+    def load_page(self, name: str, driver, url: str, default_timeout: float = 30):
+        """driver.get with the source's adaptive page-load timeout, recorded against it"""
+        if self.sources.get(name, {}).get("state") == OPEN and not self.allow(name):
+            raise SourceUnavailable(f"{name}: circuit open until {_stamp(self.sources[name]['retry_at'])}")
+        timeout = self.timeout_for(name, default_timeout)
+        driver.set_page_load_timeout(timeout)
+        start = time.monotonic()
+        try:
+            driver.get(url)
+        except Exception as e:
+            timed_out = type(e).__name__ == "TimeoutException"
+            self.record_failure(name, e, timeout if timed_out else None, timed_out=timed_out)
+            raise
+        self.record_success(name, time.monotonic() - start)
+
+    # ------------------------------------------------------
+    # METRICS
+    # ------------------------------------------------------
+    def summary(self) -> list:
+        """One dict per source: state, p50/p95, current timeout basis, counters"""
+        with self._lock:
+            rows = []
+            for name, s in sorted(self.sources.items()):
+                rows.append({
+                    "source": name,
+                    "state": s["state"],
+                    "p50": self.percentile(name, 0.5),
+                    "p95": self.percentile(name, 0.95),
+                    "successes": s["successes"],
+                    "failures": s["failures"],
+                    "consecutive_failures": s["consecutive_failures"],
+                    "skipped": s["skipped"],
+                    "retry_at": _stamp(s["retry_at"]),
+                    "last_error": s["last_error"],
+                })
+            return rows
+
+    def retry_at(self, name: str):
+        """When an open circuit lets the next probe through (timestamp), None if not open"""
+        with self._lock:
+            s = self.sources.get(name)
+            return s["retry_at"] if s and s["state"] == OPEN else None
+
+    def open_sources(self) -> list:
+        with self._lock:
+            return [name for name, s in sorted(self.sources.items()) if s["state"] == OPEN]
+
+
+_health_lock = threading.Lock()
+_health = {}
+
+
+def source_health() -> SourceHealth:
+    """Process-wide SourceHealth for the configured state file"""
+    with _health_lock:
+        if "instance" not in _health:
+            settings = health_config()
+            _health["instance"] = SourceHealth(settings.pop("path"), settings)
+        return _health["instance"]
@@ -0,0 +1,136 @@
+# ==========================================================
+# TENDER COLLECTOR
+# Shared accumulator for scrapers and snapshot merging
+# Keyed-dict dedupe on insert (O(1) per tender), refs and
+# titles normalised once, per-source counts
+# ==========================================================
+
+import json
+import re
+from collections import Counter
+from datetime import datetime
+
+
+PLACEHOLDER_REFS = {"", "NA", "N/A", "NONE", "TBC"}
+
+
+# ----------------------------------------------------------
+# NORMALISATION
+# ----------------------------------------------------------
+def normalize_ref(ref) -> str:
+    """'  rw 1234/25 ' -> 'RW 1234/25'"""
+    return re.sub(r"\s+", " ", str(ref or "")).strip().upper()
+
+
+def normalize_title(title) -> str:
+    """Case/whitespace/punctuation-insensitive form of a title"""
+    text = re.sub(r"[^\w]+", " ", str(title or "").lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def title_client_key(title, client) -> str:
+    """Identity for a tender regardless of its ref (scrapers regenerate placeholder refs every run)"""
+    return f"{normalize_title(title)}|{normalize_title(client)}"
+
+
+def is_placeholder_ref(ref_norm: str) -> bool:
+    """
+    Refs that do not identify a tender: blanks and the per-site fallbacks
+    some scrapers use for every row ('EKU', 'TSH', 'CPT', 'ETH' ...).
+    """
+    return ref_norm in PLACEHOLDER_REFS or not any(ch.isdigit() for ch in ref_norm)
+
+
+def dedupe_key(tender: dict, generated_refs=()) -> str:
+    """
+    Identity used for dedupe everywhere: the reference when it is a real
+    one, otherwise the normalised title, otherwise the full record.
+    """
+    ref = normalize_ref(tender.get("ref"))
+    if ref and not is_placeholder_ref(ref) and ref not in generated_refs:
+        return f"ref::{ref}"
+    title = normalize_title(tender.get("title"))
+    if title:
+        return f"title::{title}"
+    try:
+        serialized = json.dumps(tender, sort_keys=True, default=str)
+    except Exception:
+        serialized = repr(sorted(tender.items(), key=lambda kv: kv[0]))
+    return f"fallback::{serialized}"
+
+
+# ----------------------------------------------------------
+# COLLECTOR
+# ----------------------------------------------------------
+class TenderCollector:
+    """
+    Insertion-ordered, de-duplicated set of tenders.
+
+        collector = TenderCollector()
+        if collector.seen(ref, title):      # cheap check before classifying
+            continue
+        collector.add({...})
+        return collector.to_list()
+    """
+
+    def __init__(self, limit: int = None):
+        self.limit = limit
+        self._items = {}
+        self._generated = set()
+        self.source_counts = Counter()
+        self.duplicates = 0
+
+    def placeholder_ref(self, prefix: str) -> str:
+        """Fallback ref for rows without one; dedupe falls back to the title"""
+        ref = f"{prefix}-{datetime.now().strftime('%Y%m%d')}-{len(self._items) + 1}"
+        self._generated.add(normalize_ref(ref))
+        return ref
+
+    def key(self, tender: dict) -> str:
+        return dedupe_key(tender, self._generated)
+
+    def seen(self, ref: str = "", title: str = "") -> bool:
+        """True if a tender with this ref/title is already collected"""
+        return self.key({"ref": ref, "title": title}) in self._items
+
+    def add(self, tender: dict) -> bool:
+        """Insert unless a tender with the same key exists; True if added"""
+        if self.full:
+            return False
+        if isinstance(tender.get("ref"), str):
+            tender["ref"] = re.sub(r"\s+", " ", tender["ref"]).strip()
+        if isinstance(tender.get("title"), str):
+            tender["title"] = tender["title"].strip()
+
+        key = self.key(tender)
+        if key in self._items:
+            self.duplicates += 1
+            return False
+        self._items[key] = tender
+        self.source_counts[tender.get("source") or "Unknown"] += 1
+        return True
+
+    def extend(self, tenders) -> int:
+        """Add many (stops at limit); returns how many were new"""
+        added = 0
+        for tender in tenders:
+            if self.full:
+                break
+            added += self.add(tender)
+        return added
+
+    @property
+    def full(self) -> bool:
+        return self.limit is not None and len(self._items) >= self.limit
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def to_list(self) -> list:
+        return list(self._items.values())
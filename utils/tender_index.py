@@ -0,0 +1,255 @@
+# ==========================================================
+# TENDER QUERY INDEX
+# Precomputed per-field indexes over a tender snapshot
+# Powers filtered / sorted / paginated /api/tenders queries
+# ==========================================================
+
+import base64
+import binascii
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+CLOSING_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d %B %Y", "%d %b %Y", "%Y/%m/%d"]
+
+SORT_KEYS = ("score", "-score", "closing", "-closing")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class QueryError(ValueError):
+    """Raised for malformed query parameters or cursors"""
+
+
+# ----------------------------------------------------------
+# FIELD NORMALISATION
+# ----------------------------------------------------------
+def parse_closing_date(value) -> str:
+    """Normalise a scraped closing date to YYYY-MM-DD, or '' if unparseable"""
+    if not value:
+        return ""
+    text = str(value).strip()[:20]
+    if "T" in text:
+        text = text.split("T", 1)[0]
+    for fmt in CLOSING_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return ""
+
+
+def composite_score(t: dict) -> float:
+    scores = t.get("scores") or {}
+    value = scores.get("composite", scores.get("composite_score", 0))
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _key(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def _values(param):
+    """Split a comma-separated filter parameter into normalised keys"""
+    if not param:
+        return []
+    return [_key(v) for v in str(param).split(",") if v.strip()]
+
+
+# ----------------------------------------------------------
+# CURSORS
+# ----------------------------------------------------------
+def encode_cursor(version: str, sort: str, offset: int) -> str:
+    raw = f"{version}|{sort}|{offset}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, sort, offset = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return version, sort, int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise QueryError("Invalid cursor")
+
+
+# ----------------------------------------------------------
+# INDEX
+# ----------------------------------------------------------
+class TenderIndex:
+    """
+    Built once per snapshot version:
+      - positions sorted by composite score (desc) and closing date (asc)
+      - inverted maps priority / category / source -> set of positions
+      - lowercase search text per tender for q= filtering
+    """
+
+    def __init__(self, tenders: list, version: str = ""):
+        self.tenders = tenders
+        self.version = version
+
+        n = len(tenders)
+        self.scores = [composite_score(t) for t in tenders]
+        self.closing = [parse_closing_date(t.get("closing_date")) for t in tenders]
+
+        self.by_score = sorted(range(n), key=lambda i: (-self.scores[i], i))
+
+        # Tenders without a parseable closing date are never matched by
+        # closing_before/after and sort after every dated tender
+        dated = sorted((i for i in range(n) if self.closing[i]), key=lambda i: (self.closing[i], i))
+        undated = [i for i in range(n) if not self.closing[i]]
+        self.by_closing = dated + undated
+        self.closing_keys = [self.closing[i] for i in dated]
+
+        self.score_rank = [0] * n
+        for r, i in enumerate(self.by_score):
+            self.score_rank[i] = r
+        self.closing_rank = [0] * n
+        for r, i in enumerate(self.by_closing):
+            self.closing_rank[i] = r
+
+        self.by_priority = {}
+        self.by_category = {}
+        self.by_source = {}
+        for i, t in enumerate(tenders):
+            priority = _key((t.get("scores") or {}).get("priority") or t.get("priority") or "LOW")
+            self.by_priority.setdefault(priority, set()).add(i)
+            self.by_category.setdefault(_key(t.get("category") or "Unknown"), set()).add(i)
+            self.by_source.setdefault(_key(t.get("source") or "Unknown"), set()).add(i)
+
+        self.search_text = [
+            " ".join(
+                str(t.get(field) or "") for field in ("ref", "title", "description", "client", "source")
+            ).lower()
+            for t in tenders
+        ]
+
+    # ------------------------------------------------------
+    # CANDIDATE SETS
+    # ------------------------------------------------------
+    @staticmethod
+    def _union(inverted: dict, keys: list) -> set:
+        matched = set()
+        for key in keys:
+            matched |= inverted.get(key, set())
+        return matched
+
+    def _closing_range(self, after: str, before: str) -> set:
+        dated = len(self.closing_keys)
+        lo = bisect_left(self.closing_keys, after) if after else 0
+        hi = bisect_right(self.closing_keys, before) if before else dated
+        return set(self.by_closing[lo:hi])
+
+    def _candidates(self, params: dict):
+        """Intersect the inverted indexes; None means 'every tender'"""
+        sets = []
+        for name, inverted in (("priority", self.by_priority),
+                               ("category", self.by_category),
+                               ("source", self.by_source)):
+            keys = _values(params.get(name))
+            if keys:
+                sets.append(self._union(inverted, keys))
+
+        after = params.get("closing_after")
+        before = params.get("closing_before")
+        if after or before:
+            after_key = parse_closing_date(after) if after else ""
+            before_key = parse_closing_date(before) if before else ""
+            if (after and not after_key) or (before and not before_key):
+                raise QueryError("closing_before/closing_after must be dates (YYYY-MM-DD)")
+            sets.append(self._closing_range(after_key, before_key))
+
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            result &= s
+        return result
+
+    # ------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------
+    def query(self, params: dict) -> dict:
+        """
+        Run a filtered, sorted, cursor-paginated query.
+        Walks the pre-sorted order from the cursor and stops once the page
+        is full, so page cost does not grow with the size of the snapshot.
+        """
+        sort = params.get("sort") or "score"
+        if sort not in SORT_KEYS:
+            raise QueryError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+
+        try:
+            limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+        except ValueError:
+            raise QueryError("limit must be an integer")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        min_score = params.get("min_score")
+        if min_score not in (None, ""):
+            try:
+                min_score = float(min_score)
+            except ValueError:
+                raise QueryError("min_score must be a number")
+        else:
+            min_score = None
+
+        offset = 0
+        cursor = params.get("cursor")
+        if cursor:
+            version, cursor_sort, offset = decode_cursor(cursor)
+            if version != self.version:
+                raise QueryError("Cursor expired: the snapshot has changed since this page was served")
+            if cursor_sort != sort:
+                raise QueryError("Cursor was issued for a different sort order")
+
+        candidates = self._candidates(params)
+        needle = (params.get("q") or "").strip().lower()
+
+        if sort in ("score", "-score"):
+            order, rank = self.by_score, self.score_rank
+        else:
+            order, rank = self.by_closing, self.closing_rank
+        total = len(order)
+        reverse = sort.startswith("-")
+
+        if candidates is None:
+            ranks = range(offset, total)
+        else:
+            # Small filtered sets: sort the candidates by rank instead of
+            # scanning the whole order for members
+            ranks = sorted(
+                (total - 1 - rank[i]) if reverse else rank[i] for i in candidates
+            )
+            ranks = ranks[bisect_left(ranks, offset):]
+
+        items = []
+        position = offset
+        exhausted = True
+        for r in ranks:
+            if len(items) >= limit:
+                exhausted = False
+                break
+            position = r + 1
+            i = order[total - 1 - r] if reverse else order[r]
+            if min_score is not None and self.scores[i] < min_score:
+                # Score order is monotonic: nothing further can qualify
+                if sort == "score":
+                    break
+                continue
+            if needle and needle not in self.search_text[i]:
+                continue
+            items.append(self.tenders[i])
+
+        return {
+            "items": items,
+            "count": len(items),
+            "total": (total if candidates is None else len(candidates)) if min_score is None and not needle else None,
+            "sort": sort,
+            "next_cursor": None if exhausted else encode_cursor(self.version, sort, position),
+        }
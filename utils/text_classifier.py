@@ -0,0 +1,194 @@
+# ==========================================================
+# STATISTICAL TENDER CLASSIFIER
+# Multinomial naive Bayes over hashed word 1-2 grams, in NumPy.
+# Trained from the labelled tender history (tools/train_classifier.py)
+# and consulted by classify_engine.llm_enhancement only for tenders
+# the keyword rules leave as Unknown (or Both by keyword overlap).
+# "Unknown" is a trained class too: without it the model has to
+# promote every off-topic tender it is shown to TES / Phakathi.
+# Batch inference is a gather + segmented sum over a CSR layout.
+# ==========================================================
+
+import os
+import re
+import threading
+import zlib
+
+import yaml
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency - classification stays rule-only
+    np = None
+
+
+MODEL_VERSION = 2          # 2: Unknown class (version-1 models could only promote)
+DEFAULT_FEATURES = 2 ** 18
+DEFAULT_THRESHOLD = 0.9
+UNKNOWN = "Unknown"
+CLASSES = ("TES", "Phakathi", "Both", UNKNOWN)
+REASON_PREFIX = "Statistical classifier"   # marks model labels so training can skip them
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def hashed_features(text: str, n_features: int = DEFAULT_FEATURES) -> list:
+    """
+    Distinct feature ids of the text's unigrams and bigrams. crc32 keeps
+    ids stable across processes (the built-in hash() is salted per run).
+    """
+    tokens = tokenize(text)
+    mask = n_features - 1
+    grams = set(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return list({zlib.crc32(g.encode("utf-8")) & mask for g in grams})
+
+
+def featurize(texts, n_features: int = DEFAULT_FEATURES):
+    """CSR-style (indptr, indices) arrays for a batch of texts"""
+    indptr = [0]
+    indices = []
+    for text in texts:
+        indices.extend(hashed_features(text, n_features))
+        indptr.append(len(indices))
+    return np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64)
+
+
+class TenderClassifier:
+    """
+    model = TenderClassifier().fit(texts, labels)
+    model.predict(texts)      # [(label or None, confidence), ...]
+    model.save(path); TenderClassifier.load(path)
+    """
+
+    def __init__(self, classes=CLASSES, n_features: int = DEFAULT_FEATURES, alpha: float = 0.5):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.classes = tuple(classes)
+        self.n_features = n_features
+        self.alpha = alpha
+        self.class_log_prior = None
+        self.feature_log_prob = None    # n_features x classes, so a batch is one gather
+
+    def fit(self, texts, labels) -> "TenderClassifier":
+        class_ids = {c: i for i, c in enumerate(self.classes)}
+        rows = [(t, class_ids[l]) for t, l in zip(texts, labels) if l in class_ids]
+        if not rows:
+            raise ValueError("No training rows with a known class")
+
+        indptr, indices = featurize((t for t, _ in rows), self.n_features)
+        y = np.asarray([c for _, c in rows], dtype=np.int64)
+        row_class = np.repeat(y, np.diff(indptr))
+
+        counts = np.zeros((len(self.classes), self.n_features), dtype=np.float64)
+        for c in range(len(self.classes)):
+            counts[c] = np.bincount(indices[row_class == c], minlength=self.n_features)
+
+        smoothed = counts + self.alpha
+        log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        self.feature_log_prob = log_prob.T.astype(np.float32)
+        class_counts = np.bincount(y, minlength=len(self.classes)) + 1.0
+        self.class_log_prior = np.log(class_counts / class_counts.sum()).astype(np.float32)
+        return self
+
+    def predict_proba(self, texts):
+        """n x classes probabilities"""
+        indptr, indices = featurize(texts, self.n_features)
+        n = len(indptr) - 1
+        if n == 0:
+            return np.zeros((0, len(self.classes)), dtype=np.float32)
+
+        # Segmented sum of the gathered per-feature log-probs; the zero
+        # row appended keeps reduceat valid for trailing empty texts
+        gathered = np.vstack([self.feature_log_prob[indices],
+                              np.zeros((1, len(self.classes)), dtype=np.float32)])
+        joint = np.add.reduceat(gathered, indptr[:-1], axis=0)
+        joint[np.diff(indptr) == 0] = 0.0
+        joint += self.class_log_prior
+
+        joint -= joint.max(axis=1, keepdims=True)
+        proba = np.exp(joint)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, texts, threshold: float = 0.0) -> list:
+        """(label, confidence) per text; label is None below the threshold"""
+        proba = self.predict_proba(list(texts))
+        best = proba.argmax(axis=1)
+        results = []
+        for i, c in enumerate(best):
+            confidence = float(proba[i, c])
+            results.append((self.classes[c] if confidence >= threshold else None, confidence))
+        return results
+
+    # ------------------------------------------------------
+    # SERIALISATION
+    # ------------------------------------------------------
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            version=np.asarray([MODEL_VERSION, self.n_features], dtype=np.int64),
+            classes=np.frombuffer("\n".join(self.classes).encode("utf-8"), dtype=np.uint8),
+            alpha=np.asarray([self.alpha], dtype=np.float64),
+            class_log_prior=self.class_log_prior,
+            feature_log_prob=self.feature_log_prob,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TenderClassifier":
+        with np.load(path, allow_pickle=False) as arrays:
+            version, n_features = (int(v) for v in arrays["version"])
+            if version != MODEL_VERSION:
+                raise ValueError(f"Unsupported classifier model version {version}")
+            model = cls(arrays["classes"].tobytes().decode("utf-8").split("\n"),
+                        n_features, float(arrays["alpha"][0]))
+            model.class_log_prior = arrays["class_log_prior"]
+            model.feature_log_prob = arrays["feature_log_prob"]
+        return model
+
+
+# ----------------------------------------------------------
+# CONFIGURED MODEL (loaded once per process)
+# ----------------------------------------------------------
+def classifier_config(config_path: str = None) -> dict:
+    """config.yaml `classifier:` with defaults; model_path defaults to the output dir"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(config_path or os.path.join(root, "config.yaml"), "r") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        config = {}
+    section = config.get("classifier") or {}
+    output_dir = (config.get("paths") or {}).get("output_dir") or os.path.join(root, "output")
+    return {
+        "enabled": bool(section.get("enabled", True)),
+        "model_path": section.get("model_path") or os.path.join(output_dir, "tender_classifier.npz"),
+        "threshold": float(section.get("threshold", DEFAULT_THRESHOLD)),
+        "refine_categories": list(section.get("refine_categories") or ("Unknown", "Both")),
+    }
+
+
+_model_lock = threading.Lock()
+_model_state = {}
+
+
+def default_classifier():
+    """(model, threshold) from config, or (None, None) when disabled / untrained / no numpy"""
+    with _model_lock:
+        if "model" not in _model_state:
+            config = classifier_config()
+            model = None
+            if np is not None and config["enabled"] and os.path.exists(config["model_path"]):
+                try:
+                    model = TenderClassifier.load(config["model_path"])
+                except (OSError, ValueError, KeyError):
+                    model = None
+            _model_state["model"] = model
+            _model_state["threshold"] = config["threshold"]
+        return _model_state["model"], _model_state["threshold"]
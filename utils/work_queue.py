@@ -0,0 +1,401 @@
+# ==========================================================
+# WORK QUEUE
+# Durable job queue for distributed scraping. Every job has a
+# visible_at time: queued jobs are visible at once, a lease
+# pushes it out by the visibility timeout and heartbeats keep
+# pushing it. A worker that dies simply stops heartbeating, its
+# lease lapses and the job is leased again (up to max_attempts).
+#   SQLiteWorkQueue - one file; workers on this host or a local disk
+#   RedisWorkQueue  - any Redis-compatible server, for several hosts
+# ==========================================================
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import yaml
+
+try:
+    import redis
+except ImportError:   # only needed for backend: redis
+    redis = None
+
+
+QUEUE_FILENAME = "work_queue.db"
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULTS = {
+    "backend": "sqlite",            # sqlite | redis
+    "redis_url": "redis://localhost:6379/0",
+    "prefix": "tenderscan:queue",   # redis key prefix
+    "visibility_timeout": 300,      # seconds a lease lasts without a heartbeat
+    "heartbeat_seconds": 60,
+    "max_attempts": 3,              # leases per job before it is marked failed
+    "retry_delay": 30,              # seconds before a failed attempt is retried
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'queued',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    visible_at  REAL NOT NULL,
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_visible ON jobs(status, visible_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs(run_id);
+"""
+
+
+def queue_config(config_path: str = None) -> dict:
+    """config.yaml `work_queue:` over DEFAULTS, plus the SQLite file path"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        with open(config_path or os.path.join(root, "config.yaml"), "r") as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        config = {}
+    settings = {**DEFAULTS, **(config.get("work_queue") or {})}
+    output_dir = (config.get("paths") or {}).get("output_dir") or os.path.join(root, "output")
+    settings.setdefault("path", os.path.join(output_dir, QUEUE_FILENAME))
+    return settings
+
+
+def _now() -> float:
+    return time.time()
+
+
+class SQLiteWorkQueue:
+    """
+    queue.enqueue(run_id, [payload, ...])
+    job = queue.lease("host-1:4242")           # None when nothing is visible
+    queue.heartbeat(job["id"], "host-1:4242")  # False once the lease was lost
+    queue.complete(job["id"], "host-1:4242", result)
+    """
+
+    def __init__(self, path: str, settings: dict = None):
+        self.path = path
+        self.settings = {**DEFAULTS, **(settings or {})}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection; commits on success, always closes"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, run_id: str, payloads: list) -> list:
+        now = _now()
+        ids = []
+        with self._connect() as conn:
+            for payload in payloads:
+                cur = conn.execute(
+                    "INSERT INTO jobs (run_id, payload, visible_at, created_at) VALUES (?, ?, ?, ?)",
+                    (run_id, json.dumps(payload), now, now),
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def lease(self, worker: str, visibility_timeout: float = None):
+        """Oldest visible job, leased to worker - {id, run_id, payload, attempts} or None"""
+        timeout = visibility_timeout or self.settings["visibility_timeout"]
+        while True:
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")   # one leaser at a time
+                now = _now()
+                row = conn.execute(
+                    """
+                    SELECT id, run_id, payload, attempts FROM jobs
+                    WHERE status IN ('queued', 'leased') AND visible_at <= ?
+                    ORDER BY visible_at, id LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, run_id, payload, attempts = row
+                if attempts >= self.settings["max_attempts"]:
+                    # Its last lease lapsed without a result - the worker keeps dying on it
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                        "error = COALESCE(error, 'lease expired') WHERE id = ?",
+                        (now, job_id),
+                    )
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, attempts = attempts + 1, "
+                    "visible_at = ? WHERE id = ?",
+                    (worker, now + timeout, job_id),
+                )
+                return {"id": job_id, "run_id": run_id, "payload": json.loads(payload), "attempts": attempts + 1}
+
+    def heartbeat(self, job_id: int, worker: str, visibility_timeout: float = None) -> bool:
+        timeout = visibility_timeout or self.settings["visibility_timeout"]
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET visible_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (_now() + timeout, job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result) -> bool:
+        """False if the lease was lost (the job was handed to another worker)"""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result, default=str), _now(), job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Requeue after retry_delay, or mark failed once max_attempts is used up"""
+        now = _now()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE jobs SET
+                    status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END,
+                    visible_at = ?, error = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'
+                """,
+                (self.settings["max_attempts"], self.settings["max_attempts"], now,
+                 now + self.settings["retry_delay"], str(error)[:500], job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def run_status(self, run_id: str) -> dict:
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._connect() as conn:
+            for status, n in conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)
+            ):
+                counts[status] = n
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def results(self, run_id: str) -> list:
+        """One dict per job of the run: payload, status, result, error, attempts, worker"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, payload, status, result, error, attempts, worker FROM jobs "
+                "WHERE run_id = ? ORDER BY id",
+                (run_id,),
+            ).fetchall()
+        return [
+            {
+                "id": job_id,
+                "payload": json.loads(payload),
+                "status": status,
+                "result": json.loads(result) if result else None,
+                "error": error,
+                "attempts": attempts,
+                "worker": worker,
+            }
+            for job_id, payload, status, result, error, attempts, worker in rows
+        ]
+
+    def purge(self, run_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM jobs WHERE run_id = ?", (run_id,)).rowcount
+
+
+# Lua keeps each state change atomic on the server (EVAL is supported by
+# Redis, Valkey, KeyDB and Dragonfly alike)
+_LEASE = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1)
+if #ids == 0 then return false end
+local key = ARGV[4] .. ids[1]
+local attempts = tonumber(redis.call('HGET', key, 'attempts') or '0')
+if attempts >= tonumber(ARGV[5]) then
+    redis.call('HSET', key, 'status', 'failed', 'finished_at', ARGV[1])
+    if not redis.call('HGET', key, 'error') then redis.call('HSET', key, 'error', 'lease expired') end
+    redis.call('ZREM', KEYS[1], ids[1])
+    return {ids[1], -1}
+end
+redis.call('HSET', key, 'status', 'leased', 'worker', ARGV[2], 'attempts', attempts + 1)
+redis.call('ZADD', KEYS[1], ARGV[3], ids[1])
+return {ids[1], attempts + 1}
+"""
+
+_HEARTBEAT = """
+if redis.call('HGET', KEYS[2], 'worker') ~= ARGV[1] or redis.call('HGET', KEYS[2], 'status') ~= 'leased' then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+_COMPLETE = """
+if redis.call('HGET', KEYS[2], 'worker') ~= ARGV[1] or redis.call('HGET', KEYS[2], 'status') ~= 'leased' then
+    return 0
+end
+redis.call('HSET', KEYS[2], 'status', 'done', 'result', ARGV[2], 'finished_at', ARGV[3])
+redis.call('HDEL', KEYS[2], 'error')
+redis.call('ZREM', KEYS[1], ARGV[4])
+return 1
+"""
+
+_FAIL = """
+if redis.call('HGET', KEYS[2], 'worker') ~= ARGV[1] or redis.call('HGET', KEYS[2], 'status') ~= 'leased' then
+    return 0
+end
+redis.call('HSET', KEYS[2], 'error', ARGV[2])
+if tonumber(redis.call('HGET', KEYS[2], 'attempts')) >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[2], 'status', 'failed', 'finished_at', ARGV[4])
+    redis.call('ZREM', KEYS[1], ARGV[6])
+else
+    redis.call('HSET', KEYS[2], 'status', 'queued')
+    redis.call('ZADD', KEYS[1], ARGV[5], ARGV[6])
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """
+    Same interface as SQLiteWorkQueue over a Redis-compatible server:
+    <prefix>:job:<id> hashes, one <prefix>:visible sorted set scored by
+    visible_at, and a <prefix>:run:<run_id> list of job ids per run.
+    """
+
+    def __init__(self, url: str, settings: dict = None):
+        if redis is None:
+            raise RuntimeError("work_queue backend 'redis' needs the redis package (pip install redis)")
+        self.settings = {**DEFAULTS, **(settings or {})}
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        prefix = self.settings["prefix"]
+        self._visible = f"{prefix}:visible"
+        self._job_prefix = f"{prefix}:job:"
+        self._run_prefix = f"{prefix}:run:"
+        self._next_id = f"{prefix}:next_id"
+        self._lease = self.client.register_script(_LEASE)
+        self._heartbeat = self.client.register_script(_HEARTBEAT)
+        self._complete = self.client.register_script(_COMPLETE)
+        self._fail = self.client.register_script(_FAIL)
+
+    def enqueue(self, run_id: str, payloads: list) -> list:
+        now = _now()
+        ids = []
+        for payload in payloads:
+            job_id = self.client.incr(self._next_id)
+            pipe = self.client.pipeline()
+            pipe.hset(self._job_prefix + str(job_id), mapping={
+                "run_id": run_id, "payload": json.dumps(payload), "status": QUEUED,
+                "attempts": 0, "created_at": now,
+            })
+            pipe.rpush(self._run_prefix + run_id, job_id)
+            pipe.zadd(self._visible, {str(job_id): now})
+            pipe.execute()
+            ids.append(job_id)
+        return ids
+
+    def lease(self, worker: str, visibility_timeout: float = None):
+        timeout = visibility_timeout or self.settings["visibility_timeout"]
+        while True:
+            now = _now()
+            leased = self._lease(keys=[self._visible],
+                                 args=[now, worker, now + timeout, self._job_prefix, self.settings["max_attempts"]])
+            if not leased:
+                return None
+            job_id, attempts = leased
+            if int(attempts) < 0:
+                continue   # used up its attempts - marked failed, look again
+            job = self.client.hgetall(self._job_prefix + str(job_id))
+            return {"id": int(job_id), "run_id": job["run_id"], "payload": json.loads(job["payload"]),
+                    "attempts": int(attempts)}
+
+    def heartbeat(self, job_id: int, worker: str, visibility_timeout: float = None) -> bool:
+        timeout = visibility_timeout or self.settings["visibility_timeout"]
+        return bool(self._heartbeat(keys=[self._visible, self._job_prefix + str(job_id)],
+                                    args=[worker, _now() + timeout, str(job_id)]))
+
+    def complete(self, job_id: int, worker: str, result) -> bool:
+        return bool(self._complete(keys=[self._visible, self._job_prefix + str(job_id)],
+                                   args=[worker, json.dumps(result, default=str), _now(), str(job_id)]))
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        now = _now()
+        return bool(self._fail(keys=[self._visible, self._job_prefix + str(job_id)],
+                               args=[worker, str(error)[:500], self.settings["max_attempts"], now,
+                                     now + self.settings["retry_delay"], str(job_id)]))
+
+    def _jobs(self, run_id: str) -> list:
+        ids = self.client.lrange(self._run_prefix + run_id, 0, -1)
+        pipe = self.client.pipeline()
+        for job_id in ids:
+            pipe.hgetall(self._job_prefix + job_id)
+        return list(zip(ids, pipe.execute()))
+
+    def run_status(self, run_id: str) -> dict:
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for _, job in self._jobs(run_id):
+            counts[job.get("status", QUEUED)] += 1
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def results(self, run_id: str) -> list:
+        return [
+            {
+                "id": int(job_id),
+                "payload": json.loads(job["payload"]),
+                "status": job.get("status"),
+                "result": json.loads(job["result"]) if job.get("result") else None,
+                "error": job.get("error"),
+                "attempts": int(job.get("attempts", 0)),
+                "worker": job.get("worker"),
+            }
+            for job_id, job in self._jobs(run_id) if job
+        ]
+
+    def purge(self, run_id: str) -> int:
+        ids = self.client.lrange(self._run_prefix + run_id, 0, -1)
+        pipe = self.client.pipeline()
+        for job_id in ids:
+            pipe.delete(self._job_prefix + job_id)
+            pipe.zrem(self._visible, job_id)
+        pipe.delete(self._run_prefix + run_id)
+        pipe.execute()
+        return len(ids)
+
+
+def open_queue(settings: dict = None):
+    """Queue for the configured backend"""
+    settings = dict(settings or queue_config())
+    if settings.get("backend") == "redis":
+        return RedisWorkQueue(settings.pop("redis_url"), settings)
+    return SQLiteWorkQueue(settings.pop("path"), settings)
+
+
+_queue_lock = threading.Lock()
+_queue = {}
+
+
+def work_queue():
+    """Process-wide queue for the configured backend"""
+    with _queue_lock:
+        if "instance" not in _queue:
+            _queue["instance"] = open_queue()
+        return _queue["instance"]
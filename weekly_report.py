@@ -13,12 +13,16 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime, timedelta
-from openpyxl import load_workbook
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import yaml
 
+from utils.change_journal import ChangeJournal, journal_path
+from utils.deadline_timeline import days_until
+from utils.log_cache import TenderLogCache
+from utils.rollups import tender_log_rollups
+
 # Load config
 config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
 with open(config_path, "r") as f:
@@ -27,6 +31,18 @@ with open(config_path, "r") as f:
 EXCEL_PATH = CONFIG["paths"]["tender_log_excel"]
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 REPORTS_DIR = os.path.join(os.path.dirname(__file__), "reports")
+JOURNAL_DB = journal_path(OUTPUT_DIR)
+REPORT_CONSUMER = "weekly_report"
+
+# Journal event kinds shown in the "since last report" line
+CHANGE_LABELS = {
+    "added": "added",
+    "amended": "amended",
+    "rescored": "re-scored",
+    "status_changed": "status changes",
+    "closed": "closed",
+    "removed": "dropped from the dashboard",
+}
 
 # Email settings
 EMAIL_ENABLED = os.environ.get("TENDERSCAN_EMAIL_ENABLED", "false").lower() == "true"
@@ -44,84 +60,85 @@ def get_weekly_stats():
     if not os.path.exists(EXCEL_PATH):
         return None
     
-    wb = load_workbook(EXCEL_PATH)
-    ws = wb.active
-    
     week_ago = datetime.now() - timedelta(days=7)
     
+    # Counters come from the rollups (O(buckets)); only the two short
+    # lists below need row data, read from the columnar sidecar cache
+    rollups = tender_log_rollups(EXCEL_PATH)
+    
     stats = {
-        "total": 0,
-        "this_week": 0,
+        "total": rollups.total,
+        "this_week": rollups.count_since((week_ago + timedelta(days=1)).strftime("%Y-%m-%d")),
         "by_type": {"TES": 0, "Phakathi": 0, "Both": 0, "Unknown": 0},
         "by_priority": {"HIGH": 0, "MEDIUM": 0, "LOW": 0},
-        "by_status": {},
+        "by_status": rollups.counts("status", default="Open"),
         "closing_soon": [],
         "high_priority": [],
-        "top_industries": {}
+        "top_industries": {},
+        "changes": {},
+        "journal_seq": None
     }
     
-    for row in range(2, ws.max_row + 1):
-        stats["total"] += 1
-        
-        tender_name = ws.cell(row=row, column=1).value or ""
-        client = ws.cell(row=row, column=2).value or ""
-        t_type = ws.cell(row=row, column=3).value or "Unknown"
-        industry = ws.cell(row=row, column=4).value or "Unknown"
-        composite = ws.cell(row=row, column=6).value or 5
-        priority = ws.cell(row=row, column=7).value or "MEDIUM"
-        closing = ws.cell(row=row, column=13).value or ""
-        status = ws.cell(row=row, column=14).value or "Open"
-        date_added = ws.cell(row=row, column=18).value or ""
-        ref = ws.cell(row=row, column=17).value or ""
-        
+    # Snapshot activity since the previous report (acked once the report is saved)
+    if os.path.exists(JOURNAL_DB):
+        stats["changes"], stats["journal_seq"] = ChangeJournal(JOURNAL_DB).pending_counts(REPORT_CONSUMER)
+    
+    for t_type, count in rollups.counts("category", default="Unknown").items():
         if t_type in stats["by_type"]:
-            stats["by_type"][t_type] += 1
-        
+            stats["by_type"][t_type] += count
+    
+    for priority, count in rollups.counts("priority", default="MEDIUM").items():
         if priority in stats["by_priority"]:
-            stats["by_priority"][priority] += 1
-        
-        stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
+            stats["by_priority"][priority] += count
+    
+    for source, count in rollups.counts("source", default="Unknown").items():
+        ind_key = source[:20]
+        stats["top_industries"][ind_key] = stats["top_industries"].get(ind_key, 0) + count
+    
+    cols = TenderLogCache(EXCEL_PATH).load()
+    today = datetime.now()
+    
+    # Closing soon: a bisect over the closing-date timeline, soonest first
+    for i in cols.timeline().closing_in(7, today):
+        if (cols["Status"][i] or "Open") != "Open":
+            continue
+        stats["closing_soon"].append({
+            "ref": cols["Reference Number"][i],
+            "title": cols["Tender Name"][i][:50],
+            "client": cols["Client"][i],
+            "days_left": days_until(cols["Closing Date"][i], today),
+            "priority": cols["Priority"][i] or "MEDIUM"
+        })
+        if len(stats["closing_soon"]) == 10:
+            break
+    
+    for i, status in enumerate(cols["Status"]):
+        status = status or "Open"
+        if status != "Open" or (cols["Priority"][i] or "MEDIUM") != "HIGH":
+            continue
         
-        ind_key = str(industry).split("(")[0].strip()[:20]
-        stats["top_industries"][ind_key] = stats["top_industries"].get(ind_key, 0) + 1
-        
-        try:
-            added = datetime.strptime(str(date_added), "%Y-%m-%d")
-            if added >= week_ago:
-                stats["this_week"] += 1
-        except:
-            pass
-        
-        try:
-            close_date = datetime.strptime(str(closing), "%Y-%m-%d")
-            days_left = (close_date - datetime.now()).days
-            if 0 <= days_left <= 7 and status == "Open":
-                stats["closing_soon"].append({
-                    "ref": ref,
-                    "title": tender_name[:50],
-                    "client": client,
-                    "days_left": days_left,
-                    "priority": priority
-                })
-        except:
-            pass
-        
-        if priority == "HIGH" and status == "Open":
-            stats["high_priority"].append({
-                "ref": ref,
-                "title": tender_name[:50],
-                "client": client,
-                "type": t_type,
-                "score": composite
-            })
-    
-    stats["closing_soon"] = sorted(stats["closing_soon"], key=lambda x: x["days_left"])[:10]
+        composite = cols["Composite Score"][i]
+        stats["high_priority"].append({
+            "ref": cols["Reference Number"][i],
+            "title": cols["Tender Name"][i][:50],
+            "client": cols["Client"][i],
+            "type": cols["Type"][i] or "Unknown",
+            "score": 5 if composite != composite or not composite else float(composite)  # NaN/0 -> 5
+        })
+    
     stats["high_priority"] = sorted(stats["high_priority"], key=lambda x: x.get("score", 0), reverse=True)[:10]
     stats["top_industries"] = dict(sorted(stats["top_industries"].items(), key=lambda x: x[1], reverse=True)[:5])
     
     return stats
 
 
+def _changes_line(changes: dict) -> str:
+    if not changes:
+        return ""
+    parts = [f"{changes[k]} {label}" for k, label in CHANGE_LABELS.items() if changes.get(k)]
+    return f"<p><strong>Since last report:</strong> {' · '.join(parts)}</p>"
+
+
 def generate_weekly_html(stats: dict) -> str:
     """Generate weekly dashboard HTML"""
     
@@ -186,6 +203,8 @@ def generate_weekly_html(stats: dict) -> str:
             </div>
         </div>
         
+        {_changes_line(stats.get('changes'))}
+        
         <h2>🎯 Priority Distribution</h2>
         <div class="priority-grid">
             <div class="priority-card high">
@@ -340,12 +359,17 @@ def send_weekly_email(html: str, report_path: str) -> bool:
         return False
 
 
-def run_weekly():
-    """Main weekly report function"""
+def run_weekly(progress=None):
+    """
+    Main weekly report function.
+    progress(stage_name) is called as each step starts (used by the web job runner).
+    """
+    progress = progress or (lambda stage: None)
     
     print(f"\n📊 TenderScan Weekly Report - {datetime.now().strftime('%Y-%m-%d')}")
     print("=" * 50)
     
+    progress("stats")
     print("\n📈 Extracting statistics...")
     stats = get_weekly_stats()
     
@@ -353,12 +377,16 @@ def run_weekly():
         print("❌ No data available")
         return
     
+    progress("report")
     print("📝 Generating report...")
     html = generate_weekly_html(stats)
     
     report_path = save_weekly_report(html)
     print(f"💾 Report saved: {report_path}")
+    if stats.get("journal_seq") is not None:
+        ChangeJournal(JOURNAL_DB).ack(REPORT_CONSUMER, stats["journal_seq"])
     
+    progress("email")
     send_weekly_email(html, report_path)
     
     print("\n" + "=" * 50)